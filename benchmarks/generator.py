@@ -0,0 +1,72 @@
+"""
+Parametric generator of synthetic Pollination buildings.
+------------------------------------------------------------------------------
+Strategy:
+    1. Split the rooms between the stories
+    2. Lay the rooms of a story on a grid of box rooms
+    3. Rotate each block of rooms to one of the facade orientations
+    4. Add apertures to the outdoor walls by ratio
+"""
+import math
+
+from ladybug_geometry.geometry3d.pointvector import Point3D
+from honeybee.room import Room
+
+from standins import RoomObject, RhinoObject, RhinoDoc
+
+
+def generate_rooms(rooms=100, stories=5, orientations=4, wwr=0.4,
+                   width=5.0, depth=6.0, height=3.0):
+    """Get a list of honeybee rooms for a synthetic building.
+
+    Args:
+        rooms: Number of rooms.
+        stories: Number of stories. Rooms are split evenly between them.
+        orientations: Number of facade orientations. The rooms of a story are
+            split in blocks and each block is rotated by 360 / orientations.
+        wwr: Ratio of aperture area to wall area of the outdoor walls.
+        width: Width of each room.
+        depth: Depth of each room.
+        height: Floor to floor height.
+    """
+    per_story = int(math.ceil(rooms / float(stories)))
+    block_size = int(math.ceil(per_story / float(orientations)))
+    columns = max(int(math.ceil(math.sqrt(block_size))), 1)
+    block_offset = (columns + 2) * max(width, depth)
+
+    hb_rooms = []
+    for i in range(rooms):
+        story, index = divmod(i, per_story)
+        block, cell = divmod(index, block_size)
+        row, column = divmod(cell, columns)
+        angle = block * 360.0 / orientations
+
+        origin = Point3D(block * block_offset + column * width,
+                         row * depth, story * height)
+        room = Room.from_box('Room_{}'.format(i), width, depth, height,
+                             0, origin)
+        if angle:
+            room.rotate_xy(angle, origin)
+        room.story = 'Story_{}'.format(story)
+        room.display_name = 'Room {}'.format(i)
+
+        if wwr:
+            for face in room.faces:
+                if str(face.type) == 'Wall':
+                    face.apertures_by_ratio(wwr, 0.01)
+        hb_rooms.append(room)
+    return hb_rooms
+
+
+def generate_document(rooms=100, stories=5, orientations=4, wwr=0.4,
+                      other_objects=0, **kwargs):
+    """Get a RhinoDoc stand-in with Pollination rooms and other objects.
+
+    Args:
+        other_objects: Number of objects that are not rooms (e.g. curves).
+        kwargs: Other inputs of generate_rooms.
+    """
+    hb_rooms = generate_rooms(rooms, stories, orientations, wwr, **kwargs)
+    objects = [RoomObject(room) for room in hb_rooms]
+    objects.extend(RhinoObject(layer_index=i % 10) for i in range(other_objects))
+    return RhinoDoc(objects)
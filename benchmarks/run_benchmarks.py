@@ -0,0 +1,350 @@
+"""
+Headless benchmark of the pure Python part of the Pollination scripts.
+------------------------------------------------------------------------------
+Instructions:
+    python benchmarks/run_benchmarks.py --rooms 10 100 1000 --stories 5
+------------------------------------------------------------------------------
+Strategy:
+    1. Generate a synthetic building in a RhinoDoc stand-in
+    2. Run each stage of the scripts on it with the shared modules
+    3. Report the time and the peak memory of each stage
+
+The time and the memory are measured in two separate passes because
+tracemalloc slows the code down. Each pass starts from a new document and an
+empty session, so every stage runs once on it and the stages with side
+effects (commits, events, caches) leave the same state for the next ones.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LIB = os.path.join(os.path.dirname(HERE), 'ironpython-scripts', 'lib')
+for path in (HERE, LIB):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from pollination_scripts import session
+from pollination_scripts.convert import room_from_schema, room_from_json
+from pollination_scripts.cache import get_hb_room
+from pollination_scripts.commit import RoomCommit
+from pollination_scripts.floorplan import stack_rooms
+from pollination_scripts.story import get_story_index
+from pollination_scripts.report import room_row, RoomTable, room_metrics, \
+    room_object_inputs, room_object_metrics
+from pollination_scripts.parallel import parallel_map
+from pollination_scripts.subfaces import get_subface_cache
+from pollination_scripts.search import SubObjectIndex
+from pollination_scripts.orientation import face_normals, orient_indices
+from pollination_scripts.wwr import get_faces_group_by_orientation, \
+    get_current_wwr, get_aperture_face3ds_by_room, get_orientation_face3ds, \
+    get_room_aperture_face3ds, is_outdoor_and_wall
+
+import standins
+from generator import generate_document
+
+
+# STAGES
+#---------------------------------------------------------------------------------------------#
+# Each stage gets the shared context and returns the value to store under
+# its name, so later stages can use it.
+def selection(ctx):
+    doc = ctx['doc']
+    return [_ for _ in doc.Objects if isinstance(_, standins.RoomObject)]
+
+
+def story_index(ctx):
+    session.forget_document(ctx['doc'])
+    return get_story_index(ctx['doc'], standins.RoomObject)
+
+
+def convert_json(ctx):
+    return [room_from_json(rm.ToHBObject().ToJson()) for rm in ctx['selection']]
+
+
+def convert_direct(ctx):
+    return [room_from_schema(rm.ToHBObject()) for rm in ctx['selection']]
+
+
+def convert_cache_cold(ctx):
+    doc = ctx['doc']
+    session.forget_document(doc)
+    return [get_hb_room(doc, rm) for rm in ctx['selection']]
+
+
+def convert_cache_warm(ctx):
+    doc = ctx['doc']
+    return [get_hb_room(doc, rm) for rm in ctx['selection']]
+
+
+def orientation_classify(ctx):
+    walls = [f for room in ctx['convert_direct'] for f in room.faces
+             if is_outdoor_and_wall(f)]
+    xs, ys = face_normals(walls)
+    return orient_indices(xs, ys, ctx['orientations'])
+
+
+def orientation_grouping(ctx):
+    return get_faces_group_by_orientation(ctx['convert_direct'],
+                                          ctx['orientations'])
+
+
+def wwr_math(ctx):
+    get_subface_cache().clear()
+    group_faces = ctx['orientation_grouping']
+    in_ratio = get_current_wwr(group_faces)
+    get_current_wwr(group_faces, True)
+    out_ratio = [0.3] * len(group_faces)
+    return get_aperture_face3ds_by_room(group_faces, in_ratio, out_ratio, 0.01)
+
+
+def wwr_preview_step(ctx):
+    # one slider step of the WWR editor recomputes a single orientation
+    return get_orientation_face3ds(ctx['orientation_grouping'][0], 0.35, 0.01)
+
+
+def _room_aperture_face3ds(hb_room):
+    return get_room_aperture_face3ds(hb_room, [0.2, 0.2, 0.2, 0.2], 2, 0.6, 2, 0, True)
+
+
+def aperture_geometry(ctx):
+    # cold sub-face cache, only the repeated wall shapes of this run hit
+    get_subface_cache().clear()
+    return parallel_map(_room_aperture_face3ds, ctx['convert_direct'], False)
+
+
+def aperture_geometry_warm(ctx):
+    return parallel_map(_room_aperture_face3ds, ctx['convert_direct'], False)
+
+
+def aperture_geometry_parallel(ctx):
+    get_subface_cache().clear()
+    return parallel_map(_room_aperture_face3ds, ctx['convert_direct'], True)
+
+
+def report_rows(ctx):
+    return [room_row(hb_room) for hb_room in ctx['convert_direct']]
+
+
+def report_table(ctx):
+    # build the column store, sort by each column and filter once
+    table = RoomTable(['name', 'floor', 'volume', 'exposed', 'aperture', 'wall'])
+    for hb_room in ctx['convert_direct']:
+        table.add(hb_room)
+    for column in range(len(table.header)):
+        table.view(column, True)
+    return table.view(1, False, 'room 1')
+
+
+def report_check(ctx, tolerance=0.01):
+    # the geometry path of the report must give the honeybee values
+    worst = 0
+    for rm, hb_room in zip(ctx['selection'], ctx['convert_direct']):
+        expected = room_metrics(hb_room)
+        with standins.rhino_modules():
+            metrics = room_object_metrics(room_object_inputs(rm), tolerance)
+        for value, hb_value in zip(metrics, expected):
+            diff = abs(value - hb_value) / max(abs(hb_value), 1)
+            if diff > 1e-6:
+                raise ValueError('Report of room {} does not match honeybee: {} '
+                                 'instead of {}.'.format(hb_room.identifier,
+                                                         value, hb_value))
+            worst = max(worst, diff)
+    return worst
+
+
+def _schema_sub_objects(room_object):
+    # same records as search.room_sub_objects, read from the schema stand-in
+    faces = room_object.ToHBObject().Faces
+    records = [('face', i, fc.Identifier, fc.DisplayName) for i, fc in enumerate(faces)]
+    for kind, refs, attr in (('aperture', room_object.Apertures, 'Apertures'),
+                             ('door', room_object.Doors, 'Doors')):
+        subs = [sub for fc in faces for sub in getattr(fc, attr)]
+        records.extend((kind, ref.ObjectId, sub.Identifier, sub.DisplayName)
+                       for ref, sub in zip(refs, subs))
+    return records
+
+
+def search_index(ctx):
+    index = SubObjectIndex()
+    index.build((rm.Id, _schema_sub_objects(rm)) for rm in ctx['selection'])
+    return index
+
+
+def search_query(ctx):
+    # the repeated searches only touch the posting lists
+    index = ctx['search_index']
+    return [len(index.search(keyword)) for keyword in
+            ('Room_1', 'Room_12_Front', 'Glz', 'Face3', 'missing')]
+
+
+def commit(ctx):
+    doc = ctx['doc']
+    room_commit = RoomCommit(doc, 'Benchmark', standins.ModelEntity, list)
+    for rm in ctx['selection']:
+        apt = standins.ApertureObject()
+        new_room, added_apts = rm.AddApertures([apt], 0.01, 0.01)
+        room_commit.add_apertures(added_apts)
+        room_commit.update_room(new_room, rm.Id)
+    return room_commit.commit()
+
+
+def _first_floor(ctx):
+    story = min(rm.Data.HBObjectCopy.Story for rm in ctx['selection'])
+    breps = [rm.BrepGeometry for rm in ctx['selection']
+             if rm.Data.HBObjectCopy.Story == story]
+    floors = len(ctx['selection']) // len(breps)
+    return breps, floors
+
+
+def stack_rooms_copies(ctx):
+    # rooms by curves: one floor of RoomObjects and moved copies
+    breps, floors = _first_floor(ctx)
+    room_commit = RoomCommit(standins.RhinoDoc(), 'Benchmark', standins.ModelEntity, list)
+    with standins.rhino_modules():
+        rooms = [standins.room_object_from_brep(_, 0.01) for _ in breps]
+        stack_rooms(rooms, 'Layer', floors, 3, room_commit)
+        return room_commit.commit()
+
+
+def stack_rooms_rebuild(ctx):
+    # the same rooms with a RoomObject built from each moved solid
+    breps, floors = _first_floor(ctx)
+    room_commit = RoomCommit(standins.RhinoDoc(), 'Benchmark', standins.ModelEntity, list)
+    with standins.rhino_modules():
+        for level in range(floors):
+            for brep in breps:
+                brep = brep.DuplicateBrep()
+                brep.Transform(standins.Transform.Translation(0, 0, level * 3))
+                room_commit.add_room(standins.room_object_from_brep(brep, 0.01))
+        return room_commit.commit()
+
+
+STAGES = [
+    selection, story_index, convert_json, convert_direct, convert_cache_cold,
+    convert_cache_warm, orientation_classify, orientation_grouping, wwr_math,
+    wwr_preview_step, aperture_geometry, aperture_geometry_warm,
+    aperture_geometry_parallel, report_rows, report_table, report_check,
+    search_index, search_query, commit, stack_rooms_copies, stack_rooms_rebuild
+]
+
+
+# RUNNER
+#---------------------------------------------------------------------------------------------#
+def run_stage(stage, ctx, memory=False):
+    """Run a stage once and get its result and its measure.
+
+    The measure is the time in seconds, or the peak memory in bytes when memory
+    is True.
+    """
+    if memory:
+        tracemalloc.start()
+        result = stage(ctx)
+        measure = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    else:
+        start = time.perf_counter()
+        result = stage(ctx)
+        measure = time.perf_counter() - start
+    return result, measure
+
+
+def run_pass(rooms, stories, orientations, wwr, other_objects, stages, memory=False):
+    """Run the stages once on a new document and get (name, measure) of each."""
+    session.sticky().clear()
+    doc = generate_document(rooms, stories, orientations, wwr, other_objects)
+    ctx = {'doc': doc, 'orientations': orientations}
+    measures = []
+    for stage in STAGES:
+        name = stage.__name__
+        if stages and name not in stages and not _needed(name, stages):
+            continue
+        ctx[name], measure = run_stage(stage, ctx, memory)
+        measures.append((name, measure))
+    return measures
+
+
+def run(rooms, stories, orientations, wwr, other_objects, stages, memory=True):
+    args = (rooms, stories, orientations, wwr, other_objects, stages)
+    times = run_pass(*args)
+    peaks = dict(run_pass(*args, memory=True)) if memory else {}
+    results = []
+    for name, seconds in times:
+        peak = peaks.get(name)
+        results.append({
+            'stage': name, 'rooms': rooms, 'stories': stories,
+            'orientations': orientations, 'seconds': seconds,
+            'peak_mb': peak / 1e6 if peak is not None else None
+        })
+    return results
+
+
+# stages that produce the inputs of other stages
+_DEPENDENCIES = {
+    'selection': ('story_index', 'convert_json', 'convert_direct',
+                  'convert_cache_cold', 'convert_cache_warm',
+                  'orientation_classify', 'orientation_grouping', 'wwr_math',
+                  'wwr_preview_step', 'aperture_geometry',
+                  'aperture_geometry_warm', 'aperture_geometry_parallel',
+                  'report_rows', 'report_table', 'report_check', 'search_index',
+                  'search_query', 'commit', 'stack_rooms_copies',
+                  'stack_rooms_rebuild'),
+    'convert_direct': ('orientation_classify', 'orientation_grouping',
+                       'wwr_math', 'wwr_preview_step', 'aperture_geometry',
+                       'aperture_geometry_warm', 'aperture_geometry_parallel',
+                       'report_rows', 'report_table', 'report_check'),
+    'convert_cache_cold': ('convert_cache_warm',),
+    'orientation_grouping': ('wwr_math', 'wwr_preview_step'),
+    'aperture_geometry': ('aperture_geometry_warm',),
+    'search_index': ('search_query',),
+}
+
+
+def _needed(name, stages):
+    return any(_ in stages for _ in _DEPENDENCIES.get(name, ()))
+
+
+def print_results(results):
+    print('{:<28}{:>8}{:>12}{:>12}'.format('stage', 'rooms', 'seconds', 'peak MB'))
+    for res in results:
+        peak = '{:.1f}'.format(res['peak_mb']) if res['peak_mb'] is not None else '-'
+        print('{:<28}{:>8}{:>12.4f}{:>12}'.format(
+            res['stage'], res['rooms'], res['seconds'], peak))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rooms', type=int, nargs='+', default=[10, 100, 1000],
+                        help='Number of rooms. One run for each value.')
+    parser.add_argument('--stories', type=int, default=5)
+    parser.add_argument('--orientations', type=int, default=4)
+    parser.add_argument('--wwr', type=float, default=0.4)
+    parser.add_argument('--other-objects', type=int, default=0,
+                        help='Number of document objects that are not rooms.')
+    parser.add_argument('--stages', nargs='+', default=None,
+                        choices=[_.__name__ for _ in STAGES])
+    parser.add_argument('--no-memory', action='store_true',
+                        help='Skip the peak memory run.')
+    parser.add_argument('--json', help='Append the results to this JSON lines file.')
+    options = parser.parse_args(args)
+
+    all_results = []
+    for rooms in options.rooms:
+        results = run(rooms, options.stories, options.orientations, options.wwr,
+                      options.other_objects, options.stages, not options.no_memory)
+        print_results(results)
+        print('')
+        all_results.extend(results)
+
+    if options.json:
+        with open(options.json, 'a') as f:
+            for res in all_results:
+                f.write(json.dumps(res) + '\n')
+    return all_results
+
+
+if __name__ == '__main__':
+    main()
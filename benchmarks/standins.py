@@ -0,0 +1,512 @@
+"""
+Lightweight stand-ins for the RhinoCommon and Pollination objects.
+------------------------------------------------------------------------------
+They only implement the members used by the shared modules of the scripts,
+so the pure Python part of the scripts can run in CPython without Rhino.
+The HoneybeeSchema stand-ins mirror the csharp object graph that
+rm.ToHBObject() returns.
+"""
+import contextlib
+import copy
+import itertools
+import json
+import sys
+import types
+import uuid
+from collections import OrderedDict
+
+from ladybug_geometry.geometry3d.pointvector import Point3D, Vector3D
+from ladybug_geometry.geometry3d.polyface import Polyface3D
+
+_serial_numbers = itertools.count(1)
+
+
+class Point3d(object):
+
+    def __init__(self, x, y, z):
+        self.X, self.Y, self.Z = x, y, z
+
+    def DistanceTo(self, other):
+        return ((self.X - other.X) ** 2 + (self.Y - other.Y) ** 2 +
+                (self.Z - other.Z) ** 2) ** .5
+
+
+class BoundingBox(object):
+
+    def __init__(self, points):
+        xs, ys, zs = zip(*points)
+        self.Min = Point3d(min(xs), min(ys), min(zs))
+        self.Max = Point3d(max(xs), max(ys), max(zs))
+        self.Center = Point3d((self.Min.X + self.Max.X) / 2.,
+                              (self.Min.Y + self.Max.Y) / 2.,
+                              (self.Min.Z + self.Max.Z) / 2.)
+
+
+class Count(object):
+
+    def __init__(self, count):
+        self.Count = count
+
+
+class Transform(object):
+    """Translation, the only transform of the scripts."""
+
+    def __init__(self, x, y, z):
+        self.vector = Vector3D(x, y, z)
+
+    @staticmethod
+    def Translation(x, y, z):
+        return Transform(x, y, z)
+
+
+def _closest_point(face3d, point):
+    pt = Point3D(point.X, point.Y, point.Z)
+    closest = face3d.plane.closest_point(pt)
+    if not face3d.is_point_on_face(closest, 1e-9):
+        closest = min((seg.closest_point(pt) for seg in face3d.boundary_segments),
+                      key=pt.distance_to_point)
+    return Point3d(closest.x, closest.y, closest.z)
+
+
+def _points(face3ds):
+    return set((pt.x, pt.y, pt.z) for face in face3ds for pt in face.vertices)
+
+
+class FaceBrep(object):
+    """Brep of a single trimmed face, like BrepFace.DuplicateFace returns."""
+
+    def __init__(self, face3d):
+        self.face3d = face3d
+
+    def ClosestPoint(self, point):
+        return _closest_point(self.face3d, point)
+
+    def GetBoundingBox(self, accurate):
+        return BoundingBox(_points([self.face3d]))
+
+    def Transform(self, xform):
+        self.face3d = self.face3d.move(xform.vector)
+        return True
+
+
+class BrepFace(object):
+    """Face of a room brep, with the face data of Pollination.
+
+    ClosestPoint returns the point itself as u, which PointAt gives back.
+    """
+
+    def __init__(self, brep, index, face3d, face_data=None):
+        self._brep = brep
+        self.FaceIndex = index
+        self._face3d = face3d
+        self.face_data = face_data
+
+    def ComponentIndex(self):
+        return self.FaceIndex
+
+    def AdjacentFaces(self):
+        edges = set(_edges(self._face3d))
+        return [fc.FaceIndex for fc in self._brep.Faces
+                if fc is not self and edges & set(_edges(fc._face3d))]
+
+    def ClosestPoint(self, point):
+        return True, _closest_point(self._face3d, point), None
+
+    def PointAt(self, u, v):
+        return u
+
+    def DuplicateFace(self, duplicate_meshes):
+        return FaceBrep(self._face3d)
+
+
+def _edges(face3d):
+    pts = [(round(pt.x, 6), round(pt.y, 6), round(pt.z, 6)) for pt in face3d.vertices]
+    return [frozenset(_) for _ in zip(pts, pts[1:] + pts[:1])]
+
+
+class BrepFaces(list):
+
+    @property
+    def Count(self):
+        return len(self)
+
+
+class Brep(object):
+    """Brep of a room from its Face3Ds, with the face data of Pollination."""
+
+    IsSolid = True
+
+    def __init__(self, face3ds, face_data=None):
+        face_data = face_data or [None] * len(face3ds)
+        self.Faces = BrepFaces(BrepFace(self, i, face, data) for i, (face, data)
+                               in enumerate(zip(face3ds, face_data)))
+        self._update()
+
+    def _update(self):
+        self._points = list(_points(self.face3ds))
+        self.Vertices = Count(len(self._points))
+
+    @property
+    def face3ds(self):
+        return [fc._face3d for fc in self.Faces]
+
+    def GetBoundingBox(self, accurate):
+        return BoundingBox(self._points)
+
+    def DuplicateBrep(self):
+        return Brep(self.face3ds, [fc.face_data for fc in self.Faces])
+
+    def Transform(self, xform):
+        for fc in self.Faces:
+            fc._face3d = fc._face3d.move(xform.vector)
+        self._update()
+        return True
+
+    def TransformComponent(self, components, xform, tolerance, time_limit,
+                           use_multiple_threads):
+        # move the vertices of the faces, the faces around them stretch
+        moved = _points(self.Faces[i]._face3d for i in components)
+        for fc in self.Faces:
+            fc._face3d = type(fc._face3d)(
+                [pt.move(xform.vector) if (pt.x, pt.y, pt.z) in moved else pt
+                 for pt in fc._face3d.boundary])
+        self._update()
+        return True
+
+
+class AreaMassProperties(object):
+
+    def __init__(self, face3d):
+        self.Area = face3d.area
+        center = face3d.center
+        self.Centroid = Point3d(center.x, center.y, center.z)
+
+    @staticmethod
+    def Compute(brep, area, first_moments, second_moments, product_moments):
+        if not isinstance(brep, FaceBrep):
+            raise TypeError('The stand-ins only measure a single trimmed face.')
+        return AreaMassProperties(brep.face3d)
+
+
+class VolumeMassProperties(object):
+
+    def __init__(self, volume):
+        self.Volume = volume
+
+    @staticmethod
+    def Compute(brep, volume, first_moments, second_moments, product_moments):
+        return VolumeMassProperties(Polyface3D.from_faces(brep.face3ds, 0.01).volume)
+
+
+class EntityHelper(object):
+
+    @staticmethod
+    def TryGetFaceDataCopy(face):
+        if face.face_data is None:
+            return None
+        return SchemaObject(HBObjectCopy=face.face_data)
+
+    @staticmethod
+    def TryGetFaceData(face):
+        if face.face_data is None:
+            return None
+        return SchemaObject(HBObject=face.face_data)
+
+
+def _module(name, **members):
+    module = types.ModuleType(name)
+    module.__dict__.update(members)
+    return module
+
+
+@contextlib.contextmanager
+def rhino_modules():
+    """Make the stand-ins importable as the Rhino, Pollination and
+    HoneybeeSchema modules."""
+    geometry = _module('Rhino.Geometry', AreaMassProperties=AreaMassProperties,
+                       VolumeMassProperties=VolumeMassProperties,
+                       Transform=Transform)
+    entity = _module('Core.Entity', EntityHelper=EntityHelper,
+                     ModelEntity=ModelEntity)
+    modules = {
+        'Rhino': _module('Rhino', Geometry=geometry), 'Rhino.Geometry': geometry,
+        'Core': _module('Core', Entity=entity, Objects=_module(
+            'Core.Objects', RoomObject=room_object_from_brep)),
+        'Core.Entity': entity,
+        'HoneybeeSchema': _module(
+            'HoneybeeSchema', FaceType=SchemaObject(RoofCeiling='RoofCeiling'),
+            Outdoors=lambda: SchemaObject(Type='Outdoors')),
+        'System': _module('System', Guid=SchemaObject(NewGuid=uuid.uuid4)),
+        'clr': _module('clr', AddReference=lambda name: None)}
+    saved = dict((name, sys.modules.get(name)) for name in modules)
+    sys.modules.update(modules)
+    try:
+        yield
+    finally:
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+
+
+# HoneybeeSchema stand-ins
+#---------------------------------------------------------------------------------------------#
+class SchemaObject(object):
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class AnyOf(object):
+
+    def __init__(self, obj):
+        self.Obj = obj
+
+
+def _schema_face3d(geometry):
+    plane = geometry.plane
+    return SchemaObject(
+        Boundary=[[pt.x, pt.y, pt.z] for pt in geometry.boundary],
+        Holes=[[[pt.x, pt.y, pt.z] for pt in hole] for hole in geometry.holes]
+        if geometry.has_holes else None,
+        Plane=SchemaObject(N=list(plane.n), O=list(plane.o), X=list(plane.x)))
+
+
+def _schema_bc(bc):
+    bc_type = bc.__class__.__name__
+    if bc_type == 'Outdoors':
+        view_factor = bc.view_factor
+        if not isinstance(view_factor, (int, float)):
+            view_factor = SchemaObject(Type='Autocalculate')
+        return AnyOf(SchemaObject(
+            Type='Outdoors', SunExposure=bc.sun_exposure,
+            WindExposure=bc.wind_exposure, ViewFactor=AnyOf(view_factor)))
+    if bc_type == 'Surface':
+        return AnyOf(SchemaObject(
+            Type='Surface',
+            BoundaryConditionObjects=list(bc.boundary_condition_objects)))
+    return AnyOf(SchemaObject(Type=bc_type))
+
+
+def _schema_shades(hb_obj):
+    return [SchemaObject(Identifier=shd.identifier, DisplayName=shd.display_name,
+                         Geometry=_schema_face3d(shd.geometry),
+                         IsDetached=shd.is_detached)
+            for shd in hb_obj.outdoor_shades] or None
+
+
+def _schema_sub_face(sub_face, is_aperture):
+    obj = SchemaObject(
+        Type='Aperture' if is_aperture else 'Door',
+        Identifier=sub_face.identifier, DisplayName=sub_face.display_name,
+        Geometry=_schema_face3d(sub_face.geometry),
+        BoundaryCondition=_schema_bc(sub_face.boundary_condition),
+        IndoorShades=None, OutdoorShades=_schema_shades(sub_face))
+    if is_aperture:
+        obj.IsOperable = sub_face.is_operable
+    else:
+        obj.IsGlass = sub_face.is_glass
+    return obj
+
+
+class SchemaRoom(SchemaObject):
+    """HoneybeeSchema Room with the ToJson method of the csharp object."""
+
+    def __init__(self, hb_room):
+        faces = [SchemaObject(
+            Type='Face', Identifier=face.identifier,
+            DisplayName=face.display_name,
+            Geometry=_schema_face3d(face.geometry), FaceType=str(face.type),
+            BoundaryCondition=_schema_bc(face.boundary_condition),
+            Apertures=[_schema_sub_face(apt, True) for apt in face.apertures],
+            Doors=[_schema_sub_face(dr, False) for dr in face.doors],
+            IndoorShades=None, OutdoorShades=_schema_shades(face),
+            Properties=None, UserData=None)
+            for face in hb_room.faces]
+        SchemaObject.__init__(
+            self, Type='Room', Identifier=hb_room.identifier,
+            DisplayName=hb_room.display_name, Faces=faces,
+            Story=hb_room.story, Multiplier=hb_room.multiplier,
+            IndoorShades=None, OutdoorShades=_schema_shades(hb_room),
+            Properties=None, UserData=None)
+        self._dict = hb_room.to_dict()
+
+    def ToJson(self):
+        return json.dumps(self._dict)
+
+
+# RhinoCommon and Pollination stand-ins
+#---------------------------------------------------------------------------------------------#
+class ObjRef(object):
+
+    def __init__(self, object_id, obj=None):
+        self.ObjectId = object_id
+        self._object = obj
+
+    def Object(self):
+        return self._object
+
+    def Brep(self):
+        return self._object.Geometry
+
+
+class RhinoObject(object):
+    """Any document object that is not a room (e.g. curves)."""
+
+    def __init__(self, geometry=None, layer_index=0):
+        self.Id = uuid.uuid4()
+        self.RuntimeSerialNumber = next(_serial_numbers)
+        self.Geometry = geometry
+        self.Attributes = SchemaObject(LayerIndex=layer_index)
+
+
+class ApertureObject(RhinoObject):
+
+    def __init__(self, geometry=None):
+        RhinoObject.__init__(self, geometry)
+
+    def DuplicateApertureObject(self):
+        return ApertureObject(FaceBrep(self.Geometry.face3d))
+
+
+def _sub_object_ref(sub_face):
+    obj = ApertureObject(FaceBrep(sub_face.geometry))
+    return ObjRef(obj.Id, obj)
+
+
+class RoomObject(RhinoObject):
+    """Pollination RoomObject built from a honeybee Room."""
+
+    def __init__(self, hb_room):
+        RhinoObject.__init__(self)
+        self.HBRoom = hb_room
+        self._schema = SchemaRoom(hb_room)
+        self.BrepGeometry = self.Geometry = Brep(
+            [face.geometry for face in hb_room.faces], self._schema.Faces)
+        self.Data = SchemaObject(HBObjectCopy=self._schema, HBObject=self._schema)
+        self.Apertures = [_sub_object_ref(apt) for face in hb_room.faces
+                          for apt in face.apertures]
+        self.Doors = [_sub_object_ref(dr) for face in hb_room.faces
+                      for dr in face.doors]
+
+    def ToHBObject(self):
+        return self._schema
+
+    def DuplicateRoomObject(self):
+        """Copy of the room, not in the document, with new identifiers."""
+        new_room = RoomObject.__new__(RoomObject)
+        RhinoObject.__init__(new_room)
+        new_room.HBRoom = self.HBRoom
+        suffix = uuid.uuid4().hex[:8]
+        schema = copy.copy(self._schema)
+        schema.Identifier = '{}_{}'.format(schema.Identifier, suffix)
+        schema.Faces = [copy.copy(fc) for fc in schema.Faces]
+        for fc in schema.Faces:
+            fc.Identifier = '{}_{}'.format(fc.Identifier, suffix)
+        new_room._schema = schema
+        new_room.Data = SchemaObject(HBObjectCopy=schema, HBObject=schema)
+        new_room.BrepGeometry = new_room.Geometry = Brep(
+            self.BrepGeometry.face3ds, schema.Faces)
+        new_room.Apertures, new_room.Doors = [], []
+        return new_room
+
+    def AddApertures(self, apertures, tolerance, angle_tolerance):
+        new_room = RoomObject.__new__(RoomObject)
+        new_room.__dict__.update(self.__dict__)
+        new_room.RuntimeSerialNumber = next(_serial_numbers)
+        new_room.Apertures = self.Apertures + [ObjRef(_.Id, _) for _ in apertures]
+        return new_room, list(apertures)
+
+
+def room_object_from_brep(brep, tolerance):
+    """RoomObject(brep, tolerance) of Pollination. The room and its faces get
+    new identifiers and the default data of honeybee."""
+    from honeybee.room import Room
+    from honeybee.face import Face
+    room_id = 'Room_{}'.format(uuid.uuid4().hex[:8])
+    faces = [Face('{}_Face{}'.format(room_id, i), face3d)
+             for i, face3d in enumerate(brep.face3ds)]
+    return RoomObject(Room(room_id, faces))
+
+
+class ObjectTable(object):
+    """Document objects keyed by Id, so finding, replacing and deleting one
+    object does not depend on the size of the document."""
+
+    def __init__(self, objects=()):
+        self._ids = OrderedDict((obj.Id, obj) for obj in objects)
+
+    def __iter__(self):
+        return iter(list(self._ids.values()))
+
+    def __len__(self):
+        return len(self._ids)
+
+    def FindId(self, object_id):
+        return self._ids.get(object_id)
+
+    def GetObjectList(self, settings):
+        object_type = getattr(settings, 'ObjectType', None)
+        return [obj for obj in self
+                if object_type is None or isinstance(obj, object_type)]
+
+    def AddRhinoObject(self, obj):
+        self._ids[obj.Id] = obj
+        return True
+
+    def Replace(self, obj):
+        # an existing Id keeps its place in the table
+        self._ids[obj.Id] = obj
+
+    def Transform(self, object_id, xform, delete_original):
+        self._ids[object_id].Geometry.Transform(xform)
+        return object_id
+
+    def Delete(self, obj, quiet):
+        object_id = getattr(obj, 'ObjectId', getattr(obj, 'Id', obj))
+        return self._ids.pop(object_id, None) is not None
+
+
+class Views(object):
+
+    def __init__(self):
+        self.RedrawEnabled = True
+        self.redraws = 0
+
+    def Redraw(self):
+        self.redraws += 1
+
+
+class RhinoDoc(object):
+
+    def __init__(self, objects=(), tolerance=0.01):
+        self.RuntimeSerialNumber = next(_serial_numbers)
+        self.ModelAbsoluteTolerance = tolerance
+        self.ModelAngleToleranceRadians = 0.0174533
+        self.Objects = ObjectTable(objects)
+        self.Views = Views()
+        self.undo_records = 0
+
+    def BeginUndoRecord(self, description):
+        self.undo_records += 1
+        return self.undo_records
+
+    def EndUndoRecord(self, serial_number):
+        return True
+
+
+class ModelEntity(object):
+    """Pollination ModelEntity. The rooms replace the objects with their Id."""
+
+    @staticmethod
+    def UpdateHBObjs(doc, rooms):
+        for rm in rooms:
+            doc.Objects.Replace(rm)
+        return True
+
+    @staticmethod
+    def AddHBObjs(doc, rooms):
+        for rm in rooms:
+            doc.Objects.AddRhinoObject(rm)
+        return True
@@ -0,0 +1,92 @@
+"""
+Compare the JSON round trip with the direct conversion of Pollination rooms
+------------------------------------------------------------------------------
+Instructions:
+    1. Run the script
+    2. Select the rooms (Enter to use all the rooms of the document)
+------------------------------------------------------------------------------
+Strategy:
+    1. JSON path - ToHBObject > ToJson > json.loads > dict_to_object
+    2. Direct path - ToHBObject > honeybee objects
+    3. Check that both paths give the same room metrics
+"""
+
+# import rhinocommon
+import Rhino
+import System
+
+# import pollination part
+import clr
+clr.AddReference('Pollination.Core.dll')
+clr.AddReference('HoneybeeSchema.dll')
+import Core as po # It contains Pollination RhinoObject classes
+
+# import shared modules
+import os
+import sys
+lib_path = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'lib')
+if lib_path not in sys.path: sys.path.append(lib_path)
+
+try:  # import dependencies
+    from pollination_scripts.convert import room_from_schema, room_from_json
+except ImportError as e:
+    raise ImportError('\nFailed to import:\n\t{}'.format(e))
+
+# SELECTION PART
+#---------------------------------------------------------------------------------------------#
+# doc info
+doc = Rhino.RhinoDoc.ActiveDoc
+tol = doc.ModelAbsoluteTolerance
+
+# start the command
+go = Rhino.Input.Custom.GetObject()
+
+# set the selection
+go.SetCommandPrompt('Please, select pollination rooms. Enter to use all of them')
+go.GeometryFilter = Rhino.DocObjects.ObjectType.Brep
+go.GroupSelect = False
+go.SubObjectSelect = False
+go.AcceptNothing(True)
+go.GetMultiple(0, 0)
+
+# filter by rooms
+rooms = [_.Object() for _ in go.Objects() if isinstance(_.Object(), po.Objects.RoomObject)]
+if not rooms:
+    rooms = [_ for _ in doc.Objects if isinstance(_, po.Objects.RoomObject)]
+
+if not rooms:
+    raise ValueError('No rooms found.')
+
+# BENCHMARK PART
+#---------------------------------------------------------------------------------------------#
+def metrics(hb_room):
+    return [hb_room.floor_area, hb_room.volume, hb_room.exposed_area,
+            hb_room.exterior_wall_aperture_area, hb_room.exterior_wall_area]
+
+# the csharp objects are shared so both paths only time the python side
+schema_rooms = [rm.ToHBObject() for rm in rooms]
+
+watch = System.Diagnostics.Stopwatch.StartNew()
+json_rooms = [room_from_json(rm.ToJson()) for rm in schema_rooms]
+json_time = watch.Elapsed.TotalSeconds
+
+watch.Restart()
+direct_rooms = [room_from_schema(rm) for rm in schema_rooms]
+direct_time = watch.Elapsed.TotalSeconds
+
+# check the results
+mismatch = []
+for json_room, direct_room in zip(json_rooms, direct_rooms):
+    for a, b in zip(metrics(json_room), metrics(direct_room)):
+        if abs(a - b) > tol:
+            mismatch.append(json_room.display_name)
+            break
+
+print 'Rooms: {}'.format(len(rooms))
+print 'JSON path: {:.3f} s'.format(json_time)
+print 'Direct path: {:.3f} s'.format(direct_time)
+if direct_time:
+    print 'Speed up: {:.1f}x'.format(json_time / direct_time)
+if mismatch:
+    print 'Different metrics for: {}'.format(', '.join(mismatch))
@@ -16,8 +16,17 @@ import Core.Convert as co # It contains utilities to convert RhinoObject <> HB S
 from Core.Entity import EntityHelper, ModelEntity
 from System.Collections.Generic import List
 
+# import shared modules
+import os
+import sys
+lib_path = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'lib')
+if lib_path not in sys.path: sys.path.append(lib_path)
+from pollination_scripts import timing
+timing.start('create_apertures_by_wwr')
+
 # STRATEGY
-# Pollination rooms > JSON > Honeybee rooms > JSON > Pollination rooms
+# Pollination rooms > Honeybee rooms > Pollination rooms
 
 # SELECTION PART
 #---------------------------------------------------------------------------------------------#
@@ -39,7 +48,8 @@ go.AcceptNothing(True)
 go.GetMultiple(0, 0)
 
 # filter by rooms
-rooms = [_.Object() for _ in go.Objects() if isinstance(_.Object(), po.Objects.RoomObject)]
+with timing.span('selection'):
+    rooms = [_.Object() for _ in go.Objects() if isinstance(_.Object(), po.Objects.RoomObject)]
 
 if not rooms:
     raise ValueError('Please, select pollination rooms')
@@ -47,100 +57,65 @@ if not rooms:
 # HONEYBEE PART
 #---------------------------------------------------------------------------------------------#
 try:  # import dependencies
-    import json
-    import honeybee.dictutil as hb_dict_util
-    from honeybee.boundarycondition import Outdoors
-    from honeybee.facetype import Wall
-    from ladybug_geometry.geometry3d.face import Face3D
     from ladybug_rhino.fromgeometry import from_face3d
-    from honeybee.orientation import check_matching_inputs, angles_from_num_orient, \
-    inputs_by_index, face_orient_index
+    from pollination_scripts.cache import get_hb_room
+    from pollination_scripts.commit import RoomCommit
+    from pollination_scripts.parallel import parallel_map
+    from pollination_scripts.subfaces import get_subface_cache
+    from pollination_scripts.wwr import get_room_aperture_face3ds, \
+        orient_outdoor_walls
 except ImportError as e:
     raise ImportError('\nFailed to import:\n\t{}'.format(e))
 
-def can_host_apeture(face):
-    return isinstance(face.boundary_condition, Outdoors) and \
-        isinstance(face.type, Wall)
-
-def create_brep_from_ratio(all_inputs, subdivide, angles, face):
-    tolerance = 0.01
-    breps = []
-    if can_host_apeture(face):
-        orient_i = face_orient_index(face, angles)
-        rat, hgt, sil, hor, vert = inputs_by_index(orient_i, all_inputs)
-        if not rat: return breps
-        face3ds = None
-
-        if subdivide:
-            face3ds = face.geometry.sub_faces_by_ratio_sub_rectangle(rat, hgt, sil, hor, vert, tolerance)
-        else:
-            face3ds = face.geometry.sub_faces_by_ratio_rectangle(rat, tolerance)
-        if not face3ds: return
-
-        for geo in face3ds:
-            brep = from_face3d(geo)
-            #brep.UserDictionary.Set('FaceIdentifier', face.identifier)
-            breps.append(brep)
-
-        return breps
-
-def get_aperture_brep_from_json_room(hb_json, ratio, win_height, sill_height, horiz_separ, vertical_separ, subdivide = False):
-    # create objects first
-    hb_dict = json.loads(hb_json)
-    hb_obj = hb_dict_util.dict_to_object(hb_dict, False)
-    if not hb_obj: raise ValueError(e)
-    
-    # duplicate the initial objects
-    hb_obj = hb_obj.duplicate()
-    
-    # set defaults for any blank inputs
-    #conversion = conversion_to_meters()
-    _win_height_ = [win_height]
-    _sill_height_ = [sill_height]
-    _horiz_separ_ = [horiz_separ]
-    vert_separ_ = [vertical_separ]
-    
-    # gather all of the inputs together
-    all_inputs = [ratio, _win_height_, _sill_height_, _horiz_separ_,
-                  vert_separ_]
-    
-    all_inputs, num_orient = check_matching_inputs(all_inputs)
-    angles = angles_from_num_orient(num_orient)
-    
-    apertures = []
-    for face in hb_obj.faces:
-        brep = create_brep_from_ratio(all_inputs, subdivide, angles, face)
-        if brep:
-            apertures.extend(brep)
-    return apertures
+def get_aperture_brep_from_room(hb_obj, ratio, win_height, sill_height, horiz_separ, vertical_separ, subdivide = False, walls = None):
+    with timing.span('sub_faces'):
+        face3ds = get_room_aperture_face3ds(hb_obj, ratio, win_height, sill_height, 
+                                            horiz_separ, vertical_separ, subdivide, walls)
+    with timing.span('from_face3d'):
+        return [from_face3d(geo) for geo in face3ds]
 
 # GO BACK TO POLLINATION RHINO
 #---------------------------------------------------------------------------------------------#
 # TODO: Add Eto dialog
 
 ratio = [0.2, 0.2, 0.2, 0.2]
+parallel = True  # set to False to generate the apertures on the main thread
 
-for rm in rooms:
-    json_room = rm.ToHBObject().ToJson()
-    breps = get_aperture_brep_from_json_room(json_room, ratio, 2, 0.6, 2, 0, True)
-    
+# honeybee rooms are converted on the main thread because of the cache
+with timing.span('convert'):
+    hb_rooms = [get_hb_room(doc, rm) for rm in rooms]
+
+# orientation of the outdoor walls of all the rooms in one pass
+with timing.span('orientation'):
+    room_walls = orient_outdoor_walls(hb_rooms, len(ratio))
+
+# pure geometry on all the cores, results keep the order of the rooms
+def get_room_breps(room_and_walls):
+    hb_room, walls = room_and_walls
+    return get_aperture_brep_from_room(hb_room, ratio, 2, 0.6, 2, 0, True, walls)
+
+with timing.span('aperture_geometry'):
+    room_breps = parallel_map(get_room_breps, zip(hb_rooms, room_walls), parallel)
+
+# write to the document on the main thread only
+room_commit = RoomCommit(doc, 'Create apertures by WWR')
+for rm, breps in zip(rooms, room_breps):
     apertures = []
     for brp in breps:
         apt = po.Objects.ApertureObject(brp)
         apt.Id = System.Guid.NewGuid()
         apertures.append(apt)
     
-    new_room, added_apts = rm.AddApertures(apertures, tol, a_tol)
+    with timing.span('AddApertures'):
+        new_room, added_apts = rm.AddApertures(apertures, tol, a_tol)
     if not added_apts: continue
     
-    # add new apertures
-    for apt in added_apts:
-        doc.Objects.AddRhinoObject(apt)
-    
-    # create a List of rooms
-    new_room.Id = rm.Id
-    rooms = List[po.Objects.RoomObject]()
-    rooms.Add(new_room)
-    
-    ModelEntity.UpdateHBObjs(doc, rooms)
-doc.Views.Redraw()
\ No newline at end of file
+    # collect the changes and add them all together
+    room_commit.add_apertures(added_apts)
+    room_commit.update_room(new_room, rm.Id)
+
+with timing.span('commit'):
+    room_commit.commit()
+subface_cache = get_subface_cache()
+timing.finish(rooms=len(rooms), subface_hits=subface_cache.hits,
+              subface_misses=subface_cache.misses)
\ No newline at end of file
@@ -3,18 +3,20 @@ Create new room starting from ceilings or roofs of a model story
 ------------------------------------------------------------------------------
 Instructions:
     1. Run the script
-    2. Select the story
-    3. Create a new room
+    2. Select the story (or all the stories) and the plenum depth
+    3. Create the new rooms
 ------------------------------------------------------------------------------
 Strategy:
     1. Get all Pollination Rooms
     2. Get all Pollination Room Story
-    3. Use ExtractSrf and ExtrudeSrf
+    3. Offset the roof/ceiling faces to closed solids on all the cores
+    4. Create the Pollination Rooms and add them with one AddHBObjs call
 """
 
 # import rhinocommon and Eto
 import Rhino
 import System
+import System.Guid
 import Rhino.UI
 import Eto.Drawing as drawing
 import Eto.Forms as forms
@@ -31,9 +33,21 @@ from Core.Entity import EntityHelper, ModelEntity
 # import List collection
 from System.Collections.Generic import List
 
+# import shared modules
+import os
+import sys
+lib_path = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'lib')
+if lib_path not in sys.path: sys.path.append(lib_path)
+from pollination_scripts import timing
+timing.start('create_plenum_by_story')
+
 try:  # import honeybee dependencies
     import honeybee.dictutil as hb_dict_util
     from honeybee.room import Room
+    from pollination_scripts.story import get_story_index
+    from pollination_scripts.commit import RoomCommit
+    from pollination_scripts.parallel import parallel_map
 except ImportError as e:
     raise ImportError('\nFailed to import:\n\t{}'.format(e))
 
@@ -46,24 +60,30 @@ a_tol = doc.ModelAngleToleranceRadians
 current_model = po.Entity.ModelEntityTable.Instance.CurrentModelEntity
 doc_unit = Rhino.RhinoDoc.ActiveDoc.ModelUnitSystem
 
-# get all objects
-objects = Rhino.RhinoDoc.ActiveDoc.Objects
-
-# filter by rooms
-rooms = [_ for _ in objects if isinstance(_, po.Objects.RoomObject)]
+# rooms by story
+with timing.span('story_index'):
+    story_index = get_story_index(doc, po.Objects.RoomObject)
 
-if not rooms:
+if not len(story_index):
     raise ValueError('No rooms found.')
 
+ALL_STORIES = '<all stories>'
+
 # define Eto window
-class StorySelection(forms.Dialog[str]):
+class StorySelection(forms.Dialog[list]):
     
     def __init__(self, story):
         self.Title = 'Story Selection - extrude roof/ceilings'
         self.Resizable = True
         self.Width = 300
         self.m_dropdownlist = forms.DropDown()
-        self.m_dropdownlist.DataStore = story
+        self.m_dropdownlist.DataStore = [ALL_STORIES] + story
+        
+        self.m_depth_label = forms.Label(Text = 'Plenum depth ({})'.format(doc_unit))
+        self.m_depth = forms.NumericStepper()
+        self.m_depth.DecimalPlaces = 2
+        self.m_depth.MinValue = 0
+        self.m_depth.Value = 0.5
         
         self.m_button = forms.Button(Text = 'extrude roof/ceilings')
         self.m_button.Click += self.OnButtonClick
@@ -72,51 +92,63 @@ class StorySelection(forms.Dialog[str]):
         layout.Padding = drawing.Padding(10)
         layout.Spacing = drawing.Size(5, 5)
         layout.Add(self.m_dropdownlist)
+        layout.AddRow(self.m_depth_label, self.m_depth)
         layout.Add(self.m_button)
         
         self.Content = layout
     
     def OnButtonClick(self, s, e):
-        if self.m_dropdownlist.SelectedValue:
-            self.Close(self.m_dropdownlist.SelectedValue)
+        if self.m_dropdownlist.SelectedValue and self.m_depth.Value > 0:
+            self.Close([self.m_dropdownlist.SelectedValue, self.m_depth.Value])
+
+def extrude_face(face_and_depth):
+    """Get the closed solids on the outer side of a roof/ceiling face."""
+    face, depth = face_and_depth
+    # the offset follows the surface normal, not the face normal
+    if face.OrientationIsReversed:
+        depth = -depth
+    solids = Rhino.Geometry.Brep.CreateFromOffsetFace(face, depth, tol, False, True)
+    return [_ for _ in solids or [] if _ and _.IsValid and _.IsSolid]
 
 # TRANSFORMATION PART
 #---------------------------------------------------------------------------------------------#
 
-story = list(set([_.Data.HBObjectCopy.Story for _ in rooms]))
+story = story_index.stories()
 
 dialog = StorySelection(story)
 rc = dialog.ShowModal(Rhino.UI.RhinoEtoApp.MainWindow)
-
-properties = []
-for rm in rooms:
-    if rm.Data.HBObjectCopy.Story == rc:
-        for fc in rm.BrepGeometry.Faces:
-            fc_data = EntityHelper.TryGetFaceDataCopy(fc)
-            hb_obj = fc_data.HBObjectCopy
-            index = fc.ComponentIndex()
-            
-            # select only if roof ceiling
-            if hb_obj.FaceType == hb.FaceType.RoofCeiling:
-                
-                rm.SelectSubObject(index, True, True)
-
-existing_object = doc.Objects
-rooms = List[po.Objects.RoomObject]()
-
-# run ExtractSrf and ExtrudeSrf commands
-Rhino.RhinoApp.RunScript('ExtractSrf Copy=Yes _Enter', False)
-Rhino.RhinoApp.RunScript('ExtrudeSrf Solid=Yes DeleteInput=Yes', False)
-
-# unselect all
-doc.Objects.UnselectAll()
-
-# select elements added by the extrusion
-for obj in doc.Objects:
-    if obj not in existing_object.GetObjectList(Rhino.DocObjects.BrepObject):
-        ok = doc.Objects.Select(obj.Id)
-
-doc.Views.Redraw()
-
-# run the command to create rooms
-Rhino.RhinoApp.RunScript('PO_AddRooms Property=Custom _Enter', False)
+if not rc:
+    raise ValueError('No story selected.')
+selected_story, depth = rc
+selected_stories = story if selected_story == ALL_STORIES else [selected_story]
+
+# roof/ceiling faces of the rooms, read from the face data
+faces = []
+with timing.span('select_faces'):
+    for st in selected_stories:
+        for rm in story_index.rooms(doc, st):
+            for fc in rm.BrepGeometry.Faces:
+                fc_data = EntityHelper.TryGetFaceDataCopy(fc)
+                if fc_data is None: continue
+                if fc_data.HBObjectCopy.FaceType == hb.FaceType.RoofCeiling:
+                    faces.append((fc, depth))
+
+if not faces:
+    raise ValueError('No roof/ceiling faces found.')
+
+# pure geometry on all the cores, no command line round trips
+with timing.span('extrude'):
+    solids = parallel_map(extrude_face, faces)
+
+# create the rooms and add them all together
+room_commit = RoomCommit(doc, 'Create plenum by story')
+with timing.span('create_room'):
+    for breps in solids:
+        for brep in breps:
+            new_room = po.Objects.RoomObject(brep, tol)
+            new_room.Id = System.Guid.NewGuid()
+            room_commit.add_room(new_room)
+
+with timing.span('add_rooms'):
+    count = room_commit.commit()
+timing.finish(faces=len(faces), rooms=count)
\ No newline at end of file
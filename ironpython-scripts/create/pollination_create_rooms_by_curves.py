@@ -1,5 +1,21 @@
 """
 Create rooms from closed curves.
+------------------------------------------------------------------------------
+Instructions:
+    1. Run the script
+    2. Set the room properties, the height and the floors of each layer
+    3. Create the new rooms
+------------------------------------------------------------------------------
+Strategy:
+    1. Group the closed curves by layer and skip the stacked duplicates
+    2. Nest the planar curves, the curves inside another one are its holes
+       (courtyards, atria) and not rooms
+    3. Extrude and cap the floor plates to closed solids on all the cores
+    4. Create the Pollination Rooms of the first floor from the solids in
+       memory
+    5. Copy the rooms for the floors above, each floor gets the story
+       <layer>_Floor<n>, and add the rooms of each layer with one AddHBObjs
+       call. The copies are moved up once they are in the document
 """
 
 # import rhinocommon and Eto
@@ -21,6 +37,22 @@ import Honeybee.UI as hu
 from Core.Entity import ModelEntity
 from System.Collections.Generic import List
 
+# import shared modules
+import os
+import sys
+lib_path = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'lib')
+if lib_path not in sys.path: sys.path.append(lib_path)
+from pollination_scripts import timing
+timing.start('create_rooms_by_curves')
+
+try:  # import shared modules
+    from pollination_scripts.commit import RoomCommit
+    from pollination_scripts.floorplan import floor_solids, stack_rooms, \
+        floor_inputs, find_duplicates
+except ImportError as e:
+    raise ImportError('\nFailed to import:\n\t{}'.format(e))
+
 # SELECTION PART
 #---------------------------------------------------------------------------------------------#
 # doc info
@@ -55,10 +87,11 @@ class RoomGridView(forms.Dialog[list]):
         self.m_gridview.ShowHeader = True
         self.m_gridview.DataStore = data
         self.m_gridview.Height = 300
-        self.m_gridview.Width = 300 
+        self.m_gridview.Width = 500 
         self.m_gridview.CellDoubleClick += self.OnDoubleClickLayer
         
-        self._header = ('LayerName', 'Height ({})'.format(unit), 'Export')
+        self._header = ('LayerName', 'Height ({})'.format(unit), 'Export',
+                        'Floors', 'Floor to floor ({})'.format(unit))
         
         column1 = forms.GridColumn()
         column1.HeaderText = self._header[0]
@@ -73,6 +106,20 @@ class RoomGridView(forms.Dialog[list]):
         column2.Width = 95
         self.m_gridview.Columns.Add(column2)
         
+        column3 = forms.GridColumn()
+        column3.HeaderText = self._header[3]
+        column3.Editable = True
+        column3.DataCell = forms.TextBoxCell(4)
+        column3.Width = 60
+        self.m_gridview.Columns.Add(column3)
+        
+        column4 = forms.GridColumn()
+        column4.HeaderText = self._header[4]
+        column4.Editable = True
+        column4.DataCell = forms.TextBoxCell(5)
+        column4.Width = 135
+        self.m_gridview.Columns.Add(column4)
+        
         self.m_button = forms.Button(self.OnClickButton)
         self.m_button.Text = 'Run It!'
         
@@ -81,21 +128,32 @@ class RoomGridView(forms.Dialog[list]):
         layout.Spacing = drawing.Size(5, 5)
         layout.Add(forms.Label(Text = '1. Double click on a row to set room properties.'))
         layout.Add(forms.Label(Text = '2. One click on the height cell tso edit the room height.'))
+        layout.Add(forms.Label(Text = '3. Set more floors to stack the rooms. An empty floor to floor is the height.'))
         layout.Add(self.m_gridview)
         layout.Add(self.m_button)
         layout.Add(forms.Label(Text = 'Only planar closed curves are supported.'))
+        layout.Add(forms.Label(Text = 'Curves inside other curves are courtyards.'))
         self.Content = layout
     
     def OnClickButton(self, s, e):
         out_data = []
         
         for i, data in enumerate(self._data):
-            name, height, cecked, geometries = data
+            name, height, cecked, geometries, floors, floor_to_floor = data
             if geometries and self._data_dict.has_key(i):
+                # keep the dialog open until the numbers are right
+                try:
+                    height, floors, floor_to_floor = floor_inputs(
+                        height, floors, floor_to_floor)
+                except ValueError as err:
+                    forms.MessageBox.Show(self, 'Layer {}: {}'.format(name, err),
+                                          self.Title)
+                    return
                 out_data.append([name, 
                                 height,
                                 cecked,
-                                geometries, self._data_dict[i]])
+                                geometries, self._data_dict[i],
+                                floors, floor_to_floor])
         
         self.Close(out_data)
     
@@ -118,39 +176,42 @@ class RoomGridView(forms.Dialog[list]):
             self._data_dict[e.Row] = energy
             current_model.SetModelProperty(properties)
 
-def select_objects(layer_table_names):
-    objects = []
-    for layer in layer_table_names:
-        sub_objects = []
-        for obj in Rhino.RhinoDoc.ActiveDoc.Objects:
-            if layer_table_names[obj.Attributes.LayerIndex] == layer:
-                # planar closed curve only
-                geometry = obj.Geometry
-                if isinstance(geometry, Rhino.Geometry.Curve) \
-                and geometry.IsClosed and geometry.IsPlanar:
-                    sub_objects.append(geometry)
-        objects.append(sub_objects)
+def select_objects(layer_table):
+    """Group the closed curves by layer in a single pass."""
+    positions = dict((layer.Index, i) for i, layer in enumerate(layer_table))
+    objects = [[] for _ in layer_table]
+    
+    # let rhino skip all the objects that are not curves
+    settings = Rhino.DocObjects.ObjectEnumeratorSettings()
+    settings.ObjectTypeFilter = Rhino.DocObjects.ObjectType.Curve
+    for obj in doc.Objects.GetObjectList(settings):
+        i = positions.get(obj.Attributes.LayerIndex)
+        if i is None: continue
+        geometry = obj.Geometry
+        if isinstance(geometry, Rhino.Geometry.Curve) and geometry.IsClosed:
+            objects[i].append(geometry)
     return objects
 
-def create_solid(crv, height):
-    srf = Rhino.Geometry.Extrusion.CreateExtrusion(crv, 
-        Rhino.Geometry.Vector3d(0, 0, float(height))).ToBrep()
-    brep = srf.CapPlanarHoles(tol)
-    return brep
+skip_duplicates = True  # set to False to only report the duplicate curves
 
 # Get dataset
 layer_table = [_ for _ in Rhino.RhinoDoc.ActiveDoc.Layers if _.IsValid]
 layer_table_names = map(str, layer_table)
 heights = [default_height[doc_unit]] * len(layer_table_names)
 checked = [False] * len(layer_table_names)
+floors = [1] * len(layer_table_names)
+floor_to_floor = [''] * len(layer_table_names)  # empty is the height
 
 # prepare geometries
-geometries = select_objects(layer_table_names)
+with timing.span('selection'):
+    geometries = select_objects(layer_table)
 
-data = [[n, h, c, g] for n, h, c, g in zip(layer_table_names, 
-                                           heights, 
-                                           checked, 
-                                           geometries)]
+data = [list(_) for _ in zip(layer_table_names, 
+                             heights, 
+                             checked, 
+                             geometries,
+                             floors,
+                             floor_to_floor)]
 
 # run eto
 dialog = RoomGridView(data)
@@ -158,27 +219,44 @@ rc = dialog.ShowModal(Rhino.UI.RhinoEtoApp.MainWindow)
 
 if rc:
     # create pollination rooms
+    count = 0
     for dt in rc:
-        name, height, checked, geometries, properties = dt
+        # the dialog already checked the numbers with floor_inputs
+        name, height, checked, geometries, properties, floors, floor_to_floor = dt
         
-        # create a List of rooms
-        rooms = List[po.Objects.RoomObject]()
-        
-        for geo in geometries:
-            geo = create_solid(geo, height)
-            if (geo is None or not geo.IsValid or not geo.IsSolid): continue
-            test = doc.Objects.AddBrep(geo)
-            brep_object = doc.Objects.Find(test)
-            
-            if brep_object:
-                brep = Rhino.Geometry.Brep.TryConvertBrep(brep_object.Geometry)
+        # curves on top of each other within the tolerance make one room
+        with timing.span('duplicates'):
+            groups = find_duplicates(geometries, tol)
+        if groups:
+            print '{}: {} duplicate curves{}.'.format(
+                name, sum(len(_) - 1 for _ in groups),
+                ' skipped' if skip_duplicates else '')
+            if skip_duplicates:
+                duplicates = set(i for group in groups for i in group[1:])
+                geometries = [crv for i, crv in enumerate(geometries)
+                              if i not in duplicates]
+        
+        # planar closed curves only, with their holes, pure geometry on all the cores
+        with timing.span('create_solid'):
+            breps = floor_solids(geometries, height, tol)
+        
+        # the rooms of the first floor are made from the breps in memory
+        with timing.span('create_room'):
+            rooms = []
+            for brep in breps:
                 new_room = po.Objects.RoomObject(brep, tol)
                 new_room.SetEnergyProp(properties)
-                
-                # Add rooms
-                new_room.Id = brep_object.Id
-                rooms.Add(new_room)
-        
-        if rooms:
-            ModelEntity.AddHBObjs(doc, rooms)
-doc.Views.Redraw()
\ No newline at end of file
+                rooms.append(new_room)
+        
+        # the floors above are copies of the first one
+        room_commit = RoomCommit(doc, 'Create rooms by curves - {}'.format(name))
+        with timing.span('stack'):
+            stack_rooms(rooms, name, floors, floor_to_floor, room_commit)
+        
+        # Add rooms
+        with timing.span('commit'):
+            count += room_commit.commit()
+    print '{} rooms created.'.format(count)
+    timing.finish(rooms=count)
+else:
+    timing.finish()
\ No newline at end of file
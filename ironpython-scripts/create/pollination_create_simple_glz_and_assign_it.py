@@ -26,6 +26,15 @@ from Core.Entity import ModelEntity
 # import List collection
 from System.Collections.Generic import List
 
+# import shared modules
+import os
+import sys
+lib_path = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'lib')
+if lib_path not in sys.path: sys.path.append(lib_path)
+from pollination_scripts import timing
+timing.start('create_simple_glz_and_assign_it')
+
 # USER PARAMETERS
 # --------------------------------------------------------------------------------------------#
 # custom window simple glass ID, U, SHGC, DisplayName, VLT
@@ -52,7 +61,8 @@ go.AcceptNothing(True)
 go.GetMultiple(0, 0)
 
 # filter by rooms
-rooms = [_.Object() for _ in go.Objects() if isinstance(_.Object(), po.Objects.RoomObject)]
+with timing.span('selection'):
+    rooms = [_.Object() for _ in go.Objects() if isinstance(_.Object(), po.Objects.RoomObject)]
 
 if not rooms:
     raise ValueError('Please, select pollination rooms')
@@ -86,9 +96,11 @@ if window_construction.Identifier not in identifiers:
     hb.Extension.AddConstruction(properties.Energy, window_construction)
 
 # apply my custom window abridged construcition to apertures of the selected rooms
-for rm in rooms:
-    for apt in rm.Apertures:
-        obj = apt.Object()
-        apt_copy = obj.DuplicateApertureObject()
-        apt_copy.SetConstruction(window_construction.Identifier)
-        doc.Objects.Replace(Rhino.DocObjects.ObjRef(obj.Id), apt_copy)
+with timing.span('assign_construction'):
+    for rm in rooms:
+        for apt in rm.Apertures:
+            obj = apt.Object()
+            apt_copy = obj.DuplicateApertureObject()
+            apt_copy.SetConstruction(window_construction.Identifier)
+            doc.Objects.Replace(Rhino.DocObjects.ObjRef(obj.Id), apt_copy)
+timing.finish(rooms=len(rooms))
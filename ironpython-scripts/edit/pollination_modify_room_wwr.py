@@ -22,8 +22,17 @@ import Core.Convert as co # RhinoObject <> HB Schema
 from Core.Entity import EntityHelper, ModelEntity
 from System.Collections.Generic import List
 
+# import shared modules
+import os
+import sys
+lib_path = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'lib')
+if lib_path not in sys.path: sys.path.append(lib_path)
+from pollination_scripts import timing
+timing.start('modify_room_wwr')
+
 # STRATEGY
-# Pollination rooms > JSON > Honeybee rooms > JSON > Pollination rooms
+# Pollination rooms > Honeybee rooms > Pollination rooms
 
 # SELECTION PART
 #---------------------------------------------------------------------------------------------#
@@ -46,7 +55,8 @@ go.AcceptNothing(True)
 go.GetMultiple(0, 0)
 
 # filter by rooms
-rooms = [_.Object() for _ in go.Objects() if isinstance(_.Object(), po.Objects.RoomObject)]
+with timing.span('selection'):
+    rooms = [_.Object() for _ in go.Objects() if isinstance(_.Object(), po.Objects.RoomObject)]
 
 if not rooms:
     raise ValueError('No rooms found.')
@@ -54,127 +64,75 @@ if not rooms:
 # HONEYBEE PART
 #---------------------------------------------------------------------------------------------#
 try:  # import dependencies
-    import json
-    from itertools import groupby
-    import honeybee.dictutil as hb_dict_util
-    from honeybee.boundarycondition import Outdoors
-    from honeybee.facetype import Wall
-    from ladybug_geometry.geometry3d.face import Face3D
     from ladybug_rhino.fromgeometry import from_face3d
-    from honeybee.orientation import check_matching_inputs, angles_from_num_orient, \
-    inputs_by_index, face_orient_index
+    from pollination_scripts.cache import get_hb_room
+    from pollination_scripts.commit import RoomCommit
+    from pollination_scripts.subfaces import get_subface_cache
+    from pollination_scripts.wwr import get_faces_group_by_orientation, \
+    get_current_wwr, get_orientation_face3ds
 except ImportError as e:
     raise ImportError('\nFailed to import:\n\t{}'.format(e))
 
-def is_outdoor_and_wall(face):
-    return isinstance(face.boundary_condition, Outdoors) and \
-        isinstance(face.type, Wall)
-
-def has_aperture(face):
-    if face.apertures: 
-        return True
-    return False
+def get_orientation_breps(faces, ratio):
+    """Get the (room identifier, brep) of the new apertures."""
+    with timing.span('sub_faces'):
+        face3ds = get_orientation_face3ds(faces, ratio, tol)
+    with timing.span('from_face3d'):
+        return [(room_id, from_face3d(geo)) for room_id, geo in face3ds]
 
-def divide_by_orientation(angles, face):
-    if is_outdoor_and_wall(face):
-        orient_i = face_orient_index(face, angles)
-        out_face = (orient_i, face)
-        
-        return out_face
-
-def create_brep_from_ratio(face, rat):
-    breps = []
-    if face is None:
-        return None
+# preview of the new apertures, the document is not touched
+class AperturePreview(Rhino.Display.DisplayConduit):
     
-    if is_outdoor_and_wall(face) and has_aperture(face):
-        face3ds = face.geometry.sub_faces_by_ratio_rectangle(rat, tol)
-        if not face3ds: return
-        
-        for geo in face3ds:
-            brep = from_face3d(geo)
-            breps.append(brep)
-    return breps
-
-def get_faces_group_by_orientation(hb_rooms, num_orient=4):
-    # duplicate the initial objects
-    hb_objs = [obj.duplicate() for obj in hb_rooms]
-    
-    # get a list of angles used to categorize the faces
-    angles = angles_from_num_orient(num_orient)
+    def __init__(self, group_faces, in_ratio):
+        self.group_faces = group_faces
+        self.in_ratio = in_ratio
+        self.breps = {}  # orientation > (ratio, breps, meshes)
+        self.bbox = Rhino.Geometry.BoundingBox.Empty
+        self.material = Rhino.Display.DisplayMaterial(System.Drawing.Color.LightSkyBlue, 0.4)
+        self.color = System.Drawing.Color.SteelBlue
     
-    # loop through the input objects and add apertures
-    # add default 4 orientation
-    aperture_geometries = [(0, None), (1, None), (2, None), (3, None)]
-    for obj in hb_objs:
-        apertures = []
-        for face in obj.faces:
-            brep = divide_by_orientation(angles, face)
-            if brep:
-                apertures.append(brep)
+    def update(self, orient_i, ratio):
+        """Recompute the apertures of one orientation if its ratio changed."""
+        if orient_i in self.breps and self.breps[orient_i][0] == ratio:
+            return
+        breps = []
+        if self.in_ratio[orient_i] != 0:
+            breps = get_orientation_breps(self.group_faces[orient_i], ratio)
         
-        aperture_geometries.extend(apertures)
-    
-    # sort the apertures
-    aperture_geometries = sorted(aperture_geometries)
-    apt_iterator = groupby(aperture_geometries, lambda _: _[0])
-    
-    # get faces with apertures by orientation
-    group_faces = []
-    group_angles = []
-    for key, group in apt_iterator:
-        group_faces.append([_[1] for _ in group])
-        group_angles.append(angles[key])
+        # meshes are drawn much faster than breps on each frame
+        meshes = []
+        for _, brp in breps:
+            meshes.extend(Rhino.Geometry.Mesh.CreateFromBrep(
+                brp, Rhino.Geometry.MeshingParameters.Coarse) or [])
+        self.breps[orient_i] = (ratio, breps, meshes)
         
-    return group_faces
-
-def get_current_wwr(group_faces, overall = False):
-    # N E S W
-    in_ratios = []
+        self.bbox = Rhino.Geometry.BoundingBox.Empty
+        for _, _, meshes in self.breps.values():
+            for mesh in meshes:
+                self.bbox.Union(mesh.GetBoundingBox(False))
     
-    for faces in group_faces:
-        face_apt_area = []
-        face_wall_area = []
-        ratio = 0
-        
-        for face in faces:
-            if face is None:
-                continue
-            if not has_aperture(face) and not overall:
-                continue
-            face_wall_area.append(face.area)
-            face_apt_area.append(face.aperture_area)
-        
-        aperture_area = sum(face_apt_area)
-        wall_area = sum(face_wall_area)
-        
-        # avoid divided by 0
-        if not wall_area:
-            wall_area = 1
-        ratio = round(aperture_area / wall_area, 2)
-        
-        in_ratios.append(ratio)
-    return in_ratios
-
-def get_aperture_breps(group_faces, in_ratio, out_ratio):
-    breps = []
-    for i, faces in enumerate(group_faces):
-        apertures = []
-        if in_ratio[i] == 0:#or in_ratio[i] == out_ratio[i]:
-            continue
-        
-        for face in faces:
-            brep = create_brep_from_ratio(face, out_ratio[i])
-            if brep:
-                apertures.extend(brep)
-        breps.extend(apertures)
+    def room_breps(self, out_ratio):
+        """Get a dictionary with the breps of each room identifier."""
+        room_breps = {}
+        for i, ratio in enumerate(out_ratio):
+            self.update(i, ratio)
+            for room_id, brp in self.breps[i][1]:
+                room_breps.setdefault(room_id, []).append(brp)
+        return room_breps
     
-    return breps
+    def CalculateBoundingBox(self, e):
+        e.IncludeBoundingBox(self.bbox)
+    
+    def PostDrawObjects(self, e):
+        for _, _, meshes in self.breps.values():
+            for mesh in meshes:
+                e.Display.DrawMeshShaded(mesh, self.material)
+                e.Display.DrawMeshWires(mesh, self.color)
 
 # define Eto window
 class RatioSelection(forms.Dialog[list]):
     
-    def __init__(self, in_ratio, overall_ratio):
+    def __init__(self, in_ratio, overall_ratio, preview):
         self.Title = 'WWR Editor'
         self.Resizable = True
         self.Width = 400
@@ -182,6 +140,13 @@ class RatioSelection(forms.Dialog[list]):
         min_v = 0
         max_v = 95
         
+        # slider changes are previewed once they stop for a moment
+        self.preview = preview
+        self.dirty = set()
+        self.timer = forms.UITimer()
+        self.timer.Interval = 0.15
+        self.timer.Elapsed += self.OnPreviewTimer
+        
         in_ratio = map(lambda n: int(n * 100), in_ratio)
         overall_ratio = map(lambda n: int(n * 100), overall_ratio)
         
@@ -238,69 +203,103 @@ class RatioSelection(forms.Dialog[list]):
     
     def OnUpdateNorthLabel(self, s, e):
         self.m_n_label.Text = 'North: rel. {}%'.format(s.Value)
+        self.SchedulePreview(0)
     
     def OnUpdateEastLabel(self, s, e):
         self.m_e_label.Text = 'East: rel. {}%'.format(s.Value)
+        self.SchedulePreview(1)
     
     def OnUpdateSouthLabel(self, s, e):
         self.m_s_label.Text = 'South: rel. {}%'.format(s.Value)
+        self.SchedulePreview(2)
     
     def OnUpdateWestLabel(self, s, e):
         self.m_w_label.Text = 'West: rel. {}%'.format(s.Value)
+        self.SchedulePreview(3)
     
-    def OnButtonClick(self, s, e):
-        values = [self.m_n_slider.Value, self.m_e_slider.Value, 
+    def GetValues(self):
+        return [self.m_n_slider.Value, self.m_e_slider.Value, 
         self.m_s_slider.Value, self.m_w_slider.Value]
-        self.Close(values)
+    
+    def SchedulePreview(self, orient_i):
+        self.dirty.add(orient_i)
+        self.timer.Stop()
+        self.timer.Start()
+    
+    def OnPreviewTimer(self, s, e):
+        self.timer.Stop()
+        values = self.GetValues()
+        with timing.span('preview'):
+            for i in self.dirty:
+                self.preview.update(i, values[i] / 100.0)
+        self.dirty.clear()
+        doc.Views.Redraw()
+    
+    def OnButtonClick(self, s, e):
+        self.timer.Stop()
+        self.Close(self.GetValues())
 
 # GO BACK TO POLLINATION RHINO
 #---------------------------------------------------------------------------------------------#
 
 # create objects first
-hb_rooms = []
-for rm in rooms:
-    hb_dict = json.loads(rm.ToHBObject().ToJson() )
-    hb_obj = hb_dict_util.dict_to_object(hb_dict, False)
-    if not hb_obj: raise ValueError(e)
-    hb_rooms.append(hb_obj)
+with timing.span('convert'):
+    hb_rooms = [get_hb_room(doc, rm) for rm in rooms]
 
-face_group = get_faces_group_by_orientation(hb_rooms)
-in_ratio = get_current_wwr(face_group)
-overall_ratio = get_current_wwr(face_group, True)
+with timing.span('orientation'):
+    face_group = get_faces_group_by_orientation(hb_rooms)
+    in_ratio = get_current_wwr(face_group)
+    overall_ratio = get_current_wwr(face_group, True)
 
-# run eto here
-dialog = RatioSelection(in_ratio, overall_ratio)
-rc = dialog.ShowModal(Rhino.UI.RhinoEtoApp.MainWindow)
-out_ratio = map(lambda n: n / 100, rc)
+# run eto here, the viewports stay live for the preview
+preview = AperturePreview(face_group, in_ratio)
+preview.Enabled = True
+try:
+    dialog = RatioSelection(in_ratio, overall_ratio, preview)
+    rc = Rhino.UI.EtoExtensions.ShowSemiModal(dialog, doc, Rhino.UI.RhinoEtoApp.MainWindow)
+finally:
+    preview.Enabled = False
+    doc.Views.Redraw()
 
-breps = get_aperture_breps(face_group, in_ratio, out_ratio)
+if not rc:
+    raise ValueError('No WWR selected.')
+out_ratio = map(lambda n: n / 100.0, rc)
 
-if not breps:
+# the orientations already in the preview are not computed again
+room_breps = preview.room_breps(out_ratio)
+
+if not room_breps:
     raise ValueError('No apertures.')
 
-for rm in rooms:
-    # delete all apertures
-    for apt in rm.Apertures:
-        doc.Objects.Delete(apt, True)
-    
-    # create new apertures
-    apertures = []
-    for brp in breps:
-        apt = po.Objects.ApertureObject(brp)
-        apt.Id = System.Guid.NewGuid()
-        apertures.append(apt)
-    
-    # add new apertures
-    new_room, added_apts = rm.AddApertures(apertures, tol, a_tol)
-    if not added_apts: continue
-    
-    for apt in added_apts: 
-        doc.Objects.AddRhinoObject(apt)
-    
-    # create a List of rooms
-    new_room.Id = rm.Id
-    rooms = List[po.Objects.RoomObject]()
-    rooms.Add(new_room)
-    
-    ModelEntity.UpdateHBObjs(doc, rooms)
-doc.Views.Redraw()
+room_commit = RoomCommit(doc, 'Modify room WWR')
+try:
+    for rm, hb_room in zip(rooms, hb_rooms):
+        # delete all apertures, before AddApertures like the Pollination commands
+        for apt in rm.Apertures:
+            room_commit.delete_now(apt)
+        
+        # each room only gets the apertures of its own faces
+        breps = room_breps.get(hb_room.identifier, [])
+        
+        # create new apertures
+        apertures = []
+        for brp in breps:
+            apt = po.Objects.ApertureObject(brp)
+            apt.Id = System.Guid.NewGuid()
+            apertures.append(apt)
+        
+        # add new apertures
+        with timing.span('AddApertures'):
+            new_room, added_apts = rm.AddApertures(apertures, tol, a_tol)
+        if not added_apts: continue
+        
+        # collect the changes and add them all together
+        room_commit.add_apertures(added_apts)
+        room_commit.update_room(new_room, rm.Id)
+finally:
+    # the old apertures are already deleted, always close the undo record
+    with timing.span('commit'):
+        room_commit.commit()
+subface_cache = get_subface_cache()
+timing.finish(rooms=len(rooms), subface_hits=subface_cache.hits,
+              subface_misses=subface_cache.misses)
@@ -1,15 +1,15 @@
 """
-Move face of all ceiling or roof of a model story
+Move face of all ceiling or roof of one or more model stories
 ------------------------------------------------------------------------------
 Instructions:
     1. Run the script
-    2. Select the story
-    3. Move it
+    2. Check the stories and set the distance
+    3. Move them
 ------------------------------------------------------------------------------
 Strategy:
     1. Get all Pollination Rooms
     2. Get all Pollination Room Story
-    3. Use RhinoApp MoveFace
+    3. Offset the roof/ceiling faces and move the stories above in one batch
 """
 
 # import rhinocommon and Eto
@@ -31,12 +31,23 @@ from Core.Entity import EntityHelper
 # import List collection
 from System.Collections.Generic import List
 
+# import shared modules
+import os
+import sys
+lib_path = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'lib')
+if lib_path not in sys.path: sys.path.append(lib_path)
+from pollination_scripts import timing
+timing.start('move_roof_by_story')
+
 try:  # import honeybee dependencies
     import io
     import csv
     import json
     import honeybee.dictutil as hb_dict_util
     from honeybee.room import Room
+    from pollination_scripts.story import get_story_index
+    from pollination_scripts.roof import offset_roof_ceilings
 except ImportError as e:
     raise ImportError('\nFailed to import:\n\t{}'.format(e))
 
@@ -49,24 +60,31 @@ a_tol = doc.ModelAngleToleranceRadians
 current_model = po.Entity.ModelEntityTable.Instance.CurrentModelEntity
 doc_unit = Rhino.RhinoDoc.ActiveDoc.ModelUnitSystem
 
-# get all objects
-objects = Rhino.RhinoDoc.ActiveDoc.Objects
-
-# filter by rooms
-rooms = [_ for _ in objects if isinstance(_, po.Objects.RoomObject)]
+# rooms by story
+with timing.span('story_index'):
+    story_index = get_story_index(doc, po.Objects.RoomObject)
 
-if not rooms:
+if not len(story_index):
     raise ValueError('No rooms found.')
 
 # define Eto window
-class StorySelection(forms.Dialog[str]):
+class StorySelection(forms.Dialog[list]):
     
     def __init__(self, story):
         self.Title = 'Story Selection - move roof/ceilings'
         self.Resizable = True
         self.Width = 300
-        self.m_dropdownlist = forms.DropDown()
-        self.m_dropdownlist.DataStore = story
+        self.m_checkboxlist = forms.CheckBoxList()
+        self.m_checkboxlist.DataStore = story
+        self.m_checkboxlist.Orientation = forms.Orientation.Vertical
+        
+        self.m_distance_label = forms.Label(Text = 'Distance ({})'.format(doc_unit))
+        self.m_distance = forms.NumericStepper()
+        self.m_distance.DecimalPlaces = 2
+        self.m_distance.Value = 0.5
+        
+        self.m_move_above = forms.CheckBox(Text = 'Move the stories above')
+        self.m_move_above.Checked = True
         
         self.m_button = forms.Button(Text = 'Move roof/ceilings')
         self.m_button.Click += self.OnButtonClick
@@ -74,35 +92,30 @@ class StorySelection(forms.Dialog[str]):
         layout = forms.DynamicLayout()
         layout.Padding = drawing.Padding(10)
         layout.Spacing = drawing.Size(5, 5)
-        layout.Add(self.m_dropdownlist)
+        layout.Add(forms.Scrollable(Content = self.m_checkboxlist, Height = 200))
+        layout.AddRow(self.m_distance_label, self.m_distance)
+        layout.Add(self.m_move_above)
         layout.Add(self.m_button)
         
         self.Content = layout
     
     def OnButtonClick(self, s, e):
-        if self.m_dropdownlist.SelectedValue:
-            self.Close(self.m_dropdownlist.SelectedValue)
+        stories = list(self.m_checkboxlist.SelectedValues)
+        if stories and self.m_distance.Value:
+            self.Close([stories, self.m_distance.Value, self.m_move_above.Checked])
 
 # TRANSFORMATION PART
 #---------------------------------------------------------------------------------------------#
 
-story = list(set([_.Data.HBObjectCopy.Story for _ in rooms]))
+story = story_index.stories()
 
 dialog = StorySelection(story)
 rc = dialog.ShowModal(Rhino.UI.RhinoEtoApp.MainWindow)
+if not rc:
+    raise ValueError('No story selected.')
+stories, distance, move_above = rc
 
-for rm in rooms:
-    if rm.Data.HBObjectCopy.Story == rc:
-        for fc in rm.BrepGeometry.Faces:
-            fc_data = EntityHelper.TryGetFaceDataCopy(fc)
-            hb_obj = fc_data.HBObjectCopy
-            index = fc.ComponentIndex()
-            
-            # select only if roof ceiling
-            if hb_obj.FaceType == hb.FaceType.RoofCeiling:
-                rm.SelectSubObject(index, True, True)
-
-# run moveface command using the automatic selection
-Rhino.RhinoApp.RunScript('MoveFace', False)
-doc.Objects.UnselectAll()
-doc.Views.Redraw()
\ No newline at end of file
+with timing.span('offset'):
+    count = offset_roof_ceilings(doc, story_index, stories, distance, tol, a_tol,
+                                 move_above == True)
+timing.finish(stories=len(stories), rooms=count)
\ No newline at end of file
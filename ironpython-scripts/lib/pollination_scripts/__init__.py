@@ -0,0 +1,14 @@
+"""
+Shared modules used by the Pollination rhino scripts.
+------------------------------------------------------------------------------
+Usage:
+    Add the lib folder to sys.path at the top of the script and import the
+    module that you need.
+
+    lib_path = os.path.join(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__))), 'lib')
+    if lib_path not in sys.path: sys.path.append(lib_path)
+------------------------------------------------------------------------------
+The modules must run both in Rhino IronPython and in CPython, so keep the
+RhinoCommon and Pollination imports inside the functions that need them.
+"""
@@ -0,0 +1,113 @@
+"""
+Cache of the honeybee rooms converted from Pollination rooms.
+------------------------------------------------------------------------------
+Strategy:
+    1. Keep one LRU cache per Rhino document in the session sticky
+    2. Drop a room when the document replaces or deletes its object
+    3. Check a fingerprint of the room before using a cached value in case an
+       event was missed (e.g. rooms changed before the first script run)
+
+The cached rooms are shared between the script runs. Duplicate them before
+changing them.
+"""
+
+from collections import OrderedDict
+
+from pollination_scripts import session, events
+from pollination_scripts.convert import room_from_room_object
+
+DEFAULT_SIZE = 20000
+
+
+class RoomCache(object):
+    """LRU cache of honeybee rooms keyed by the Id of the Pollination room."""
+
+    def __init__(self, max_size=DEFAULT_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._rooms = OrderedDict()
+
+    def __len__(self):
+        return len(self._rooms)
+
+    def get(self, room_id, fingerprint):
+        """Get the cached room or None if it is missing or out of date."""
+        value = self._rooms.pop(room_id, None)
+        if value is None or value[0] != fingerprint:
+            self.misses += 1
+            return None
+        self._rooms[room_id] = value  # most recently used goes last
+        self.hits += 1
+        return value[1]
+
+    def set(self, room_id, fingerprint, hb_room):
+        self._rooms.pop(room_id, None)
+        self._rooms[room_id] = (fingerprint, hb_room)
+        while len(self._rooms) > self.max_size:
+            self._rooms.popitem(last=False)
+
+    def discard(self, room_id):
+        self._rooms.pop(room_id, None)
+
+    def clear(self):
+        self._rooms.clear()
+
+
+def _sub_object_key(obj_ref):
+    """Get the Id and the runtime serial number of an aperture or a door.
+
+    Moving or renaming a sub-object replaces only its own object, so its serial
+    number changes while the room keeps its own.
+    """
+    obj = obj_ref.Object()
+    return str(obj_ref.ObjectId), obj.RuntimeSerialNumber if obj is not None else None
+
+
+def room_fingerprint(room_object):
+    """Get a cheap fingerprint of the geometry and attributes of a room.
+
+    The runtime serial number changes every time Rhino replaces the object, so
+    it covers the edits done through ModelEntity.UpdateHBObjs. The serial
+    numbers of the apertures and doors cover their own edits.
+    """
+    brep = room_object.BrepGeometry
+    bbox = brep.GetBoundingBox(False)
+    hb_obj = room_object.Data.HBObjectCopy
+    return (
+        room_object.RuntimeSerialNumber,
+        brep.Faces.Count, brep.Vertices.Count,
+        bbox.Min.X, bbox.Min.Y, bbox.Min.Z, bbox.Max.X, bbox.Max.Y, bbox.Max.Z,
+        hb_obj.Identifier, hb_obj.DisplayName, hb_obj.Story, hb_obj.Multiplier,
+        tuple(_sub_object_key(_) for _ in room_object.Apertures),
+        tuple(_sub_object_key(_) for _ in room_object.Doors)
+    )
+
+
+def _discard_room(doc, object_id, rhino_object):
+    get_room_cache(doc).discard(str(object_id))
+
+
+def get_room_cache(doc):
+    """Get the room cache of a Rhino document."""
+    events.subscribe('replace', 'room_cache', _discard_room)
+    events.subscribe('delete', 'room_cache', _discard_room)
+    return session.document_store(doc, 'room_cache', RoomCache)
+
+
+def get_hb_room(doc, room_object, fingerprint=room_fingerprint):
+    """Get the honeybee Room of a Pollination room using the cache.
+
+    Args:
+        doc: The RhinoDoc of the room.
+        room_object: A Pollination RoomObject.
+        fingerprint: A function to get the fingerprint of the room.
+    """
+    cache = get_room_cache(doc)
+    room_id = str(room_object.Id)
+    room_fp = fingerprint(room_object)
+    hb_room = cache.get(room_id, room_fp)
+    if hb_room is None:
+        hb_room = room_from_room_object(room_object)
+        cache.set(room_id, room_fp, hb_room)
+    return hb_room
@@ -0,0 +1,141 @@
+"""
+Push the room edits of a script to the Rhino document in one batch.
+------------------------------------------------------------------------------
+Strategy:
+    1. Collect the deleted and moved objects, the new apertures and the
+       changed rooms
+    2. Open a single undo record and suspend the redraw. delete_now and
+       transform_now open it early for the objects that must change before
+       the next step
+    3. Delete, move, add the apertures, call ModelEntity.UpdateHBObjs
+       once for the changed rooms and ModelEntity.AddHBObjs once for the new
+       rooms. Then move the new rooms that were added with a transform
+"""
+
+
+def _net_room_list(rooms):
+    """Get a List[RoomObject] for the Pollination API."""
+    import clr
+    clr.AddReference('Pollination.Core.dll')
+    import Core as po
+    from System.Collections.Generic import List
+    room_list = List[po.Objects.RoomObject]()
+    for rm in rooms:
+        room_list.Add(rm)
+    return room_list
+
+
+def _model_entity():
+    import clr
+    clr.AddReference('Pollination.Core.dll')
+    from Core.Entity import ModelEntity
+    return ModelEntity
+
+
+class RoomCommit(object):
+    """Collect room updates and apply them to the document at once.
+
+    Args:
+        doc: The RhinoDoc to update.
+        description: Text for the undo record.
+        model_entity: Optional object with UpdateHBObjs and AddHBObjs.
+            Default is the Pollination ModelEntity.
+        room_list: Optional function to turn a list of rooms into the
+            collection expected by UpdateHBObjs and AddHBObjs.
+    """
+
+    def __init__(self, doc, description='Pollination script',
+                 model_entity=None, room_list=None):
+        self.doc = doc
+        self.description = description
+        self._model_entity = model_entity
+        self._room_list = room_list or _net_room_list
+        self.deleted = []
+        self.transformed = []
+        self.apertures = []
+        self.rooms = []
+        self.new_rooms = []
+        self.new_transformed = []
+        self._undo = None  # serial number of the open undo record
+
+    def _open(self):
+        if self._undo is None:
+            self._undo = self.doc.BeginUndoRecord(self.description) or 0
+            self.doc.Views.RedrawEnabled = False
+
+    def delete_now(self, obj):
+        """Delete a document object right away, in the undo record of the commit.
+
+        Use it for the objects that must be gone before the room is edited
+        (e.g. the old apertures before RoomObject.AddApertures).
+        """
+        self._open()
+        self.doc.Objects.Delete(obj, True)
+
+    def delete(self, obj):
+        """Delete a document object (e.g. an ObjRef of an old aperture)."""
+        self.deleted.append(obj)
+
+    def transform(self, object_id, xform):
+        """Transform a document object. The object keeps its type and data."""
+        self.transformed.append((object_id, xform))
+
+    def transform_now(self, object_id, xform):
+        """Transform a document object right away, in the undo record of the commit.
+
+        Returns:
+            The moved document object.
+        """
+        self._open()
+        return self.doc.Objects.FindId(self.doc.Objects.Transform(object_id, xform, True))
+
+    def add_apertures(self, apertures):
+        self.apertures.extend(apertures)
+
+    def update_room(self, new_room, room_id):
+        """Replace the room with room_id with new_room."""
+        new_room.Id = room_id
+        self.rooms.append(new_room)
+
+    def add_room(self, new_room, xform=None):
+        """Add a room that is not in the document yet.
+
+        Args:
+            new_room: The new RoomObject.
+            xform: Optional transform of the room once it is in the document
+                (e.g. to move a copy of another new room).
+        """
+        self.new_rooms.append(new_room)
+        if xform is not None:
+            self.new_transformed.append((new_room.Id, xform))
+
+    def commit(self):
+        """Apply all the collected changes and redraw the views once."""
+        doc = self.doc
+        self._open()
+        try:
+            for obj in self.deleted:
+                doc.Objects.Delete(obj, True)
+            for object_id, xform in self.transformed:
+                doc.Objects.Transform(object_id, xform, True)
+            for apt in self.apertures:
+                doc.Objects.AddRhinoObject(apt)
+            model_entity = self._model_entity or _model_entity()
+            if self.rooms:
+                model_entity.UpdateHBObjs(doc, self._room_list(self.rooms))
+            if self.new_rooms:
+                model_entity.AddHBObjs(doc, self._room_list(self.new_rooms))
+            for object_id, xform in self.new_transformed:
+                doc.Objects.Transform(object_id, xform, True)
+        finally:
+            doc.Views.RedrawEnabled = True
+            if self._undo:
+                doc.EndUndoRecord(self._undo)
+            self._undo = None
+            doc.Views.Redraw()
+
+        count = len(self.rooms) + len(self.new_rooms)
+        self.deleted, self.transformed = [], []
+        self.apertures, self.rooms, self.new_rooms = [], [], []
+        self.new_transformed = []
+        return count
@@ -0,0 +1,250 @@
+"""
+Energy constructions of the model library without serializing the model.
+------------------------------------------------------------------------------
+Strategy:
+    1. Index the materials of HBModelProperties.Energy by identifier
+    2. Convert each construction and only the materials its layers use
+    3. Keep the thermal metrics of each construction in the session sticky,
+       keyed by fields read from the schema objects: the type, the
+       identifier and the hash of the construction and of each material it
+       uses
+
+Nothing else of the model is converted, so the time does not depend on the
+number of rooms. Constructions that did not change since the last run are
+not serialized or converted at all. The HoneybeeSchema objects hash by their
+values, and an object that was replaced hashes differently anyway.
+"""
+
+try:  # import honeybee dependencies
+    import json
+    from collections import OrderedDict
+    from honeybee_energy.construction.dictutil import dict_to_construction, \
+        dict_abridged_to_construction
+    from honeybee_energy.material.dictutil import dict_to_material
+    from honeybee_energy.construction.window import WindowConstruction
+    from honeybee_energy.construction.windowshade import WindowConstructionShade
+except ImportError as e:
+    raise ImportError('\nFailed to import:\n\t{}'.format(e))
+
+from pollination_scripts import session
+
+DEFAULT_SIZE = 50000
+_CACHE = 'pollination_scripts.construction_metrics'
+
+# types that are not converted by default, they have no layers to report and
+# need the schedules of the model
+SKIPPED_TYPES = (
+    'AirBoundaryConstruction', 'AirBoundaryConstructionAbridged',
+    'ShadeConstruction', 'WindowConstructionDynamicAbridged'
+)
+
+
+def _items(collection):
+    """Return an empty tuple for the null collections of HoneybeeSchema."""
+    return collection if collection is not None else ()
+
+
+def _unwrap(obj):
+    """Get the object inside a HoneybeeSchema AnyOf."""
+    return getattr(obj, 'Obj', obj)
+
+
+def material_ids(constr_dict):
+    """Get the identifiers of the materials used by an abridged construction."""
+    ids = []
+    for key, value in constr_dict.items():
+        if key == 'materials':
+            ids.extend(value)
+        elif key in ('shade_material', 'frame') and value \
+                and not isinstance(value, dict):
+            ids.append(value)
+        elif isinstance(value, dict):
+            ids.extend(material_ids(value))
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, dict):
+                    ids.extend(material_ids(item))
+    return ids
+
+
+class _Library(object):
+    """Materials of the model library converted on demand."""
+
+    def __init__(self, energy_properties):
+        self._schema = {}
+        for mat in _items(energy_properties.Materials):
+            mat = _unwrap(mat)
+            self._schema[mat.Identifier] = mat
+        self._json = {}
+        self.materials = {}
+
+    def material_key(self, mat_id):
+        """Get the cache key part of a material. None if it is missing."""
+        mat = self._schema.get(mat_id)
+        return (mat_id, hash(mat)) if mat is not None else (mat_id, None)
+
+    def material_json(self, mat_id):
+        if mat_id not in self._json:
+            self._json[mat_id] = self._schema[mat_id].ToJson()
+        return self._json[mat_id]
+
+    def construction(self, constr_dict):
+        """Get a honeybee-energy construction from its dictionary.
+
+        Raises:
+            ValueError: If the construction uses a material that is not in the
+                library.
+        """
+        if not constr_dict['type'].endswith('Abridged'):
+            return dict_to_construction(constr_dict)
+
+        # convert each material once, when a construction uses it first
+        for mat_id in material_ids(constr_dict):
+            if mat_id not in self._schema:
+                raise ValueError(
+                    'Construction "{}" uses the material "{}" that is not in the '
+                    'library.'.format(constr_dict['identifier'], mat_id))
+            if mat_id not in self.materials:
+                self.materials[mat_id] = dict_to_material(
+                    json.loads(self.material_json(mat_id)))
+
+        # the shade control schedule is not needed for the construction values
+        constr_dict.pop('schedule', None)
+        return dict_abridged_to_construction(constr_dict, self.materials, {})
+
+
+def schema_material_ids(constr):
+    """Get the identifiers of the materials of a HoneybeeSchema construction.
+
+    Only the schema fields are read, the construction is not serialized.
+    """
+    ids = []
+    inner = getattr(constr, 'WindowConstruction', None)  # shaded windows
+    if inner is not None:
+        ids.extend(schema_material_ids(_unwrap(inner)))
+    for mat in _items(getattr(constr, 'Materials', None)):
+        mat = _unwrap(mat)
+        ids.append(mat if isinstance(mat, str) else mat.Identifier)
+    for attr in ('ShadeMaterial', 'Frame'):
+        value = getattr(constr, attr, None)
+        if value and isinstance(value, str):
+            ids.append(value)
+    return ids
+
+
+def _schema_type(constr):
+    type_name = getattr(constr, 'Type', None)
+    return str(type_name) if type_name else type(constr).__name__
+
+
+# METRICS
+#---------------------------------------------------------------------------------------------#
+class MetricsCache(object):
+    """LRU cache of the thermal metrics of the constructions."""
+
+    def __init__(self, max_size=DEFAULT_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._metrics = OrderedDict()
+
+    def __len__(self):
+        return len(self._metrics)
+
+    def get(self, key):
+        value = self._metrics.pop(key, None)
+        if value is None:
+            self.misses += 1
+            return None
+        self._metrics[key] = value  # most recently used goes last
+        self.hits += 1
+        return value
+
+    def set(self, key, metrics):
+        self._metrics.pop(key, None)
+        self._metrics[key] = metrics
+        while len(self._metrics) > self.max_size:
+            self._metrics.popitem(last=False)
+
+    def clear(self):
+        self._metrics.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def get_metrics_cache():
+    """Get the construction metrics cache of the session."""
+    store = session.sticky()
+    if _CACHE not in store:
+        store[_CACHE] = MetricsCache()
+    return store[_CACHE]
+
+
+def construction_metrics(constr):
+    """Get the SI metrics of a construction.
+
+    Returns:
+        A tuple with the r-value, u-factor, solar and visible transmittance,
+        mass area density and thickness. The transmittances of shaded windows
+        are the ones of the unshaded window.
+    """
+    if isinstance(constr, WindowConstruction):
+        t_sol = constr.solar_transmittance
+        t_vis = constr.visible_transmittance
+        mass_area_density = 0
+    elif isinstance(constr, WindowConstructionShade):
+        t_sol = constr.window_construction.solar_transmittance
+        t_vis = constr.window_construction.visible_transmittance
+        mass_area_density = 0
+    else:
+        t_sol = 0
+        t_vis = 0
+        mass_area_density = constr.mass_area_density
+    thickness = getattr(constr, 'thickness', 0)
+    return (constr.r_value, constr.u_factor, t_sol, t_vis, mass_area_density,
+            thickness)
+
+
+def _fingerprint(constr, library):
+    return (_schema_type(constr), constr.Identifier, hash(constr),
+            tuple(library.material_key(_) for _ in schema_material_ids(constr)))
+
+
+def model_construction_metrics(energy_properties, cache=None,
+                               skipped_types=SKIPPED_TYPES, errors=None):
+    """Get the display name and the SI metrics of each construction of the library.
+
+    Args:
+        energy_properties: The HoneybeeSchema energy properties of the model
+            (e.g. current_model.HBModelProperties.Energy).
+        cache: Optional MetricsCache. Default is the cache of the session.
+        skipped_types: Construction types that are not converted.
+        errors: Optional list. The constructions that use a material missing
+            from the library are skipped and a message for each one is added
+            to it.
+
+    Returns:
+        A list of (display name, metrics) where metrics is the output of
+        construction_metrics.
+    """
+    cache = cache if cache is not None else get_metrics_cache()
+    library = _Library(energy_properties)
+    rows = []
+    for constr in _items(energy_properties.Constructions):
+        constr = _unwrap(constr)
+        if _schema_type(constr) in skipped_types:
+            continue
+        key = _fingerprint(constr, library)
+        row = cache.get(key)
+        if row is None:
+            # only the changed constructions are serialized
+            try:
+                constr = library.construction(json.loads(constr.ToJson()))
+            except ValueError as e:
+                if errors is not None:
+                    errors.append(str(e))
+                continue
+            row = (constr.display_name, construction_metrics(constr))
+            cache.set(key, row)
+        rows.append(row)
+    return rows
@@ -0,0 +1,184 @@
+"""
+Convert HoneybeeSchema objects to honeybee objects without the JSON round trip.
+------------------------------------------------------------------------------
+Strategy:
+    1. Walk the csharp HoneybeeSchema object graph (rm.ToHBObject())
+    2. Build ladybug geometry and honeybee objects directly from it
+
+Extension properties (energy, radiance) are not converted. Use
+room_from_json if a script needs them.
+"""
+
+try:  # import honeybee dependencies
+    import json
+    import honeybee.dictutil as hb_dict_util
+    from honeybee.room import Room
+    from honeybee.face import Face
+    from honeybee.aperture import Aperture
+    from honeybee.door import Door
+    from honeybee.shade import Shade
+    from honeybee.facetype import face_types
+    from honeybee.altnumber import autocalculate
+    from honeybee.boundarycondition import boundary_conditions, Outdoors, \
+        Surface, Ground
+    from ladybug_geometry.geometry3d.pointvector import Point3D, Vector3D
+    from ladybug_geometry.geometry3d.plane import Plane
+    from ladybug_geometry.geometry3d.face import Face3D
+except ImportError as e:
+    raise ImportError('\nFailed to import:\n\t{}'.format(e))
+
+
+def _items(collection):
+    """Return an empty tuple for the null collections of HoneybeeSchema."""
+    return collection if collection is not None else ()
+
+
+def _point(pt):
+    return Point3D(pt[0], pt[1], pt[2])
+
+
+def _vector(vec):
+    return Vector3D(vec[0], vec[1], vec[2])
+
+
+def face3d_from_schema(geometry):
+    """Get a ladybug Face3D from a HoneybeeSchema Face3D."""
+    boundary = [_point(pt) for pt in geometry.Boundary]
+    holes = None
+    if geometry.Holes:
+        holes = [[_point(pt) for pt in hole] for hole in geometry.Holes]
+
+    # reuse the plane of the schema to avoid computing it again
+    plane = None
+    schema_plane = getattr(geometry, 'Plane', None)
+    if schema_plane is not None and schema_plane.N and schema_plane.O:
+        x = _vector(schema_plane.X) if schema_plane.X else None
+        plane = Plane(_vector(schema_plane.N), _point(schema_plane.O), x)
+
+    return Face3D(boundary, plane, holes)
+
+
+def _schema_type(obj):
+    """Get the honeybee type name of a HoneybeeSchema object."""
+    type_name = getattr(obj, 'Type', None)
+    return str(type_name) if type_name else type(obj).__name__
+
+
+def boundary_condition_from_schema(boundary_condition, sub_face=False):
+    """Get a honeybee boundary condition from a HoneybeeSchema one.
+
+    Extension boundary conditions fall back to Outdoors like Face.from_dict.
+    """
+    # AnyOf values keep the boundary condition in Obj
+    bc = getattr(boundary_condition, 'Obj', boundary_condition)
+    if bc is None:
+        return boundary_conditions.outdoors
+
+    bc_type = _schema_type(bc)
+    if bc_type == 'Outdoors':
+        view_factor = getattr(bc.ViewFactor, 'Obj', bc.ViewFactor)
+        if not isinstance(view_factor, (int, float)):
+            view_factor = autocalculate
+        return Outdoors(bool(bc.SunExposure), bool(bc.WindExposure), view_factor)
+    if bc_type == 'Surface':
+        return Surface(list(bc.BoundaryConditionObjects), sub_face)
+    if bc_type == 'Ground':
+        return Ground()
+    if bc_type == 'Adiabatic' and hasattr(boundary_conditions, 'adiabatic'):
+        return boundary_conditions.adiabatic
+    return boundary_conditions.outdoors
+
+
+def _set_display_name(hb_obj, obj):
+    if obj.DisplayName is not None:
+        hb_obj.display_name = obj.DisplayName
+
+
+def shade_from_schema(shade):
+    """Get a honeybee Shade from a HoneybeeSchema Shade."""
+    hb_shade = Shade(shade.Identifier, face3d_from_schema(shade.Geometry),
+                     bool(getattr(shade, 'IsDetached', False)))
+    _set_display_name(hb_shade, shade)
+    return hb_shade
+
+
+def _add_shades(hb_obj, obj):
+    for shd in _items(getattr(obj, 'IndoorShades', None)):
+        hb_obj.add_indoor_shade(shade_from_schema(shd))
+    for shd in _items(getattr(obj, 'OutdoorShades', None)):
+        hb_obj.add_outdoor_shade(shade_from_schema(shd))
+
+
+def aperture_from_schema(aperture):
+    """Get a honeybee Aperture from a HoneybeeSchema Aperture."""
+    bc = boundary_condition_from_schema(aperture.BoundaryCondition, True)
+    hb_apt = Aperture(aperture.Identifier, face3d_from_schema(aperture.Geometry),
+                      bc, bool(aperture.IsOperable))
+    _set_display_name(hb_apt, aperture)
+    _add_shades(hb_apt, aperture)
+    return hb_apt
+
+
+def door_from_schema(door):
+    """Get a honeybee Door from a HoneybeeSchema Door."""
+    bc = boundary_condition_from_schema(door.BoundaryCondition, True)
+    hb_door = Door(door.Identifier, face3d_from_schema(door.Geometry),
+                   bc, bool(door.IsGlass))
+    _set_display_name(hb_door, door)
+    _add_shades(hb_door, door)
+    return hb_door
+
+
+def face_from_schema(face):
+    """Get a honeybee Face from a HoneybeeSchema Face."""
+    # first create it with an outdoor boundary condition like Face.from_dict
+    hb_face = Face(face.Identifier, face3d_from_schema(face.Geometry),
+                   face_types.by_name(str(face.FaceType)),
+                   boundary_conditions.outdoors)
+    _set_display_name(hb_face, face)
+
+    apertures = [aperture_from_schema(apt) for apt in _items(face.Apertures)]
+    if apertures:
+        hb_face.add_apertures(apertures)
+    doors = [door_from_schema(dr) for dr in _items(face.Doors)]
+    if doors:
+        hb_face.add_doors(doors)
+    _add_shades(hb_face, face)
+
+    hb_face.boundary_condition = \
+        boundary_condition_from_schema(face.BoundaryCondition)
+    return hb_face
+
+
+def room_from_schema(room):
+    """Get a honeybee Room from a HoneybeeSchema Room.
+
+    Args:
+        room: A HoneybeeSchema Room. Use rm.ToHBObject() to get it from a
+            Pollination RoomObject.
+    """
+    faces = [face_from_schema(fc) for fc in room.Faces]
+    hb_room = Room(room.Identifier, faces)
+    _set_display_name(hb_room, room)
+    if getattr(room, 'Multiplier', None):
+        hb_room.multiplier = room.Multiplier
+    if getattr(room, 'Story', None):
+        hb_room.story = room.Story
+    _add_shades(hb_room, room)
+    return hb_room
+
+
+def room_from_room_object(room_object):
+    """Get a honeybee Room from a Pollination RoomObject."""
+    return room_from_schema(room_object.ToHBObject())
+
+
+def room_from_json(hb_json):
+    """Get a honeybee Room from a HoneybeeSchema JSON string.
+
+    This is the slow path. It also loads the extension properties.
+    """
+    hb_obj = hb_dict_util.dict_to_object(json.loads(hb_json), False)
+    if not hb_obj:
+        raise ValueError('Failed to convert the room:\n{}'.format(hb_json))
+    return hb_obj
@@ -0,0 +1,111 @@
+"""
+Forward the RhinoDoc object events to the shared modules.
+------------------------------------------------------------------------------
+The Rhino handlers are added once per session and kept in the sticky, so
+running a script again never adds them twice. Modules subscribe a callback
+under a key, and subscribing again with the same key replaces it.
+
+Callbacks get (doc, object_id, rhino_object):
+    add - the object was added or undeleted
+    replace - rhino_object is the new object
+    delete - the object was deleted
+Closing a document removes everything stored for it in the session.
+A callback that fails is not reported from the event, since an edit can fire
+many events. The failures are kept and report_errors prints them once, at the
+end of the next script run (timing.finish calls it).
+"""
+
+from pollination_scripts import session
+
+_HUB = 'pollination_scripts.events'
+EVENTS = ('add', 'replace', 'delete')
+MAX_ERRORS = 20
+
+
+def _hub():
+    store = session.sticky()
+    hub = store.get(_HUB)
+    if hub is None:
+        hub = dict((name, {}) for name in EVENTS)
+        hub['errors'] = []
+        hub['error_count'] = 0
+        store[_HUB] = hub
+    return hub
+
+
+def _dispatch(hub, event, doc, object_id, rhino_object):
+    for key, callback in list(hub[event].items()):
+        try:
+            callback(doc, object_id, rhino_object)
+        except Exception as e:  # never break the Rhino event loop
+            hub['error_count'] = hub.get('error_count', 0) + 1
+            errors = hub.setdefault('errors', [])
+            if len(errors) < MAX_ERRORS:  # the first ones explain the rest
+                errors.append('{} failed on {}: {}'.format(key, event, e))
+
+
+def _register(hub):
+    if hub.get('registered'):
+        return
+    try:
+        import Rhino
+    except ImportError:  # outside Rhino there are no document events
+        return
+
+    def on_add(sender, e):
+        _dispatch(hub, 'add', e.TheObject.Document, e.ObjectId, e.TheObject)
+
+    def on_replace(sender, e):
+        _dispatch(hub, 'replace', e.Document, e.ObjectId, e.NewRhinoObject)
+
+    def on_delete(sender, e):
+        _dispatch(hub, 'delete', e.TheObject.Document, e.ObjectId, e.TheObject)
+
+    def on_close(sender, e):
+        session.forget_document(e.Document)
+
+    Rhino.RhinoDoc.AddRhinoObject += on_add
+    Rhino.RhinoDoc.UndeleteRhinoObject += on_add
+    Rhino.RhinoDoc.ReplaceRhinoObject += on_replace
+    Rhino.RhinoDoc.DeleteRhinoObject += on_delete
+    Rhino.RhinoDoc.CloseDocument += on_close
+    hub['registered'] = True
+
+
+def subscribe(event, key, callback):
+    """Call a function every time a document object event happens.
+
+    Args:
+        event: Text for the event. One of add, replace or delete.
+        key: Text to identify the subscriber.
+        callback: A function that accepts (doc, object_id, rhino_object).
+    """
+    hub = _hub()
+    hub[event][key] = callback
+    _register(hub)
+
+
+def errors():
+    """Get the first failures of the callbacks since the last report."""
+    return list(_hub().get('errors', ()))
+
+
+def report_errors():
+    """Print the number of failures since the last report and the first one.
+
+    Returns:
+        The number of failures.
+    """
+    hub = _hub()
+    count = hub.get('error_count', 0)
+    if count:
+        print('Pollination scripts - {} document event update(s) failed, the '
+              'indexes may be out of date. First failure: {}'.format(
+                  count, hub['errors'][0]))
+    hub['errors'], hub['error_count'] = [], 0
+    return count
+
+
+def dispatch(event, doc, object_id, rhino_object=None):
+    """Send an event to the subscribers without Rhino (e.g. benchmarks)."""
+    _dispatch(_hub(), event, doc, object_id, rhino_object)
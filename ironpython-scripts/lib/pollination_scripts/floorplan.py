@@ -0,0 +1,386 @@
+"""
+Closed solids from the floor-plate curves of a layer.
+------------------------------------------------------------------------------
+Strategy:
+    0. Find the stacked duplicate curves with a hash of their vertices on the
+       tolerance grid, so each outline only makes one room
+    1. Check that the curves are planar and measure them on the worker pool
+    2. Nest the curves in a containment tree. The curves are sorted by area
+       and each one is only tested against the larger curves that share a
+       cell of the bounding box grid
+    3. Pair each outer boundary with the curves right inside it, the holes.
+       A curve inside a hole is the outer boundary of a new floor plate
+    4. Extrude and cap each floor plate on the worker pool and keep only the
+       valid closed solids
+    5. Build the rooms of the first floor from the solids and stack copies
+       of the rooms for the floors above. Each floor is a story of its own
+
+The breps are not added to the document. Build the Pollination rooms from
+them directly and add them with one RoomCommit.
+"""
+
+from pollination_scripts.parallel import parallel_map
+
+# a bounding box that covers more grid cells is tested against every curve
+MAX_CELLS = 64
+
+
+# DUPLICATES
+#---------------------------------------------------------------------------------------------#
+def _same_loop(loop_a, loop_b, tolerance):
+    """Check if two closed loops of points match within the tolerance.
+
+    The loops can start at a different vertex and run in opposite directions.
+    """
+    count = len(loop_a)
+    if count != len(loop_b):
+        return False
+    if not count:
+        return True
+    tol2 = tolerance * tolerance
+
+    def dist2(pt_a, pt_b):
+        return sum((a - b) ** 2 for a, b in zip(pt_a, pt_b))
+
+    first = loop_a[0]
+    start = min(range(count), key=lambda _: dist2(first, loop_b[_]))
+    if dist2(first, loop_b[start]) > tol2:
+        return False
+    for step in (1, -1):
+        if all(dist2(loop_a[i], loop_b[(start + step * i) % count]) <= tol2
+               for i in range(count)):
+            return True
+    return False
+
+
+def duplicate_groups(loops, tolerance):
+    """Group the curves with the same vertices within the tolerance.
+
+    Each curve is hashed by its vertex count and the average of its vertices
+    on the tolerance grid. It is only compared with the first curve of the
+    groups in the 27 cells around it, so the time is linear.
+
+    Args:
+        loops: A list of vertices for each curve, each vertex a (x, y, z)
+            tuple. The last vertex must not repeat the first one.
+        tolerance: The document absolute tolerance.
+
+    Returns:
+        A list of groups with the indices of the duplicate curves. The first
+        index of each group is the curve to keep. Curves without a
+        duplicate are not in the output.
+    """
+    size = tolerance if tolerance > 0 else 1e-9
+    offsets = [(i, j, k) for i in (-1, 0, 1) for j in (-1, 0, 1) for k in (-1, 0, 1)]
+    cells = {}  # (vertex count, x, y, z) > first curves of the groups
+    groups = {}  # first curve > duplicates
+    for i, loop in enumerate(loops):
+        count = len(loop)
+        if not count:
+            continue
+        xs, ys, zs = zip(*loop)
+        x = int(round(sum(xs) / count / size))
+        y = int(round(sum(ys) / count / size))
+        z = int(round(sum(zs) / count / size))
+        match = None
+        for dx, dy, dz in offsets:
+            firsts = cells.get((count, x + dx, y + dy, z + dz))
+            if firsts is None:
+                continue
+            for j in firsts:
+                if _same_loop(loops[j], loop, tolerance):
+                    match = j
+                    break
+            if match is not None:
+                break
+        if match is None:
+            cells.setdefault((count, x, y, z), []).append(i)
+        else:
+            groups.setdefault(match, [match]).append(i)
+    return sorted(groups.values())
+
+
+# CONTAINMENT TREE
+#---------------------------------------------------------------------------------------------#
+def _cell_size(bounds):
+    """Get a grid cell size close to the median size of the bounding boxes."""
+    sizes = sorted(max(b[2] - b[0], b[3] - b[1]) for b in bounds)
+    return max(sizes[len(sizes) // 2], 1e-9)
+
+
+def containment_parents(bounds, areas, contains, tolerance):
+    """Get the smallest curve that contains each curve.
+
+    Args:
+        bounds: A (min x, min y, max x, max y, elevation) tuple for each
+            curve. Only curves at the same elevation can nest.
+        areas: The area of each curve.
+        contains: A function that accepts the indices of two curves (outer,
+            inner) and checks if the first one contains the second one.
+        tolerance: The document absolute tolerance.
+
+    Returns:
+        A list with the index of the parent of each curve or None.
+    """
+    parents = [None] * len(bounds)
+    if not bounds:
+        return parents
+    size = _cell_size(bounds)
+    grid = {}  # (elevation, column, row) > curves
+    large = {}  # elevation > curves that cover too many cells
+    order = sorted(range(len(bounds)), key=lambda _: -areas[_])
+    for i in order:
+        x0, y0, x1, y1, z = bounds[i]
+        level = int(round(z / tolerance)) if tolerance else z
+        c0, r0 = int(x0 // size), int(y0 // size)
+
+        # the larger curves that hold the min corner of the bounding box
+        candidates = grid.get((level, c0, r0), []) + large.get(level, [])
+        candidates = [j for j in candidates if
+                      bounds[j][0] - tolerance <= x0 and bounds[j][1] - tolerance <= y0
+                      and bounds[j][2] + tolerance >= x1
+                      and bounds[j][3] + tolerance >= y1]
+        for j in sorted(candidates, key=lambda _: areas[_]):
+            if contains(j, i):
+                parents[i] = j
+                break
+
+        # register the curve in the cells of its bounding box
+        c1, r1 = int(x1 // size), int(y1 // size)
+        if (c1 - c0 + 1) * (r1 - r0 + 1) > MAX_CELLS:
+            large.setdefault(level, []).append(i)
+            continue
+        for c in range(c0, c1 + 1):
+            for r in range(r0, r1 + 1):
+                grid.setdefault((level, c, r), []).append(i)
+    return parents
+
+
+def floor_plates(parents):
+    """Pair the outer boundaries with their holes.
+
+    Args:
+        parents: The output of containment_parents.
+
+    Returns:
+        A list of (outer index, hole indices). The curves at an even depth of
+        the tree are outer boundaries and the ones at an odd depth are holes.
+    """
+    depths = [None] * len(parents)
+
+    for i in range(len(parents)):
+        # walk up to a curve with a known depth, the trees can be deep
+        path = []
+        while depths[i] is None and parents[i] is not None:
+            path.append(i)
+            i = parents[i]
+        if depths[i] is None:
+            depths[i] = 0
+        d = depths[i]
+        for j in reversed(path):
+            d += 1
+            depths[j] = d
+
+    plates = {}
+    for i, d in enumerate(depths):
+        if d % 2 == 0:
+            plates.setdefault(i, [])
+    for i, d in enumerate(depths):
+        if d % 2 == 1:
+            plates[parents[i]].append(i)
+    return sorted(plates.items())
+
+
+# GEOMETRY
+#---------------------------------------------------------------------------------------------#
+def curve_vertices(crv):
+    """Get the vertices of a closed curve as (x, y, z) tuples. Pure geometry.
+
+    The corners of polylines and the control points of the other curves are
+    used, without the repeated end point.
+    """
+    ok, polyline = crv.TryGetPolyline()
+    if ok:
+        points = list(polyline)
+    else:
+        points = [_.Location for _ in crv.ToNurbsCurve().Points]
+    if len(points) > 1 and points[0].DistanceTo(points[-1]) == 0:
+        points = points[:-1]
+    return [(pt.X, pt.Y, pt.Z) for pt in points]
+
+
+def find_duplicates(curves, tolerance, parallel=True):
+    """Get the groups of duplicate curves. See duplicate_groups."""
+    loops = parallel_map(curve_vertices, curves, parallel)
+    return duplicate_groups(loops, tolerance)
+
+
+def measure_curve(item):
+    """Get the bounds and the area of a planar closed curve or None. Pure geometry.
+
+    Args:
+        item: A (curve, tolerance) tuple.
+
+    Returns:
+        A ((min x, min y, max x, max y, elevation), area) tuple.
+    """
+    import Rhino
+    crv, tolerance = item
+    if not crv.IsClosed or not crv.IsPlanar(tolerance):
+        return None
+    props = Rhino.Geometry.AreaMassProperties.Compute(crv, tolerance)
+    if props is None:
+        return None
+    bbox = crv.GetBoundingBox(True)
+    return (bbox.Min.X, bbox.Min.Y, bbox.Max.X, bbox.Max.Y, bbox.Min.Z), props.Area
+
+
+def curve_contains(outer, inner, tolerance):
+    """Check if a horizontal closed curve is inside another one."""
+    import Rhino
+    plane = Rhino.Geometry.Plane(outer.PointAtStart, Rhino.Geometry.Vector3d.ZAxis)
+    relation = Rhino.Geometry.Curve.PlanarClosedCurveRelationship(
+        outer, inner, plane, tolerance)
+    return relation == Rhino.Geometry.RegionContainment.BInsideA
+
+
+def extrude_curve(item):
+    """Get the closed solid of a floor plate or None. Pure geometry.
+
+    Args:
+        item: A (curve, holes, height, tolerance) tuple. holes is a list of
+            curves inside the curve.
+    """
+    import Rhino
+    crv, holes, height, tolerance = item
+    if not holes:
+        extrusion = Rhino.Geometry.Extrusion.CreateExtrusion(
+            crv, Rhino.Geometry.Vector3d(0, 0, float(height)))
+        if extrusion is None:
+            return None
+        brep = extrusion.ToBrep().CapPlanarHoles(tolerance)
+    else:
+        # one planar face with the holes trimmed, then a capped extrusion
+        faces = Rhino.Geometry.Brep.CreatePlanarBreps([crv] + holes, tolerance)
+        if faces is None or len(faces) != 1:
+            return None
+        path = Rhino.Geometry.LineCurve(
+            Rhino.Geometry.Point3d(0, 0, 0), Rhino.Geometry.Point3d(0, 0, float(height)))
+        brep = faces[0].Faces[0].CreateExtrusion(path, True)
+        if brep is not None and \
+                brep.SolidOrientation == Rhino.Geometry.BrepSolidOrientation.Inward:
+            brep.Flip()
+    if brep is None or not brep.IsValid or not brep.IsSolid:
+        return None
+    return brep
+
+
+def floor_solids(curves, height, tolerance, parallel=True):
+    """Get the closed solids of the floor-plate curves of a layer.
+
+    The curves inside another curve are holes of it (e.g. courtyards and
+    atria), so they do not make rooms that overlap the outer one.
+
+    Args:
+        curves: A list of closed curves.
+        height: The floor to ceiling height of the rooms.
+        tolerance: The document absolute tolerance.
+        parallel: Set to False to run on the main thread.
+
+    Returns:
+        A list of breps. The curves that are not planar or do not make a
+        valid solid are skipped.
+    """
+    measures = parallel_map(
+        measure_curve, [(crv, tolerance) for crv in curves], parallel)
+    curves = [crv for crv, m in zip(curves, measures) if m is not None]
+    measures = [m for m in measures if m is not None]
+
+    parents = containment_parents(
+        [m[0] for m in measures], [m[1] for m in measures],
+        lambda j, i: curve_contains(curves[j], curves[i], tolerance), tolerance)
+    items = [(curves[outer], [curves[_] for _ in holes], height, tolerance)
+             for outer, holes in floor_plates(parents)]
+
+    breps = parallel_map(extrude_curve, items, parallel)
+    return [_ for _ in breps if _ is not None]
+
+
+# FLOORS
+#---------------------------------------------------------------------------------------------#
+def floor_inputs(height, floors, floor_to_floor=None):
+    """Read the height and the floors of a layer from the text of the dialog.
+
+    Args:
+        height: The floor to ceiling height of the rooms.
+        floors: The number of floors. A whole number written as a decimal
+            (e.g. 2.0) is accepted.
+        floor_to_floor: The vertical distance between two floors. None or an
+            empty text uses the height.
+
+    Returns:
+        A (height, floors, floor_to_floor) tuple of numbers.
+
+    Raises:
+        ValueError: With a message for the user if an input is wrong.
+    """
+    def number(text, name):
+        try:
+            return float(text)
+        except (TypeError, ValueError):
+            raise ValueError('The {} must be a number, not "{}".'.format(name, text))
+
+    height = number(height, 'height')
+    if height <= 0:
+        raise ValueError('The height must be more than 0.')
+    count = number(floors, 'number of floors')
+    if count < 1 or count != int(count):
+        raise ValueError('The number of floors must be a whole number from 1.')
+    if floor_to_floor is None or str(floor_to_floor).strip() == '':
+        floor_to_floor = height
+    floor_to_floor = number(floor_to_floor, 'floor to floor height')
+    if count > 1 and floor_to_floor < height:
+        raise ValueError('The floor to floor height must be at least the height '
+                         '({}), or the floors overlap.'.format(height))
+    return height, int(count), floor_to_floor
+
+
+def story_name(layer_name, level, floors):
+    """Get the story identifier of a floor of a layer."""
+    if floors == 1:
+        return layer_name
+    return '{}_Floor{}'.format(layer_name, level + 1)
+
+
+def stack_rooms(rooms, layer_name, floors, floor_to_floor, room_commit):
+    """Add the rooms of a floor and their copies on the floors above.
+
+    Only the first floor is built from the solids. The other floors are
+    duplicates of its rooms that the commit moves up once they are added, so
+    the cost is one floor of RoomObjects and a transform per copy.
+
+    Args:
+        rooms: The Pollination rooms of the first floor, not in the document.
+        layer_name: The name of the layer, used for the story names.
+        floors: The number of floors.
+        floor_to_floor: The vertical distance between two floors.
+        room_commit: The RoomCommit to add the rooms to.
+
+    Returns:
+        The number of rooms added to the commit.
+    """
+    import Rhino
+    import System
+
+    count = 0
+    for level in range(floors):
+        story = story_name(layer_name, level, floors)
+        xform = Rhino.Geometry.Transform.Translation(
+            0, 0, level * floor_to_floor) if level else None
+        for rm in rooms:
+            room = rm.DuplicateRoomObject() if level else rm
+            room.Id = System.Guid.NewGuid()
+            room.Data.HBObject.Story = story
+            room_commit.add_room(room, xform)
+            count += 1
+    return count
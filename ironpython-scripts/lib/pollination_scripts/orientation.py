@@ -0,0 +1,74 @@
+"""
+Orientation classification of many faces at once.
+------------------------------------------------------------------------------
+Strategy:
+    1. Collect the normals of all the faces as flat arrays of x and y
+    2. Get the clockwise angle from north and the orientation bin of all of
+       them in one pass - numpy in CPython, array loops in IronPython
+
+The bins match honeybee.orientation.face_orient_index for any num_orient.
+Faces exactly on the boundary between two bins may fall in the other bin
+because of floating point noise.
+"""
+
+import math
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # IronPython
+    np = None
+
+HORIZONTAL = -1  # bin of the faces without horizontal orientation
+
+
+def face_normals(faces):
+    """Get two arrays with the x and y of the normals of the faces."""
+    xs = array('d')
+    ys = array('d')
+    for face in faces:
+        normal = face.normal
+        xs.append(normal.x)
+        ys.append(normal.y)
+    return xs, ys
+
+
+def orient_indices(xs, ys, num_orient=4, north_vector=(0, 1)):
+    """Get the orientation bin of each normal.
+
+    Args:
+        xs: An array with the x of the normals.
+        ys: An array with the y of the normals.
+        num_orient: Number of orientation bins. Default 4 (N, E, S, W).
+        north_vector: The x and y of the north direction.
+
+    Returns:
+        An array of integers. Horizontal normals get HORIZONTAL.
+    """
+    step = 360.0 / num_orient
+    half = step / 2.0
+    nx, ny = north_vector[0], north_vector[1]
+
+    if np is not None:
+        x = np.asarray(xs, dtype=float)
+        y = np.asarray(ys, dtype=float)
+        angles = np.degrees(np.arctan2(ny * x - nx * y, nx * x + ny * y)) % 360.0
+        indices = np.floor((angles + half) / step).astype(int) % num_orient
+        indices[(x == 0) & (y == 0)] = HORIZONTAL
+        return indices
+
+    indices = array('i', [HORIZONTAL]) * len(xs)
+    atan2, degrees, floor = math.atan2, math.degrees, math.floor
+    for i in range(len(xs)):
+        x, y = xs[i], ys[i]
+        if x == 0 and y == 0:
+            continue
+        angle = degrees(atan2(ny * x - nx * y, nx * x + ny * y)) % 360.0
+        indices[i] = int(floor((angle + half) / step)) % num_orient
+    return indices
+
+
+def faces_orient_indices(faces, num_orient=4, north_vector=(0, 1)):
+    """Get the orientation bin of each face. See orient_indices."""
+    xs, ys = face_normals(faces)
+    return orient_indices(xs, ys, num_orient, north_vector)
@@ -0,0 +1,53 @@
+"""
+Run pure geometry work on a worker pool.
+------------------------------------------------------------------------------
+IronPython has no GIL, so the .NET Parallel.For uses all the cores. In
+CPython a thread pool is used, which keeps the code path the same but does
+not run faster.
+Never touch the Rhino document from the function. Collect the results and
+write them to the document on the main thread.
+"""
+
+try:
+    import System
+    from System.Threading.Tasks import Parallel
+except ImportError:  # outside Rhino
+    Parallel = None
+
+
+def parallel_map(function, items, parallel=True):
+    """Get the results of function for each item in the order of the items.
+
+    Args:
+        function: A function that accepts one item. It must not use the
+            Rhino document.
+        items: A list of inputs.
+        parallel: Set to False to run on the main thread (e.g. to debug).
+    """
+    items = list(items)
+    if not parallel or len(items) < 2:
+        return [function(_) for _ in items]
+
+    results = [None] * len(items)
+    errors = []
+
+    def run(i):
+        try:
+            results[i] = function(items[i])
+        except Exception as e:
+            errors.append(e)
+
+    if Parallel is not None:
+        Parallel.For(0, len(items), System.Action[int](run))
+    else:
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool()
+        try:
+            pool.map(run, range(len(items)))
+        finally:
+            pool.close()
+
+    # raise the errors of the workers on the main thread
+    if errors:
+        raise errors[0]
+    return results
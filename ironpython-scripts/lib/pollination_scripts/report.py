@@ -0,0 +1,199 @@
+"""
+Row builders for the report scripts.
+------------------------------------------------------------------------------
+The room metrics come either from a honeybee Room (room_metrics) or straight
+from the Rhino geometry of a Pollination room and its face data
+(room_object_inputs + room_object_metrics), which needs no conversion and
+runs on a worker pool. The benchmarks run room_object_metrics on geometry
+stand-ins and compare it with the honeybee values.
+"""
+
+from array import array
+
+
+def room_metrics(hb_room):
+    """Get the numeric values reported for a honeybee Room."""
+    return [hb_room.floor_area, hb_room.volume, hb_room.exposed_area,
+            hb_room.exterior_wall_aperture_area, hb_room.exterior_wall_area]
+
+
+def room_row(hb_room):
+    """Get the row of the room report for a honeybee Room."""
+    row = [hb_room.display_name]
+    row.extend(int(_) for _ in room_metrics(hb_room))
+    return row
+
+
+# GEOMETRY FAST PATH
+#---------------------------------------------------------------------------------------------#
+def _schema_type(obj):
+    obj = getattr(obj, 'Obj', obj)  # AnyOf
+    type_name = getattr(obj, 'Type', None)
+    return str(type_name) if type_name else type(obj).__name__
+
+
+def room_name(room_object):
+    """Get the name of a Pollination room like honeybee display_name does.
+
+    The DisplayName of the schema data is None when it was never set and the
+    Identifier is used instead.
+    """
+    hb_obj = room_object.Data.HBObjectCopy
+    return hb_obj.DisplayName or hb_obj.Identifier
+
+
+def room_object_inputs(room_object):
+    """Read what room_object_metrics needs from a Pollination room.
+
+    Call it on the main thread since it reads the face data and the aperture
+    objects of the document.
+
+    Returns:
+        A tuple with the brep, a (face_type, is_outdoors) tuple for each brep
+        face, and the aperture breps.
+    """
+    from Core.Entity import EntityHelper
+
+    brep = room_object.BrepGeometry
+    faces = []
+    for fc in brep.Faces:
+        fc_data = EntityHelper.TryGetFaceDataCopy(fc)
+        if fc_data is None:
+            faces.append((None, False))
+            continue
+        hb_obj = fc_data.HBObjectCopy
+        faces.append((str(hb_obj.FaceType),
+                      _schema_type(hb_obj.BoundaryCondition) == 'Outdoors'))
+    apertures = [_.Brep() for _ in room_object.Apertures]
+    return brep, faces, [_ for _ in apertures if _ is not None]
+
+
+def sum_metrics(face_areas, faces, apertures, volume):
+    """Get the values of room_metrics from the areas of the faces. Pure Python.
+
+    Args:
+        face_areas: The area of each face.
+        faces: A (face_type, is_outdoors) tuple for each face.
+        apertures: An (area, face index or None) tuple for each aperture.
+        volume: The volume of the room.
+    """
+    floor_area = exposed_area = wall_aperture_area = wall_area = 0
+    for area, (face_type, is_outdoors) in zip(face_areas, faces):
+        if face_type == 'Floor':
+            floor_area += area
+        if is_outdoors:
+            exposed_area += area
+            if face_type == 'Wall':
+                wall_area += area
+
+    for area, face_i in apertures:
+        if face_i is not None and faces[face_i] == ('Wall', True):
+            wall_aperture_area += area
+    return [floor_area, volume, exposed_area, wall_aperture_area, wall_area]
+
+
+def room_object_metrics(inputs, tolerance):
+    """Get the values of room_metrics from the output of room_object_inputs.
+
+    It only reads geometry, so it can run on a worker thread. The apertures
+    are assigned to the face under their area centroid.
+    """
+    import Rhino
+    area_props = Rhino.Geometry.AreaMassProperties
+    brep, faces, apertures = inputs
+
+    # the trimmed faces, a BrepFace alone measures its untrimmed surface
+    trimmed = [fc.DuplicateFace(False) for fc in brep.Faces]
+    face_areas = [area_props.Compute(_, True, False, False, False).Area
+                  for _ in trimmed]
+
+    apertures_on = []
+    for apt in apertures:
+        props = area_props.Compute(apt, True, True, False, False)
+        centroid = props.Centroid
+        host = None
+        for i, fc in enumerate(trimmed):
+            if fc.ClosestPoint(centroid).DistanceTo(centroid) <= tolerance:
+                host = i
+                break
+        apertures_on.append((props.Area, host))
+
+    volume = Rhino.Geometry.VolumeMassProperties.Compute(
+        brep, True, False, False, False).Volume
+    return sum_metrics(face_areas, faces, apertures_on, volume)
+
+
+# TABLE
+#---------------------------------------------------------------------------------------------#
+class RoomTable(object):
+    """Column store of the room report.
+
+    The values are kept in arrays by column and the text of a cell is only
+    made when a grid asks for it. The sort order of each column is computed
+    once and reused until a room is added.
+
+    Args:
+        header: The names of the columns. The first one is the room name.
+    """
+
+    def __init__(self, header):
+        self.header = tuple(header)
+        self.names = []
+        self.columns = [array('d') for _ in self.header[1:]]
+        self._search_names = []
+        self._orders = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, hb_room):
+        self.add_values(hb_room.display_name, room_metrics(hb_room))
+
+    def add_values(self, name, metrics):
+        """Add a row from a room name and the output of room_metrics."""
+        self.names.append(name)
+        self._search_names.append(name.lower())
+        for column, value in zip(self.columns, metrics):
+            column.append(value)
+        self._orders.clear()
+
+    def cell(self, row, column):
+        """Get the text of a cell."""
+        if column == 0:
+            return self.names[row]
+        return str(int(self.columns[column - 1][row]))
+
+    def row(self, row):
+        """Get a row like room_row."""
+        values = [self.names[row]]
+        values.extend(int(_[row]) for _ in self.columns)
+        return values
+
+    def rows(self, indices=None):
+        indices = range(len(self)) if indices is None else indices
+        return [self.row(_) for _ in indices]
+
+    def order(self, column):
+        """Get the row indices sorted by a column."""
+        if column not in self._orders:
+            keys = self._search_names if column == 0 else self.columns[column - 1]
+            self._orders[column] = sorted(range(len(self)), key=keys.__getitem__)
+        return self._orders[column]
+
+    def view(self, column=None, descending=False, text=None):
+        """Get the row indices to show.
+
+        Args:
+            column: Optional column to sort by.
+            descending: Set to True to reverse the sort order.
+            text: Optional text to look for in the room names (case
+                insensitive).
+        """
+        indices = self.order(column) if column is not None else range(len(self))
+        if descending:
+            indices = reversed(indices)
+        if text:
+            text = text.lower()
+            names = self._search_names
+            return [_ for _ in indices if text in names[_]]
+        return list(indices)
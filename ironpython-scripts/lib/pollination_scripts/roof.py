@@ -0,0 +1,313 @@
+"""
+Offset the roof/ceiling faces of whole stories.
+------------------------------------------------------------------------------
+Strategy:
+    1. Sort the stories by elevation and get how much each one moves
+    2. Move the roof/ceiling faces of the chosen stories and the whole rooms
+       of the stories above them, so the floors stay on the ceilings below
+    3. Find the Surface boundary conditions whose two faces do not move
+       the same way anymore. They become Outdoors
+    4. Edit the breps on all the cores
+    5. Build a new RoomObject from each edited brep and give it the room and
+       face data of the old room. Move the apertures with their faces and add
+       copies of them to the new room, like the WWR scripts do. Push
+       everything to the document in one RoomCommit
+
+The rooms that only move and keep their adjacencies are transformed through
+the document and keep their object and data.
+"""
+
+from pollination_scripts.commit import RoomCommit
+from pollination_scripts.parallel import parallel_map
+
+
+def story_shifts(elevations, stories, distance, move_above=True):
+    """Get how much each story moves.
+
+    Args:
+        elevations: A dictionary with the elevation of each story.
+        stories: The names of the stories to offset.
+        distance: The offset of the roof/ceiling faces. Negative moves down.
+        move_above: Set to False to leave the stories above in place.
+
+    Returns:
+        A dictionary with a (shift, offset) tuple for each story. The whole
+        story moves by shift and its roof/ceiling faces move by offset more.
+    """
+    stories = set(stories)
+    shifts = {}
+    below = 0  # offsets of the chosen stories under the current elevation
+    level, level_offset = None, 0
+    for story in sorted(elevations, key=lambda _: (elevations[_], _)):
+        if elevations[story] != level:
+            below += level_offset
+            level, level_offset = elevations[story], 0
+        offset = distance if story in stories else 0
+        if offset:
+            level_offset = offset
+        shifts[story] = (below if move_above else 0, offset)
+    return shifts
+
+
+# the schema fields that the new RoomObject gets from the old room
+ROOM_FIELDS = ('Identifier', 'DisplayName', 'Story', 'Multiplier', 'Properties',
+               'UserData')
+FACE_FIELDS = ('Identifier', 'DisplayName', 'FaceType', 'BoundaryCondition',
+               'Properties', 'UserData')
+
+
+def broken_adjacencies(faces, tolerance):
+    """Find the Surface boundary conditions that an edit breaks.
+
+    Args:
+        faces: A list of (room identifier, face identifier, adjacent room
+            identifier, adjacent face identifier, move) tuples for the faces
+            with a Surface boundary condition of the rooms that change. move
+            is the (bottom, top) vertical move of the face. The faces that are
+            not in the list do not move.
+        tolerance: The document absolute tolerance.
+
+    Returns:
+        A dictionary with the room identifier of each face that does not meet
+        its adjacent face anymore, on both sides.
+    """
+    moves = dict((face_id, move) for _, face_id, _, _, move in faces)
+    broken = {}
+    for room_id, face_id, adj_room_id, adj_face_id, move in faces:
+        adj_move = moves.get(adj_face_id, (0, 0))
+        if any(abs(a - b) > tolerance for a, b in zip(move, adj_move)):
+            broken[face_id] = room_id
+            broken[adj_face_id] = adj_room_id
+    return broken
+
+
+def _schema_obj(obj):
+    return getattr(obj, 'Obj', obj)  # AnyOf
+
+
+def _surface_faces(rm, room_id, shift, offset, faces):
+    """Get the faces of a room for broken_adjacencies.
+
+    Args:
+        room_id: The identifier of the room.
+        faces: The roof/ceiling faces that move by offset. The faces next to
+            them stretch by offset.
+    """
+    from Core.Entity import EntityHelper
+
+    moved = set(fc.FaceIndex for fc in faces)
+    stretched = set(i for fc in faces for i in fc.AdjacentFaces()) - moved
+    records = []
+    for fc in rm.BrepGeometry.Faces:
+        fc_data = EntityHelper.TryGetFaceDataCopy(fc)
+        if fc_data is None:
+            continue
+        hb_obj = fc_data.HBObjectCopy
+        bc = _schema_obj(hb_obj.BoundaryCondition)
+        if getattr(bc, 'Type', None) != 'Surface':
+            continue
+        adj_face_id, adj_room_id = list(bc.BoundaryConditionObjects)[:2]
+        if fc.FaceIndex in moved:
+            move = (shift + offset, shift + offset)
+        elif fc.FaceIndex in stretched:
+            move = (shift, shift + offset)
+        else:
+            move = (shift, shift)
+        records.append((room_id, hb_obj.Identifier, adj_room_id, adj_face_id, move))
+    return records
+
+
+def _copy_room_data(rm, new_room, broken):
+    """Give a new RoomObject the room and face data of the room it replaces.
+
+    The faces of the edited brep keep the order of the old brep. The faces
+    in broken get an Outdoors boundary condition.
+    """
+    import clr
+    clr.AddReference('Pollination.Core.dll')
+    clr.AddReference('HoneybeeSchema.dll')
+    import HoneybeeSchema as hb
+    from Core.Entity import EntityHelper
+
+    room_data, old_data = new_room.Data.HBObject, rm.Data.HBObjectCopy
+    for field in ROOM_FIELDS:
+        setattr(room_data, field, getattr(old_data, field))
+    for old_fc, new_fc in zip(rm.BrepGeometry.Faces, new_room.BrepGeometry.Faces):
+        old_data = EntityHelper.TryGetFaceDataCopy(old_fc)
+        new_data = EntityHelper.TryGetFaceData(new_fc)
+        if old_data is None or new_data is None:
+            continue
+        face_data, old_data = new_data.HBObject, old_data.HBObjectCopy
+        for field in FACE_FIELDS:
+            setattr(face_data, field, getattr(old_data, field))
+        if face_data.Identifier in broken:
+            face_data.BoundaryCondition = hb.Outdoors()
+
+
+def _roof_ceiling_faces(brep):
+    import clr
+    clr.AddReference('Pollination.Core.dll')
+    clr.AddReference('HoneybeeSchema.dll')
+    import HoneybeeSchema as hb
+    from Core.Entity import EntityHelper
+
+    faces = []
+    for fc in brep.Faces:
+        fc_data = EntityHelper.TryGetFaceDataCopy(fc)
+        if fc_data is None:
+            continue
+        if fc_data.HBObjectCopy.FaceType == hb.FaceType.RoofCeiling:
+            faces.append(fc)
+    return faces
+
+
+def _is_on_faces(doc, object_id, faces, tolerance):
+    """Check if the center of a document object is on one of the faces."""
+    obj = doc.Objects.FindId(object_id)
+    if obj is None:
+        return False
+    center = obj.Geometry.GetBoundingBox(False).Center
+    for fc in faces:
+        ok, u, v = fc.ClosestPoint(center)
+        if ok and fc.PointAt(u, v).DistanceTo(center) <= tolerance:
+            return True
+    return False
+
+
+def _edit_brep(edit):
+    """Move a room brep and its roof/ceiling faces. Pure geometry."""
+    import Rhino
+    brep, components, shift, offset, tolerance = edit
+    brep = brep.DuplicateBrep()
+    if shift:
+        brep.Transform(Rhino.Geometry.Transform.Translation(0, 0, shift))
+    if offset:
+        xform = Rhino.Geometry.Transform.Translation(0, 0, offset)
+        if not brep.TransformComponent(components, xform, tolerance, 0, True):
+            return None
+    return brep
+
+
+def _new_room(rm, brep, apt_moves, broken, tolerance, angle_tolerance, commit):
+    """Build the RoomObject of an edited brep and give it the moved apertures.
+
+    Args:
+        rm: The RoomObject in the document.
+        brep: The edited brep of the room.
+        apt_moves: A list of (aperture Id, vertical move) of the room.
+        broken: The identifiers of the faces that lose their Surface boundary
+            condition.
+    """
+    import clr
+    clr.AddReference('Pollination.Core.dll')
+    import Core as po
+    import Rhino
+    import System
+
+    # the old apertures are gone before AddApertures, like the WWR editor
+    copies = []
+    for apt_id, apt_move in apt_moves:
+        apt = commit.transform_now(
+            apt_id, Rhino.Geometry.Transform.Translation(0, 0, apt_move)) \
+            if apt_move else commit.doc.Objects.FindId(apt_id)
+        if apt is None:
+            continue
+        apt_copy = apt.DuplicateApertureObject()
+        apt_copy.Id = System.Guid.NewGuid()
+        copies.append(apt_copy)
+        commit.delete_now(apt)
+
+    new_room = po.Objects.RoomObject(brep, tolerance)
+    _copy_room_data(rm, new_room, broken)
+    if copies:
+        new_room, added_apts = new_room.AddApertures(
+            copies, tolerance, angle_tolerance)
+        commit.add_apertures(added_apts)
+    commit.update_room(new_room, rm.Id)
+
+
+def offset_roof_ceilings(doc, story_index, stories, distance, tolerance,
+                         angle_tolerance, move_above=True, parallel=True,
+                         room_commit=None):
+    """Offset the roof/ceiling faces of the rooms of some stories.
+
+    Args:
+        doc: The RhinoDoc of the rooms.
+        story_index: The StoryIndex of the document.
+        stories: The names of the stories to offset.
+        distance: The vertical offset. Negative moves the faces down.
+        tolerance: The document absolute tolerance.
+        angle_tolerance: The document angle tolerance in radians.
+        move_above: Set to False to leave the stories above in place. The
+            floors above will not meet the moved ceilings then.
+        parallel: Set to False to edit the breps on the main thread.
+        room_commit: Optional RoomCommit to collect the changes in. By default
+            a new one is committed before returning.
+
+    Returns:
+        The number of rooms that were changed.
+    """
+    import Rhino
+
+    rooms = dict((st, story_index.rooms(doc, st)) for st in story_index.stories())
+    elevations = dict(
+        (st, min(rm.BrepGeometry.GetBoundingBox(False).Min.Z for rm in rms))
+        for st, rms in rooms.items() if rms)
+    shifts = story_shifts(elevations, stories, distance, move_above)
+
+    # collect the edits on the main thread, the document is not thread safe
+    changes, surface_faces = [], []
+    for st, (shift, offset) in shifts.items():
+        for rm in rooms[st]:
+            faces = _roof_ceiling_faces(rm.BrepGeometry) if offset else []
+            if shift or faces:
+                room_id = rm.Data.HBObjectCopy.Identifier
+                changes.append((rm, room_id, shift, offset if faces else 0, faces))
+                surface_faces.extend(
+                    _surface_faces(rm, room_id, shift, offset, faces))
+    broken = broken_adjacencies(surface_faces, tolerance)
+    broken_rooms = set(broken.values())
+
+    # the rooms that do not move but lose an adjacency are rebuilt too
+    changed = set(_[1] for _ in changes)
+    if broken_rooms - changed:
+        for rms in rooms.values():
+            for rm in rms:
+                room_id = rm.Data.HBObjectCopy.Identifier
+                if room_id in broken_rooms and room_id not in changed:
+                    changes.append((rm, room_id, 0, 0, []))
+
+    commit = room_commit or RoomCommit(doc, 'Offset roof/ceilings by story')
+    edits, edited_rooms, moved_rooms = [], [], 0
+    for rm, room_id, shift, offset, faces in changes:
+        apertures = [_.ObjectId for _ in rm.Apertures]
+        if not faces and room_id not in broken_rooms:
+            xform = Rhino.Geometry.Transform.Translation(0, 0, shift)
+            commit.transform(rm.Id, xform)
+            moved_rooms += 1
+            for apt_id in apertures:
+                commit.transform(apt_id, xform)
+            continue
+
+        edits.append((rm.BrepGeometry, [fc.ComponentIndex() for fc in faces],
+                      shift, offset, tolerance))
+
+        # the apertures on the moved faces move with them
+        apt_moves = [(apt_id, shift + offset if _is_on_faces(
+            doc, apt_id, faces, tolerance) else shift) for apt_id in apertures]
+        edited_rooms.append((rm, apt_moves))
+
+    breps = parallel_map(_edit_brep, edits, parallel)
+    for (rm, _), brep in zip(edited_rooms, breps):
+        if brep is None or not brep.IsSolid:
+            raise ValueError(
+                'Failed to offset the roof/ceilings of room {}.'.format(rm.Id))
+    try:
+        for (rm, apt_moves), brep in zip(edited_rooms, breps):
+            _new_room(rm, brep, apt_moves, broken, tolerance, angle_tolerance,
+                      commit)
+    finally:
+        # the old apertures are already deleted, always close the undo record
+        if room_commit is None:
+            commit.commit()
+    return moved_rooms + len(edited_rooms)
@@ -0,0 +1,402 @@
+"""
+Substring index of the Identifier and DisplayName of the sub-objects.
+------------------------------------------------------------------------------
+Strategy:
+    1. Read the faces, apertures and doors of all the rooms (and the shades)
+       once the first time a script searches the document
+    2. Keep a posting list of the entries for each n-gram of their texts
+    3. Answer a keyword with the shortest posting list of its n-grams and
+       check only those entries
+    4. Keep it up to date from the add, replace and delete events. An event
+       of an aperture or a door only changes its own entry, the room is not
+       read again
+    5. While typing, look for a longer keyword only in the matches of the
+       previous one
+
+The deleted entries stay in the posting lists until they are more than the
+live ones, then the lists are rebuilt.
+"""
+
+from pollination_scripts import session, events
+
+KINDS = ('face', 'aperture', 'door', 'shade')
+ATTRIBUTES = ('Identifier', 'DisplayName')
+GRAM_SIZE = 3
+
+
+def room_sub_objects(room_object):
+    """Get the (kind, key, identifier, display name) of the sub-objects of a room.
+
+    The key is the brep face index for the faces and the object Id for the
+    apertures and the doors.
+    """
+    import clr
+    clr.AddReference('Pollination.Core.dll')
+    from Core.Entity import EntityHelper
+
+    records = []
+    for fc in room_object.BrepGeometry.Faces:
+        data = EntityHelper.TryGetFaceDataCopy(fc)
+        if data is not None:
+            records.append(('face', fc.FaceIndex, data.Identifier, data.DisplayName))
+    for kind, refs, helper in (
+            ('aperture', room_object.Apertures, EntityHelper.TryGetApertureDataCopy),
+            ('door', room_object.Doors, EntityHelper.TryGetDoorDataCopy)):
+        for ref in refs or ():
+            geometry = ref.Geometry()
+            if geometry is None:  # e.g. while the object is being replaced
+                continue
+            data = helper(geometry)
+            if data is not None:
+                records.append((kind, ref.ObjectId, data.Identifier, data.DisplayName))
+    return records
+
+
+def sub_object_record(object_id, rhino_object):
+    """Get the record of an aperture or a door object or None."""
+    geometry = getattr(rhino_object, 'Geometry', None)
+    if geometry is None:
+        return None
+    import clr
+    clr.AddReference('Pollination.Core.dll')
+    from Core.Entity import EntityHelper
+
+    for kind, helper in (('aperture', EntityHelper.TryGetApertureDataCopy),
+                         ('door', EntityHelper.TryGetDoorDataCopy)):
+        data = helper(geometry)
+        if data is not None:
+            return kind, object_id, data.Identifier, data.DisplayName
+    return None
+
+
+def shade_sub_objects(shade_object):
+    """Get the records of a Pollination shade object."""
+    data = shade_object.Data.HBObjectCopy
+    return [('shade', shade_object.Id, data.Identifier, data.DisplayName)]
+
+
+def _grams(text, size=GRAM_SIZE):
+    return set(map(''.join, zip(*[text[i:] for i in range(size)])))
+
+
+class SubObjectIndex(object):
+    """N-gram index of the sub-objects of the rooms of a document.
+
+    Each entry is (kind, owner Id, key, identifier, display name). The owner
+    is the room (or the shade object) that holds the entry.
+    """
+
+    def __init__(self, gram_size=GRAM_SIZE):
+        self.gram_size = gram_size
+        self.version = 0  # changes every time the entries change
+        self.built = False
+        self.room_type = None
+        self.shade_type = None
+        self._clear()
+
+    def _clear(self):
+        self.entries = []
+        self._grams = dict((_, {}) for _ in ATTRIBUTES)  # n-gram > list of entries
+        self._owners = {}  # owner key > (owner Id, entries)
+        self._sub_owners = {}  # aperture/door key > owner key
+        self._sub_entries = {}  # aperture/door key > live entry
+        self._dead = set()
+
+    def __len__(self):
+        return len(self.entries) - len(self._dead)
+
+    def build(self, owners):
+        """Index all the (owner Id, records) of a document."""
+        self._clear()
+        for owner_id, records in owners:
+            self.add(owner_id, records)
+        self.built = True
+
+    def _add_entry(self, owner_key, entry):
+        entry_id = len(self.entries)
+        self.entries.append(entry)
+        kind, _, sub_key, identifier, display_name = entry
+        for attr, text in zip(ATTRIBUTES, (identifier, display_name)):
+            grams = self._grams[attr]
+            for gram in _grams(text or '', self.gram_size):
+                postings = grams.get(gram)
+                if postings is None:
+                    grams[gram] = [entry_id]
+                else:
+                    postings.append(entry_id)
+        if kind in ('aperture', 'door'):
+            self._sub_owners[str(sub_key)] = owner_key
+            self._sub_entries[str(sub_key)] = entry_id
+        return entry_id
+
+    def add(self, owner_id, records):
+        """Index the records of a room or a shade object."""
+        key = str(owner_id)
+        self.discard(key)
+        self.version += 1
+        entry_ids = [self._add_entry(key, (rec[0], owner_id) + tuple(rec[1:]))
+                     for rec in records]
+        self._owners[key] = (owner_id, entry_ids)
+
+    def discard(self, owner_id):
+        """Remove the entries of a room or a shade object."""
+        key = str(owner_id)
+        owner_id, entry_ids = self._owners.pop(key, (None, None))
+        if not entry_ids:
+            return
+        for entry_id in entry_ids:
+            entry = self.entries[entry_id]
+            sub_key = str(entry[2])
+            if entry[0] in ('aperture', 'door') and self._sub_owners.get(sub_key) == key:
+                self._sub_owners.pop(sub_key)
+                if self._sub_entries.get(sub_key) == entry_id:
+                    self._sub_entries.pop(sub_key)
+        self._kill(entry_ids)
+
+    def add_sub_object(self, record):
+        """Index the record of an aperture or a door of an indexed room again.
+
+        Returns:
+            False if the room of the sub-object is not known.
+        """
+        sub_key = str(record[1])
+        owner_key = self._sub_owners.get(sub_key)
+        if owner_key is None or owner_key not in self._owners:
+            return False
+        self.discard_sub_object(sub_key)
+        owner_id, entry_ids = self._owners[owner_key]
+        entry_ids.append(
+            self._add_entry(owner_key, (record[0], owner_id) + tuple(record[1:])))
+        self.version += 1
+        return True
+
+    def discard_sub_object(self, object_id):
+        """Remove the entry of an aperture or a door. Its room stays known."""
+        entry_id = self._sub_entries.pop(str(object_id), None)
+        if entry_id is not None:
+            self._kill([entry_id])
+
+    def _kill(self, entry_ids):
+        self._dead.update(entry_ids)
+        self.version += 1
+        if len(self._dead) > max(len(self.entries) - len(self._dead), 1000):
+            self._compact()
+
+    def owner_of(self, object_id):
+        """Get the Id of the room of an aperture or a door object."""
+        key = self._sub_owners.get(str(object_id))
+        return self._owners[key][0] if key in self._owners else None
+
+    def _compact(self):
+        dead = self._dead
+        owners = [(owner_id, [self.entries[_][:1] + self.entries[_][2:]
+                              for _ in ids if _ not in dead])
+                  for owner_id, ids in self._owners.values()]
+        self._clear()
+        for owner_id, records in owners:
+            self.add(owner_id, records)
+
+    def search(self, keyword, attribute='Identifier', kinds=None, candidates=None):
+        """Get the Ids of the entries whose attribute contains the keyword.
+
+        Args:
+            keyword: Text to find. The match is case sensitive.
+            attribute: Identifier or DisplayName.
+            kinds: Optional list of entry kinds to keep (e.g. ['face']).
+            candidates: Optional entry Ids to look in instead of the posting
+                lists (e.g. the matches of a shorter keyword).
+
+        Returns:
+            A sorted list of entry Ids. Use entries[entry_id] to get the entry.
+        """
+        text_i = 3 if attribute == 'Identifier' else 4
+        entries = self.entries
+        if candidates is not None:
+            pass
+        elif len(keyword) < self.gram_size:
+            candidates = range(len(entries))
+        else:
+            grams = self._grams[attribute]
+            candidates = None
+            for gram in _grams(keyword, self.gram_size):
+                postings = grams.get(gram)
+                if postings is None:
+                    return []
+                if candidates is None or len(postings) < len(candidates):
+                    candidates = postings
+
+        dead = self._dead
+        return [_ for _ in candidates
+                if keyword in (entries[_][text_i] or '') and _ not in dead
+                and (kinds is None or entries[_][0] in kinds)]
+
+
+class IncrementalSearch(object):
+    """Search as you type. A keyword that contains the previous one is only
+    looked for in the previous matches.
+
+    Args:
+        index: A SubObjectIndex.
+        attribute: Identifier or DisplayName.
+    """
+
+    def __init__(self, index, attribute='Identifier'):
+        self.index = index
+        self.attribute = attribute
+        self.narrowed = 0  # searches answered from the previous matches
+        self._last = None  # (keyword, attribute, index version, matches)
+
+    def search(self, keyword):
+        """Get the entry Ids that match the keyword."""
+        if not keyword:
+            self._last = None
+            return []
+        candidates = None
+        last = self._last
+        if last is not None and last[0] in keyword and \
+                last[1:3] == (self.attribute, self.index.version):
+            candidates = last[3]
+            self.narrowed += 1
+        matches = self.index.search(keyword, self.attribute, candidates=candidates)
+        self._last = (keyword, self.attribute, self.index.version, matches)
+        return matches
+
+
+def kind_counts(entries):
+    """Get the number of entries of each kind, in the order of KINDS."""
+    counts = dict((_, 0) for _ in KINDS)
+    for entry in entries:
+        counts[entry[0]] += 1
+    return [(_, counts[_]) for _ in KINDS]
+
+
+def select_entries(doc, entries):
+    """Select the sub-objects of some entries and redraw the views once.
+
+    The apertures, doors and shades are selected with one call. The faces are
+    grouped by room.
+
+    Returns:
+        The number of selected sub-objects.
+    """
+    import Rhino
+    import System
+    from System.Collections.Generic import List
+
+    object_ids = List[System.Guid]()
+    room_faces = {}  # room Id > face indices
+    for kind, owner_id, key, _, _ in entries:
+        if kind == 'face':
+            room_faces.setdefault(owner_id, []).append(key)
+        else:
+            object_ids.Add(key)
+
+    doc.Views.RedrawEnabled = False
+    try:
+        count = doc.Objects.Select(object_ids, True) if object_ids.Count else 0
+        for room_id, face_indices in room_faces.items():
+            room = doc.Objects.FindId(room_id)
+            if room is None:
+                continue
+            for face_index in face_indices:
+                component = Rhino.Geometry.ComponentIndex(
+                    Rhino.Geometry.ComponentIndexType.BrepFace, face_index)
+                if room.SelectSubObject(component, True, True, True) > 0:
+                    count += 1
+    finally:
+        doc.Views.RedrawEnabled = True
+        doc.Views.Redraw()
+    return count
+
+
+def entry_bounding_box(doc, entry):
+    """Get the bounding box of the sub-object of an entry or None."""
+    kind, owner_id, key = entry[:3]
+    obj = doc.Objects.FindId(owner_id if kind == 'face' else key)
+    if obj is None:
+        return None
+    if kind == 'face':
+        brep = obj.BrepGeometry
+        if key >= brep.Faces.Count:
+            return None
+        return brep.Faces[key].DuplicateFace(False).GetBoundingBox(True)
+    return obj.Geometry.GetBoundingBox(True)
+
+
+def zoom_to_entries(doc, entries, tolerance=0):
+    """Zoom the active view to the sub-objects of some entries.
+
+    Only the objects of the entries are looked up, the document is not scanned.
+    """
+    import Rhino
+    bbox = Rhino.Geometry.BoundingBox.Empty
+    for entry in entries:
+        entry_bbox = entry_bounding_box(doc, entry)
+        if entry_bbox is not None and entry_bbox.IsValid:
+            bbox.Union(entry_bbox)
+    if not bbox.IsValid:
+        return False
+    bbox.Inflate(max(tolerance, bbox.Diagonal.Length * 0.05))
+    doc.Views.ActiveView.ActiveViewport.ZoomBoundingBox(bbox)
+    doc.Views.Redraw()
+    return True
+
+
+def _index(doc):
+    return session.document_store(doc, 'subobject_index', SubObjectIndex)
+
+
+def _records(index, rhino_object):
+    if index.room_type and isinstance(rhino_object, index.room_type):
+        return room_sub_objects(rhino_object)
+    if index.shade_type and isinstance(rhino_object, index.shade_type):
+        return shade_sub_objects(rhino_object)
+    return None
+
+
+def _on_add(doc, object_id, rhino_object):
+    index = _index(doc)
+    if not index.built:
+        return
+    records = _records(index, rhino_object)
+    if records is not None:
+        index.add(object_id, records)
+    elif index.owner_of(object_id) is not None:
+        # a renamed aperture or door changes its own object, not the room
+        record = sub_object_record(object_id, rhino_object)
+        if record is not None:
+            index.add_sub_object(record)
+
+
+def _on_delete(doc, object_id, rhino_object):
+    # nothing is read from the document, the objects can be half replaced
+    index = _index(doc)
+    if index.built:
+        index.discard(object_id)
+        index.discard_sub_object(object_id)
+
+
+def get_subobject_index(doc, room_type, shade_type=None):
+    """Get the sub-object index of a Rhino document.
+
+    Args:
+        doc: A RhinoDoc.
+        room_type: The Pollination RoomObject class used to filter the objects.
+        shade_type: Optional Pollination ShadeObject class. Shades are only
+            indexed when it is given.
+    """
+    events.subscribe('add', 'subobject_index', _on_add)
+    events.subscribe('replace', 'subobject_index', _on_add)
+    events.subscribe('delete', 'subobject_index', _on_delete)
+
+    index = _index(doc)
+    index.room_type = room_type
+    index.shade_type = shade_type
+    if not index.built:
+        owners = []
+        for obj in doc.Objects:
+            records = _records(index, obj)
+            if records is not None:
+                owners.append((obj.Id, records))
+        index.build(owners)
+    return index
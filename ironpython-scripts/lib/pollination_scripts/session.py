@@ -0,0 +1,43 @@
+"""
+Storage that lives across script runs in the same Rhino session.
+------------------------------------------------------------------------------
+Rhino keeps scriptcontext.sticky alive until it closes, so the values stored
+here survive the script engine reloading the modules.
+Outside of Rhino a module level dictionary is used.
+"""
+
+_store = {}
+_sticky = []  # the dictionary found by the first call, the import is slow
+_DOCUMENTS = 'pollination_scripts.documents'
+
+
+def sticky():
+    """Get the dictionary shared by all the script runs of the session."""
+    if not _sticky:
+        try:
+            import scriptcontext
+            _sticky.append(scriptcontext.sticky)
+        except ImportError:  # outside Rhino
+            _sticky.append(_store)
+    return _sticky[0]
+
+
+def document_store(doc, name, factory):
+    """Get the object stored under name for a Rhino document.
+
+    Args:
+        doc: A RhinoDoc.
+        name: Text for the kind of object (e.g. 'room_cache').
+        factory: A function without arguments used to create the object the
+            first time it is requested for the document.
+    """
+    documents = sticky().setdefault(_DOCUMENTS, {})
+    store = documents.setdefault(doc.RuntimeSerialNumber, {})
+    if name not in store:
+        store[name] = factory()
+    return store[name]
+
+
+def forget_document(doc):
+    """Remove all the objects stored for a Rhino document."""
+    sticky().get(_DOCUMENTS, {}).pop(doc.RuntimeSerialNumber, None)
@@ -0,0 +1,111 @@
+"""
+Index of the Pollination rooms by story.
+------------------------------------------------------------------------------
+Strategy:
+    1. Scan the document once the first time a script asks for the index
+    2. Keep it up to date from the add, replace and delete events
+    3. Look up the rooms of a story without scanning the document
+"""
+
+from pollination_scripts import session, events
+
+# the story of the rooms without one, listed after the named stories
+NO_STORY = '(no story)'
+
+
+class StoryIndex(object):
+    """Story > room Id index of the rooms of a document."""
+
+    def __init__(self):
+        self.built = False
+        self.room_type = None
+        self._stories = {}  # story > {room key: room Id}
+        self._room_story = {}  # room key > story
+
+    def __len__(self):
+        return len(self._room_story)
+
+    def build(self, rooms):
+        """Index all the rooms of a document."""
+        self._stories = {}
+        self._room_story = {}
+        for rm in rooms:
+            self.add(rm)
+        self.built = True
+
+    def add(self, room_object):
+        room_id = room_object.Id
+        key = str(room_id)
+        self.discard(key)
+        story = room_object.Data.HBObjectCopy.Story or NO_STORY
+        self._stories.setdefault(story, {})[key] = room_id
+        self._room_story[key] = story
+
+    def discard(self, room_id):
+        key = str(room_id)
+        story = self._room_story.pop(key, None)
+        rooms = self._stories.get(story)
+        if rooms is None:
+            return
+        rooms.pop(key, None)
+        if not rooms:
+            del self._stories[story]
+
+    def stories(self):
+        """Get the sorted names of the stories.
+
+        The rooms without a story are under NO_STORY, the last item.
+        """
+        stories = sorted(_ for _ in self._stories if _ != NO_STORY)
+        if NO_STORY in self._stories:
+            stories.append(NO_STORY)
+        return stories
+
+    def room_ids(self, story):
+        return list(self._stories.get(story, {}).values())
+
+    def rooms(self, doc, story):
+        """Get the Pollination rooms of a story."""
+        rooms = []
+        for room_id in self.room_ids(story):
+            rm = doc.Objects.FindId(room_id)
+            if rm is not None:
+                rooms.append(rm)
+        return rooms
+
+
+def _index(doc):
+    return session.document_store(doc, 'story_index', StoryIndex)
+
+
+def _on_add(doc, object_id, rhino_object):
+    index = _index(doc)
+    if index.room_type and isinstance(rhino_object, index.room_type):
+        index.add(rhino_object)
+
+
+def _on_replace(doc, object_id, rhino_object):
+    _index(doc).discard(object_id)
+    _on_add(doc, object_id, rhino_object)
+
+
+def _on_delete(doc, object_id, rhino_object):
+    _index(doc).discard(object_id)
+
+
+def get_story_index(doc, room_type):
+    """Get the story index of a Rhino document.
+
+    Args:
+        doc: A RhinoDoc.
+        room_type: The Pollination RoomObject class used to filter the objects.
+    """
+    events.subscribe('add', 'story_index', _on_add)
+    events.subscribe('replace', 'story_index', _on_replace)
+    events.subscribe('delete', 'story_index', _on_delete)
+
+    index = _index(doc)
+    index.room_type = room_type
+    if not index.built:
+        index.build(_ for _ in doc.Objects if isinstance(_, room_type))
+    return index
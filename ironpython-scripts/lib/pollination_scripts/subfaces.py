@@ -0,0 +1,162 @@
+"""
+Cache of the aperture sub-faces generated from the wall Face3Ds.
+------------------------------------------------------------------------------
+Strategy:
+    1. Fingerprint each face before any extraction: its vertices are rotated
+       about the Z axis to face -Y, moved to the origin and rounded to the
+       tolerance
+    2. On a miss, run honeybee on the face rebuilt from the fingerprint and
+       store its sub-faces in that canonical frame
+    3. Move the sub-faces back to the face with the same rotation and
+       translation
+
+The rotation is about the Z axis only since honeybee extracts the rectangle
+from the horizontal and the vertical edges. The cached sub-faces only depend
+on the fingerprint, not on the face that filled the cache, and are within the
+tolerance of the honeybee ones. The cache lives in the session sticky and is
+shared by all the documents.
+"""
+
+import threading
+from collections import OrderedDict
+
+try:  # import ladybug dependencies
+    from ladybug_geometry.geometry3d.pointvector import Point3D
+    from ladybug_geometry.geometry3d.face import Face3D
+except ImportError as e:
+    raise ImportError('\nFailed to import:\n\t{}'.format(e))
+
+from pollination_scripts import session
+
+DEFAULT_SIZE = 10000
+_CACHE = 'pollination_scripts.subfaces'
+
+
+class SubFaceCache(object):
+    """LRU cache of the sub-faces of the wall fingerprints. It is safe to use from worker threads."""
+
+    def __init__(self, max_size=DEFAULT_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._faces = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._faces)
+
+    def get(self, key):
+        """Get the cached sub-faces or None if they are missing."""
+        with self._lock:
+            value = self._faces.pop(key, None)
+            if value is None:
+                self.misses += 1
+                return None
+            self._faces[key] = value  # most recently used goes last
+            self.hits += 1
+            return value
+
+    def set(self, key, loops):
+        with self._lock:
+            self._faces.pop(key, None)
+            self._faces[key] = loops
+            while len(self._faces) > self.max_size:
+                self._faces.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._faces.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+def get_subface_cache():
+    """Get the sub-face cache of the session."""
+    store = session.sticky()
+    if _CACHE not in store:
+        store[_CACHE] = SubFaceCache()
+    return store[_CACHE]
+
+
+def _fingerprint(face3d, tolerance):
+    """Get the canonical frame and the fingerprint of a Face3D.
+
+    Returns:
+        A (frame, key) tuple, where frame is (ux, uy, origin) with (ux, uy) the
+        horizontal direction of the normal and origin the minimum corner of the
+        rotated vertices, and key the rotated vertices relative to origin in
+        tolerance units, starting from the smallest one. None if the face has
+        holes or is horizontal.
+    """
+    if face3d.has_holes:
+        return None
+    normal = face3d.normal
+    length = (normal.x ** 2 + normal.y ** 2) ** .5
+    if length <= tolerance:
+        return None
+    ux, uy = normal.x / length, normal.y / length
+
+    # rotate about Z so the normal faces -Y
+    pts = [(pt.x * -uy + pt.y * ux, pt.x * -ux + pt.y * -uy, pt.z)
+           for pt in face3d.boundary]
+    origin = tuple(min(_) for _ in zip(*pts))
+    ox, oy, oz = origin
+    key = [(int(round((x - ox) / tolerance)), int(round((y - oy) / tolerance)),
+            int(round((z - oz) / tolerance))) for x, y, z in pts]
+    start = key.index(min(key))
+    return (ux, uy, origin), tuple(key[start:] + key[:start])
+
+
+def _canonical_loops(key, tolerance, compute):
+    """Run compute on the face of a fingerprint and get its sub-faces as loops."""
+    face3d = Face3D([Point3D(x * tolerance, y * tolerance, z * tolerance)
+                     for x, y, z in key])
+    return tuple(tuple((pt.x, pt.y, pt.z) for pt in face.boundary)
+                 for face in compute(face3d))
+
+
+def _cached_sub_faces(face3d, params, tolerance, compute, cache):
+    """Get the sub-faces of a Face3D from the cache.
+
+    compute gets a Face3D and returns its sub-faces with honeybee.
+    """
+    fingerprint = _fingerprint(face3d, tolerance)
+    if fingerprint is None:
+        return compute(face3d)
+    (ux, uy, (ox, oy, oz)), key = fingerprint
+
+    cache = cache if cache is not None else get_subface_cache()
+    key = (params, tolerance, key)
+    loops = cache.get(key)
+    if loops is None:
+        loops = _canonical_loops(key[2], tolerance, compute)
+        cache.set(key, loops)
+
+    # rotate back about Z, the transpose of the rotation of _fingerprint
+    plane = face3d.plane
+    return [Face3D([Point3D((x + ox) * -uy + (y + oy) * -ux,
+                            (x + ox) * ux + (y + oy) * -uy, z + oz)
+                    for x, y, z in loop], plane)
+            for loop in loops]
+
+
+def sub_faces_by_ratio_rectangle(face3d, ratio, tolerance, cache=None):
+    """Cached version of Face3D.sub_faces_by_ratio_rectangle."""
+    def compute(face):
+        return face.sub_faces_by_ratio_rectangle(ratio, tolerance)
+
+    return _cached_sub_faces(face3d, ('rectangle', ratio), tolerance, compute, cache)
+
+
+def sub_faces_by_ratio_sub_rectangle(face3d, ratio, sub_rect_height, sill_height,
+                                     horizontal_separation, vertical_separation,
+                                     tolerance, cache=None):
+    """Cached version of Face3D.sub_faces_by_ratio_sub_rectangle."""
+    def compute(face):
+        return face.sub_faces_by_ratio_sub_rectangle(
+            ratio, sub_rect_height, sill_height, horizontal_separation,
+            vertical_separation, tolerance)
+
+    params = ('sub_rectangle', ratio, sub_rect_height, sill_height,
+              horizontal_separation, vertical_separation)
+    return _cached_sub_faces(face3d, params, tolerance, compute, cache)
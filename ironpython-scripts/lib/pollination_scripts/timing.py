@@ -0,0 +1,154 @@
+"""
+Named timing spans for the scripts.
+------------------------------------------------------------------------------
+Usage:
+    timing.start('modify_room_wwr')
+    with timing.span('convert'):
+        ...
+    timing.finish()
+
+The spans do nothing until timing is turned on. Turn it on for the session
+with timing.configure(True, log_path) (e.g. from the Rhino python editor), or
+with the POLLINATION_SCRIPTS_TIMING and POLLINATION_SCRIPTS_TIMING_LOG
+environment variables. When it is on, finish prints a summary by stage and
+appends a JSON line to the log file if there is one. finish always reports the
+document event updates that failed since the last run.
+"""
+
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+
+from pollination_scripts import session, events
+
+try:
+    _clock = time.perf_counter
+except AttributeError:  # IronPython 2.7
+    _clock = time.clock
+
+_SETTINGS = 'pollination_scripts.timing'
+_lock = threading.Lock()
+_state = {'enabled': False, 'script': None, 'start': None, 'spans': OrderedDict()}
+
+
+class _NullSpan(object):
+    """Span used when timing is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span(object):
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self._start = _clock()
+        return self
+
+    def __exit__(self, *args):
+        record(self.name, _clock() - self._start)
+        return False
+
+
+def configure(enabled=True, log_path=None):
+    """Turn timing on or off for all the next script runs of the session.
+
+    Args:
+        enabled: Set to True to time the scripts.
+        log_path: Optional path to a file where each run appends a JSON line.
+    """
+    session.sticky()[_SETTINGS] = {'enabled': enabled, 'log_path': log_path}
+
+
+def _settings():
+    settings = session.sticky().get(_SETTINGS)
+    if settings is not None:
+        return settings
+    return {
+        'enabled': os.environ.get('POLLINATION_SCRIPTS_TIMING', '') not in ('', '0'),
+        'log_path': os.environ.get('POLLINATION_SCRIPTS_TIMING_LOG')
+    }
+
+
+def is_enabled():
+    return _state['enabled']
+
+
+def start(script):
+    """Start timing a script run. It resets the spans of the previous run."""
+    _state['enabled'] = bool(_settings()['enabled'])
+    _state['script'] = script
+    _state['start'] = _clock()
+    _state['spans'] = OrderedDict()
+
+
+def span(name):
+    """Get a context manager that adds its run time to the named stage."""
+    if not _state['enabled']:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def record(name, seconds):
+    """Add a duration to the named stage. Spans of worker threads add up."""
+    with _lock:
+        spans = _state['spans']
+        if name not in spans:
+            spans[name] = [0, 0.0]
+        stats = spans[name]
+        stats[0] += 1
+        stats[1] += seconds
+
+
+def summary():
+    """Get a list of (name, count, seconds) for the stages of the run."""
+    return [(name, stats[0], stats[1]) for name, stats in _state['spans'].items()]
+
+
+def _plugin_version():
+    try:
+        import clr
+        import Core as po
+        return str(clr.GetClrType(po.Objects.RoomObject).Assembly.GetName().Version)
+    except Exception:  # outside Rhino or plugin not loaded
+        return None
+
+
+def finish(**extra):
+    """Print the summary and write the log line if timing is on.
+
+    Args:
+        extra: Other values to add to the log line (e.g. rooms=len(rooms)).
+    """
+    events.report_errors()
+    if not _state['enabled']:
+        return
+    total = _clock() - _state['start']
+    print('{} - {:.3f} s'.format(_state['script'], total))
+    for name, count, seconds in summary():
+        print('    {:<24}{:>8}{:>10.3f} s'.format(name, count, seconds))
+
+    log_path = _settings()['log_path']
+    if log_path:
+        line = {
+            'script': _state['script'],
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'plugin_version': _plugin_version(),
+            'total': total,
+            'spans': dict((name, {'count': count, 'seconds': seconds})
+                          for name, count, seconds in summary())
+        }
+        line.update(extra)
+        with open(log_path, 'a') as f:
+            f.write(json.dumps(line) + '\n')
+    _state['enabled'] = False
@@ -0,0 +1,189 @@
+"""
+Window to wall ratio utilities shared by the WWR scripts.
+------------------------------------------------------------------------------
+Everything here works on honeybee objects and ladybug Face3Ds, so it runs
+outside Rhino too. The scripts convert the Face3Ds with from_face3d.
+"""
+
+try:  # import honeybee dependencies
+    from honeybee.boundarycondition import Outdoors
+    from honeybee.facetype import Wall
+    from honeybee.orientation import check_matching_inputs, inputs_by_index
+except ImportError as e:
+    raise ImportError('\nFailed to import:\n\t{}'.format(e))
+
+from pollination_scripts.orientation import faces_orient_indices, HORIZONTAL
+from pollination_scripts.subfaces import sub_faces_by_ratio_rectangle, \
+    sub_faces_by_ratio_sub_rectangle
+
+
+def is_outdoor_and_wall(face):
+    return isinstance(face.boundary_condition, Outdoors) and \
+        isinstance(face.type, Wall)
+
+
+def has_aperture(face):
+    if face.apertures:
+        return True
+    return False
+
+
+def orient_outdoor_walls(hb_rooms, num_orient=4):
+    """Get the outdoor walls of each room with their orientation index.
+
+    The normals of the walls of all the rooms are classified in one pass.
+    Walls without horizontal orientation are left out.
+
+    Returns:
+        A list with a list of (orient_i, face) for each room.
+    """
+    room_walls = [[f for f in obj.faces if is_outdoor_and_wall(f)]
+                  for obj in hb_rooms]
+    indices = faces_orient_indices(
+        [f for walls in room_walls for f in walls], num_orient).tolist()
+
+    oriented = []
+    i = 0
+    for walls in room_walls:
+        room_oriented = []
+        for face in walls:
+            orient_i = indices[i]
+            i += 1
+            if orient_i != HORIZONTAL:
+                room_oriented.append((orient_i, face))
+        oriented.append(room_oriented)
+    return oriented
+
+
+# EDIT WWR
+#---------------------------------------------------------------------------------------------#
+def get_faces_group_by_orientation(hb_rooms, num_orient=4):
+    """Get the outdoor walls of the rooms grouped by orientation (N E S W)."""
+    # duplicate the initial objects
+    hb_objs = [obj.duplicate() for obj in hb_rooms]
+
+    # one list for each orientation, starting with an empty item
+    group_faces = [[None] for _ in range(num_orient)]
+    for walls in orient_outdoor_walls(hb_objs, num_orient):
+        for orient_i, face in walls:
+            group_faces[orient_i].append(face)
+
+    return group_faces
+
+
+def get_current_wwr(group_faces, overall=False):
+    """Get the ratio of aperture area to wall area of each orientation.
+
+    Args:
+        group_faces: The output of get_faces_group_by_orientation.
+        overall: Set to True to use all the walls. By default only the walls
+            with apertures are used.
+    """
+    in_ratios = []
+
+    for faces in group_faces:
+        face_apt_area = []
+        face_wall_area = []
+        ratio = 0
+
+        for face in faces:
+            if face is None:
+                continue
+            if not has_aperture(face) and not overall:
+                continue
+            face_wall_area.append(face.area)
+            face_apt_area.append(face.aperture_area)
+
+        aperture_area = sum(face_apt_area)
+        wall_area = sum(face_wall_area)
+
+        # avoid divided by 0
+        if not wall_area:
+            wall_area = 1
+        ratio = round(aperture_area / float(wall_area), 2)
+
+        in_ratios.append(ratio)
+    return in_ratios
+
+
+def sub_faces_from_ratio(face, rat, tolerance):
+    """Get the new aperture Face3Ds of a wall that already has apertures."""
+    if face is None:
+        return None
+
+    face3ds = []
+    if is_outdoor_and_wall(face) and has_aperture(face):
+        face3ds = sub_faces_by_ratio_rectangle(face.geometry, rat, tolerance)
+    return face3ds
+
+
+def get_orientation_face3ds(faces, ratio, tolerance):
+    """Get the new aperture Face3Ds of the walls of one orientation.
+
+    Returns:
+        A list of (room identifier, Face3D), so each room only gets the
+        apertures of its own faces.
+    """
+    face3ds = []
+    for face in faces:
+        geos = sub_faces_from_ratio(face, ratio, tolerance)
+        if geos:
+            room_id = face.parent.identifier
+            face3ds.extend((room_id, geo) for geo in geos)
+    return face3ds
+
+
+def get_aperture_face3ds_by_room(group_faces, in_ratio, out_ratio, tolerance):
+    """Get the new aperture Face3Ds of all the orientations by host.
+
+    Returns:
+        A dictionary with a list of Face3D for each room identifier.
+    """
+    face3ds = {}
+    for i, faces in enumerate(group_faces):
+        if in_ratio[i] == 0:
+            continue
+
+        for room_id, geo in get_orientation_face3ds(faces, out_ratio[i], tolerance):
+            face3ds.setdefault(room_id, []).append(geo)
+
+    return face3ds
+
+
+# CREATE APERTURES BY WWR
+#---------------------------------------------------------------------------------------------#
+def face3ds_from_ratio(all_inputs, subdivide, orient_i, face, tolerance=0.01):
+    """Get the aperture Face3Ds of an outdoor wall using its orientation inputs."""
+    rat, hgt, sil, hor, vert = inputs_by_index(orient_i, all_inputs)
+    if not rat:
+        return []
+
+    if subdivide:
+        face3ds = sub_faces_by_ratio_sub_rectangle(
+            face.geometry, rat, hgt, sil, hor, vert, tolerance)
+    else:
+        face3ds = sub_faces_by_ratio_rectangle(face.geometry, rat, tolerance)
+    return face3ds or []
+
+
+def get_room_aperture_face3ds(hb_obj, ratio, win_height, sill_height,
+                              horiz_separ, vertical_separ, subdivide=False,
+                              walls=None):
+    """Get the aperture Face3Ds of a room given a ratio for each orientation.
+
+    Args:
+        walls: Optional output of orient_outdoor_walls for this room. Pass it
+            to classify the walls of many rooms in one pass.
+    """
+    # gather all of the inputs together
+    all_inputs = [ratio, [win_height], [sill_height], [horiz_separ],
+                  [vertical_separ]]
+
+    all_inputs, num_orient = check_matching_inputs(all_inputs)
+    if walls is None:
+        walls = orient_outdoor_walls([hb_obj], num_orient)[0]
+
+    face3ds = []
+    for orient_i, face in walls:
+        face3ds.extend(face3ds_from_ratio(all_inputs, subdivide, orient_i, face))
+    return face3ds
@@ -5,7 +5,7 @@ Instructions:
     1. Run the script
 ------------------------------------------------------------------------------
 Strategy:
-    1. Get all Pollination constructions
+    1. Get the constructions of the Pollination model library
     2. Use Honeybee for reporting
 """
 
@@ -27,9 +27,18 @@ import Core.Convert as co # It contains utilities to convert RhinoObject <> HB S
 # import List collection
 from System.Collections.Generic import List
 
+# import shared modules
+import os
+import sys
+lib_path = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'lib')
+if lib_path not in sys.path: sys.path.append(lib_path)
+from pollination_scripts import timing
+timing.start('report_construction_properties')
+
 try:  # import honeybee dependencies
-    import json
-    import honeybee.dictutil as hb_dict_util
+    from pollination_scripts.constructions import model_construction_metrics, \
+        get_metrics_cache
     from honeybee_energy.construction.opaque import OpaqueConstruction
     from honeybee_energy.construction.window import WindowConstruction
     from honeybee_energy.construction.windowshade import WindowConstructionShade
@@ -131,55 +140,40 @@ class ConstructionGridView(forms.Dialog[bool]):
 #---------------------------------------------------------------------------------------------#
 # TODO: Check if properties are correct
 
-# get all active constructions
-model = json.loads(current_model.GetHBModel().ToJson())
-hb_model = hb_dict_util.dict_to_object(model, False)
-constuctions = hb_model.properties.energy.constructions
+# get the metrics of all active constructions, only the library is read and
+# the constructions that did not change since the last run are not converted
+with timing.span('convert'):
+    errors = []
+    constuctions = model_construction_metrics(
+        current_model.HBModelProperties.Energy, errors=errors)
+for error in errors:
+    print error
 
 # check if it is empty
 if not constuctions:
     forms.MessageBox.Show("Please, assign constructions first!")
 
-data = []
-for constr in constuctions:
-    # get the materials, r-value and u-factor
-    if isinstance(constr, AirBoundaryConstruction) \
-    or isinstance(constr, ShadeConstruction): continue
-    layers = constr.layers
-    r_val_si = constr.r_value
-    r_val_ip = RValue().to_ip([r_val_si], 'm2-K/W')[0][0]
-    u_fac_si = constr.u_factor
-    u_fac_ip = UValue().to_ip([u_fac_si], 'W/m2-K')[0][0]
-    
-    # get the transmittance
-    if isinstance(constr, WindowConstruction):
-        t_sol = constr.solar_transmittance
-        t_vis = constr.visible_transmittance
-        mass_area_density = 0
-    elif isinstance(constr, WindowConstructionShade):  # get unshaded transmittance
-        t_sol = constr.window_construction.solar_transmittance
-        t_vis = constr.window_construction.visible_transmittance
-        mass_area_density = 0
-        
-    else:
-        t_sol = 0
-        t_vis = 0
-        mass_area_density = constr.mass_area_density
-    
-    if hasattr(constr, 'thickness'):
-        thickness = constr.thickness
-    else:
-        thickness = 0
+with timing.span('rows'):
+    # convert the units of each column in one call
+    r_val_si = [metrics[0] for _, metrics in constuctions]
+    u_fac_si = [metrics[1] for _, metrics in constuctions]
+    r_val_ip = RValue().to_ip(r_val_si, 'm2-K/W')[0] if constuctions else []
+    u_fac_ip = UValue().to_ip(u_fac_si, 'W/m2-K')[0] if constuctions else []
     
-    numeric = [r_val_si, \
-                r_val_ip, u_fac_si, u_fac_ip, \
-                t_sol, t_vis, mass_area_density, thickness]
+    data = []
+    for i, (display_name, metrics) in enumerate(constuctions):
+        r_si, u_si, t_sol, t_vis, mass_area_density, thickness = metrics
+        numeric = [r_si, r_val_ip[i], u_si, u_fac_ip[i], \
+                    t_sol, t_vis, mass_area_density, thickness]
     
-    numeric = list(map(lambda _ : round(_, 3), numeric))
+        numeric = list(map(lambda _ : round(_, 3), numeric))
     
-    row = [constr.display_name]
-    row.extend(numeric)
-    data.append(row)
+        row = [display_name]
+        row.extend(numeric)
+        data.append(row)
+metrics_cache = get_metrics_cache()
+timing.finish(constructions=len(data), metrics_hits=metrics_cache.hits,
+              metrics_misses=metrics_cache.misses)
 
 # show the table
 if constuctions:
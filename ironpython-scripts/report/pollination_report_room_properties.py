@@ -6,7 +6,8 @@ Instructions:
 ------------------------------------------------------------------------------
 Strategy:
     1. Get all Pollination Rooms
-    2. Use Honeybee for reporting
+    2. Measure the Rhino geometry of the rooms on all the cores (or use
+       Honeybee for reporting)
 """
 
 # import rhinocommon and Eto
@@ -27,12 +28,22 @@ import Core.Convert as co # It contains utilities to convert RhinoObject <> HB S
 # import List collection
 from System.Collections.Generic import List
 
+# import shared modules
+import os
+import sys
+lib_path = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'lib')
+if lib_path not in sys.path: sys.path.append(lib_path)
+from pollination_scripts import timing
+timing.start('report_room_properties')
+
 try:  # import honeybee dependencies
     import io
     import csv
-    import json
-    import honeybee.dictutil as hb_dict_util
-    from honeybee.room import Room
+    from pollination_scripts.cache import get_hb_room
+    from pollination_scripts.parallel import parallel_map
+    from pollination_scripts.report import RoomTable, room_name, \
+        room_object_inputs, room_object_metrics
 except ImportError as e:
     raise ImportError('\nFailed to import:\n\t{}'.format(e))
 
@@ -49,7 +60,8 @@ doc_unit = Rhino.RhinoDoc.ActiveDoc.ModelUnitSystem
 objects = Rhino.RhinoDoc.ActiveDoc.Objects
 
 # filter by rooms
-rooms = [_ for _ in objects if isinstance(_, po.Objects.RoomObject)]
+with timing.span('selection'):
+    rooms = [_ for _ in objects if isinstance(_, po.Objects.RoomObject)]
 
 if not rooms:
     raise ValueError('No rooms found.')
@@ -60,57 +72,33 @@ if not rooms:
 # define Eto grid
 class RoomGridView(forms.Dialog[bool]):
     
-    def __init__(self, data):
-        unit = str(doc_unit).lower()
-        
-        self._data = data
+    def __init__(self, table):
+        self._table = table
+        self._sort = None  # (column, descending)
         self.Title = "Room report"
         self.Resizable = True
+        
+        # the data store only holds row indices, the cells are made on demand
         self.m_gridview = forms.GridView()
         self.m_gridview.ShowHeader = True
-        self.m_gridview.DataStore = data
         self.m_gridview.Height = 300
+        self.m_gridview.ColumnHeaderClick += self.OnColumnHeaderClick
         
-        self._header = ('display_name', 'floor_area [{}2]'.format(unit),
-        'volume [{}3]'.format(unit), 'exposed_area [{}2]'.format(unit),
-        'exterior_wall_aperture_area [{}2]'.format(unit), 
-        'exterior_wall_area [{}2]'.format(unit))
-        
-        column1 = forms.GridColumn()
-        column1.HeaderText = self._header[0]
-        column1.Editable = True
-        column1.DataCell = forms.TextBoxCell(0)
-        self.m_gridview.Columns.Add(column1)
-
-        column2 = forms.GridColumn()
-        column2.HeaderText = self._header[1]
-        column2.Editable = True
-        column2.DataCell = forms.TextBoxCell(1)
-        self.m_gridview.Columns.Add(column2)
-
-        column3 = forms.GridColumn()
-        column3.HeaderText = self._header[2]
-        column3.Editable = True
-        column3.DataCell = forms.TextBoxCell(2)
-        self.m_gridview.Columns.Add(column3)
-
-        column4 = forms.GridColumn()
-        column4.HeaderText = self._header[3]
-        column4.Editable = True
-        column4.DataCell = forms.TextBoxCell(3)
-        self.m_gridview.Columns.Add(column4)
+        for i, header in enumerate(table.header):
+            column = forms.GridColumn()
+            column.HeaderText = header
+            column.Editable = False
+            column.Sortable = True
+            column.DataCell = forms.TextBoxCell()
+            column.DataCell.Binding = forms.Binding.Delegate[System.Object, System.String](
+                self.CellText(i))
+            self.m_gridview.Columns.Add(column)
         
-        column5 = forms.GridColumn()
-        column5.HeaderText = self._header[4]
-        column5.Editable = True
-        column5.DataCell = forms.TextBoxCell(4)
-        self.m_gridview.Columns.Add(column5)
+        self.m_filter = forms.SearchBox()
+        self.m_filter.PlaceholderText = 'Filter by name'
+        self.m_filter.TextChanged += self.OnFilterChanged
         
-        column6 = forms.GridColumn()
-        column6.HeaderText = self._header[5]
-        column6.Editable = True
-        column6.DataCell = forms.TextBoxCell(5)
-        self.m_gridview.Columns.Add(column6)
+        self.m_count = forms.Label()
         
         self.m_button = forms.Button(self.OnSaveButton)
         self.m_button.Text = 'Save File'
@@ -118,6 +106,7 @@ class RoomGridView(forms.Dialog[bool]):
         layout = forms.DynamicLayout()
         layout.Padding = drawing.Padding(10)
         layout.Spacing = drawing.Size(5, 5)
+        layout.AddRow(self.m_filter, self.m_count)
         layout.Add(self.m_gridview)
         layout.Add(self.m_button)
         
@@ -126,6 +115,26 @@ class RoomGridView(forms.Dialog[bool]):
         self.save_dialog.FileName = '{}.csv'.format(Rhino.RhinoDoc.ActiveDoc.Name)
         
         self.Content = layout
+        self.UpdateView()
+    
+    def CellText(self, column):
+        table = self._table
+        return lambda row: table.cell(row, column)
+    
+    def UpdateView(self):
+        column, descending = self._sort or (None, False)
+        rows = self._table.view(column, descending, self.m_filter.Text)
+        self.m_gridview.DataStore = rows
+        self.m_count.Text = '{} of {} rooms'.format(len(rows), len(self._table))
+    
+    def OnColumnHeaderClick(self, s, e):
+        column = list(self.m_gridview.Columns).index(e.Column)
+        descending = self._sort == (column, False)
+        self._sort = (column, descending)
+        self.UpdateView()
+    
+    def OnFilterChanged(self, s, e):
+        self.UpdateView()
     
     def OnSaveButton(self, s, e):
         result = self.save_dialog.ShowDialog(self.m_gridview)
@@ -134,27 +143,37 @@ class RoomGridView(forms.Dialog[bool]):
         if result == forms.DialogResult.Ok:
             with io.open(self.save_dialog.FileName, 'w', newline='') as file:
                 writer = csv.writer(file, delimiter=',')
-                writer.writerow(self._header)
-                writer.writerows(data)
+                writer.writerow(self._table.header)
+                writer.writerows(self._table.rows())
             
             forms.MessageBox.Show(self, "Done!", self.Title)
 
 # create the dataset
-data = []
-for rm in rooms:
-    hb_dict = json.loads(rm.ToHBObject().ToJson())
-    hb_room = hb_dict_util.dict_to_object(hb_dict, False)
-    numeric = [hb_room.floor_area, \
-                hb_room.volume, hb_room.exposed_area, hb_room.exterior_wall_aperture_area, \
-                hb_room.exterior_wall_area]
-    numeric = map(int, numeric)
-    
-    row = [hb_room.display_name]
-    row.extend(numeric)
-    
-    data.append(row)
+unit = str(doc_unit).lower()
+table = RoomTable(('display_name', 'floor_area [{}2]'.format(unit),
+    'volume [{}3]'.format(unit), 'exposed_area [{}2]'.format(unit),
+    'exterior_wall_aperture_area [{}2]'.format(unit), 
+    'exterior_wall_area [{}2]'.format(unit)))
+geometry_only = True  # set to False to report the converted honeybee rooms
+
+if geometry_only:
+    with timing.span('read_rooms'):
+        names = [room_name(rm) for rm in rooms]
+        inputs = [room_object_inputs(rm) for rm in rooms]
+    with timing.span('metrics'):
+        metrics = parallel_map(lambda _: room_object_metrics(_, tol), inputs)
+    with timing.span('rows'):
+        for name, values in zip(names, metrics):
+            table.add_values(name, values)
+else:
+    for rm in rooms:
+        with timing.span('convert'):
+            hb_room = get_hb_room(doc, rm)
+        with timing.span('rows'):
+            table.add(hb_room)
+timing.finish(rooms=len(rooms), geometry_only=geometry_only)
 
 # show the table
 if rooms:
-    dialog = RoomGridView(data)
+    dialog = RoomGridView(table)
     rc = dialog.ShowModal(Rhino.UI.RhinoEtoApp.MainWindow)
\ No newline at end of file
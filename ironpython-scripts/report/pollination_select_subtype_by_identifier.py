@@ -3,11 +3,15 @@ Search sub-objects by Identifier
 ------------------------------------------------------------------------------
 Instructions:
     1. Run the script
-    2. Type the keyword
+    2. Type the keyword, the matches are listed while typing
+    3. Zoom to the matches if needed and select them
 ------------------------------------------------------------------------------
 Strategy:
-    1. Get all Pollination Rooms
-    2. Seach by Identifier (Apertures, Doors, Faces)
+    1. Get the sub-object index of the document. It is built the first time
+       and kept up to date from the document events
+    2. Seach by Identifier or DisplayName (Apertures, Doors, Faces, Shades)
+    3. Look for a longer keyword only in the matches of the shorter one
+    4. Select all the matches at once and redraw the views one time
 """
 
 # import rhinocommon and Eto
@@ -31,12 +35,23 @@ from Core import EntityHelper
 # import List collection
 from System.Collections.Generic import List
 
+# import shared modules
+import os
+import sys
+lib_path = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'lib')
+if lib_path not in sys.path: sys.path.append(lib_path)
+from pollination_scripts import timing
+timing.start('select_subtype_by_identifier')
+
 try:  # import honeybee dependencies
     import io
     import csv
     import json
     import honeybee.dictutil as hb_dict_util
     from honeybee.room import Room
+    from pollination_scripts.search import get_subobject_index, \
+        IncrementalSearch, select_entries, kind_counts, zoom_to_entries
 except ImportError as e:
     raise ImportError('\nFailed to import:\n\t{}'.format(e))
 
@@ -52,78 +67,120 @@ doc_unit = Rhino.RhinoDoc.ActiveDoc.ModelUnitSystem
 # get all objects
 objects = Rhino.RhinoDoc.ActiveDoc.Objects
 
-# filter by rooms
-rooms = [_ for _ in objects if isinstance(_, po.Objects.RoomObject)]
+# index of the faces, apertures, doors and shades
+with timing.span('index'):
+    index = get_subobject_index(doc, po.Objects.RoomObject,
+                                getattr(po.Objects, 'ShadeObject', None))
 
-if not rooms:
+if not len(index):
     raise ValueError('No rooms found.')
 
 # define Eto window
-class KeywordSelection(forms.Dialog[str]):
+class KeywordSelection(forms.Dialog[list]):
     
-    def __init__(self):
-        self.Title = 'Keyword to use (DisplayName)'
+    def __init__(self, index):
+        self.Title = 'Keyword to use (Identifier or DisplayName)'
         self.Resizable = True
-        self.Width = 300
-        self.m_textbox = forms.TextBox(Text = 'Keyword here!')
+        self.Width = 500
+        
+        # the results narrow while typing, once the typing stops for a moment
+        self._index = index
+        self.incremental = IncrementalSearch(index)
+        self._matches = []
+        self.timer = forms.UITimer()
+        self.timer.Interval = 0.15
+        self.timer.Elapsed += self.OnSearchTimer
+        
+        self.m_textbox = forms.SearchBox()
+        self.m_textbox.PlaceholderText = 'Keyword here!'
+        self.m_textbox.TextChanged += self.OnKeywordChanged
+        
+        self.m_attribute = forms.RadioButtonList()
+        self.m_attribute.DataStore = ['Identifier', 'DisplayName']
+        self.m_attribute.SelectedIndex = 0
+        self.m_attribute.SelectedIndexChanged += self.OnKeywordChanged
+        
+        # the data store only holds entry ids, the cells are made on demand
+        self.m_gridview = forms.GridView()
+        self.m_gridview.ShowHeader = True
+        self.m_gridview.AllowMultipleSelection = True
+        self.m_gridview.Height = 300
+        for i, header in ((0, 'type'), (3, 'identifier'), (4, 'display_name')):
+            column = forms.GridColumn()
+            column.HeaderText = header
+            column.Editable = False
+            column.DataCell = forms.TextBoxCell()
+            column.DataCell.Binding = forms.Binding.Delegate[System.Object, System.String](
+                self.CellText(i))
+            self.m_gridview.Columns.Add(column)
+        
+        self.m_count = forms.Label()
+        
+        self.m_zoom_button = forms.Button(Text = 'Zoom to match')
+        self.m_zoom_button.Click += self.OnZoomButtonClick
         
-        self.m_button = forms.Button(Text = 'Search')
+        self.m_button = forms.Button(Text = 'Select')
         self.m_button.Click += self.OnButtonClick
         
         layout = forms.DynamicLayout()
         layout.Padding = drawing.Padding(10)
         layout.Spacing = drawing.Size(5, 5)
-        layout.Add(self.m_textbox)
-        layout.Add(self.m_button)
+        layout.AddRow(self.m_textbox, self.m_attribute)
+        layout.Add(self.m_gridview)
+        layout.AddRow(self.m_count, None, self.m_zoom_button, self.m_button)
         
         self.Content = layout
+        self.UpdateView()
     
-    def OnButtonClick(self, s, e):
-        if self.m_textbox.Text:
-            self.Close(self.m_textbox.Text)
-
-#-----------------------------------------------------------------------------#
-
-def select_childs(childs, 
-                  helpher_method, 
-                  keyword="",
-                  attribute="Identifier"):
-    """Search by Attribute"""
-    r = re.compile(".*{0}.*".format(keyword))
-    for elm in childs:
-        data = helpher_method(elm.Geometry())
-        if r.match(getattr(data, attribute)):
-            ok = doc.Objects.Select(elm)
-            print getattr(data, attribute)
-
-def select_faces(room, 
-                 keyword="",
-                 attribute="Identifier"):
-    """Search by Attribute"""
-    r = re.compile(".*{0}.*".format(keyword))
-    faces = room.BrepGeometry.Faces
+    def CellText(self, i):
+        entries = self._index.entries
+        return lambda entry_id: entries[entry_id][i] or ''
     
-    for elm in faces:
-        data = EntityHelper.TryGetFaceDataCopy(elm)
-        if r.match(getattr(data, attribute)):
-            hb_obj = data.HBObjectCopy
-            index = elm.ComponentIndex()
-            status = room.SelectSubObject(index, True, True, True)
-            print getattr(data, attribute)
-
-dialog = KeywordSelection()
-rc = dialog.ShowModal(Rhino.UI.RhinoEtoApp.MainWindow)
-
-for rm in rooms:
-    doors = rm.Doors
-    apertures = rm.Apertures
-    if apertures: select_childs(apertures, 
-                                EntityHelper.TryGetApertureDataCopy, 
-                                keyword=rc)
-    if doors: select_childs(doors, 
-                            EntityHelper.TryGetDoorDataCopy,
-                            keyword=rc)
+    def UpdateView(self):
+        self.m_gridview.DataStore = self._matches
+        self.m_count.Text = '{} of {} sub-objects'.format(
+            len(self._matches), len(self._index))
     
-    select_faces(rm, keyword=rc)
-
-doc.Views.Redraw()
+    def OnKeywordChanged(self, s, e):
+        self.timer.Stop()
+        self.timer.Start()
+    
+    def OnSearchTimer(self, s, e):
+        self.timer.Stop()
+        self.incremental.attribute = self.m_attribute.SelectedValue
+        with timing.span('search'):
+            self._matches = self.incremental.search(self.m_textbox.Text)
+        self.UpdateView()
+    
+    def OnZoomButtonClick(self, s, e):
+        # the selected rows or all the matches
+        rows = list(self.m_gridview.SelectedRows) or range(len(self._matches))
+        entries = [self._index.entries[self._matches[_]] for _ in rows]
+        zoom_to_entries(doc, entries, tol)
+    
+    def OnButtonClick(self, s, e):
+        self.timer.Stop()
+        self.OnSearchTimer(s, e)
+        self.Close(self._matches)
+
+dialog = KeywordSelection(index)
+rc = Rhino.UI.EtoExtensions.ShowSemiModal(dialog, doc, Rhino.UI.RhinoEtoApp.MainWindow)
+if not rc:
+    raise ValueError('No sub-objects selected.')
+matches = list(rc)
+
+quiet = True  # set to False to print the identifier of each match
+
+entries = [index.entries[_] for _ in matches]
+
+with timing.span('select'):
+    count = select_entries(doc, entries)
+
+summary = '{} matches ({})'.format(len(matches), ', '.join(
+    '{} {}s'.format(n, kind) for kind, n in kind_counts(entries) if n))
+print summary
+if not quiet:
+    for entry in entries:
+        print entry[3]
+timing.finish(sub_objects=len(index), matches=len(matches), selected=count,
+              narrowed=dialog.incremental.narrowed)
\ No newline at end of file
@@ -0,0 +1,15 @@
+"""
+CPython checks of the pure Python part of the shared modules.
+------------------------------------------------------------------------------
+Instructions:
+    pip install honeybee-core honeybee-energy pytest
+    python -m pytest tests
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (os.path.join(ROOT, 'benchmarks'),
+             os.path.join(ROOT, 'ironpython-scripts', 'lib')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
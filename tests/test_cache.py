@@ -0,0 +1,39 @@
+import standins
+from generator import generate_document
+from pollination_scripts import session
+from pollination_scripts.cache import get_hb_room, get_room_cache, room_fingerprint
+
+
+def _room_with_aperture():
+    doc = generate_document(4, 1, 4, 0.4, 0)
+    room = next(rm for rm in doc.Objects if rm.Apertures)
+    session.forget_document(doc)
+    return doc, room
+
+
+def test_fingerprint_changes_when_an_aperture_is_replaced():
+    doc, room = _room_with_aperture()
+    before = room_fingerprint(room)
+
+    # Rhino keeps the Id and gives a new serial number to the new object
+    ref = room.Apertures[0]
+    new_apt = standins.ApertureObject()
+    new_apt.Id = ref.ObjectId
+    ref._object = new_apt
+
+    assert room_fingerprint(room) != before
+
+
+def test_cached_room_is_not_used_after_an_aperture_edit():
+    doc, room = _room_with_aperture()
+    get_hb_room(doc, room)
+    get_hb_room(doc, room)
+    cache = get_room_cache(doc)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    ref = room.Apertures[0]
+    new_apt = standins.ApertureObject()
+    new_apt.Id = ref.ObjectId
+    ref._object = new_apt
+    get_hb_room(doc, room)
+    assert cache.misses == 2
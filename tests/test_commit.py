@@ -0,0 +1,55 @@
+import standins
+from pollination_scripts.commit import RoomCommit
+
+
+def _doc_with_aperture():
+    apt = standins.ApertureObject()
+    doc = standins.RhinoDoc([apt])
+    return doc, apt
+
+
+def test_delete_now_runs_before_commit_in_the_same_undo_record():
+    doc, apt = _doc_with_aperture()
+    room_commit = RoomCommit(doc, 'Test', standins.ModelEntity, list)
+    room_commit.delete_now(apt)
+    assert doc.Objects.FindId(apt.Id) is None
+    assert doc.undo_records == 1
+    assert not doc.Views.RedrawEnabled
+
+    room_commit.commit()
+    assert doc.undo_records == 1
+    assert doc.Views.RedrawEnabled
+    assert doc.Views.redraws == 1
+
+
+def test_commit_opens_one_undo_record():
+    doc, apt = _doc_with_aperture()
+    room_commit = RoomCommit(doc, 'Test', standins.ModelEntity, list)
+    room_commit.delete(apt)
+    assert doc.Objects.FindId(apt.Id) is not None
+    room_commit.commit()
+    assert doc.Objects.FindId(apt.Id) is None
+    assert doc.undo_records == 1
+
+
+def test_commit_updates_the_rooms_in_place():
+    rooms = [standins.RhinoObject() for _ in range(3)]
+    doc = standins.RhinoDoc(rooms)
+    room_commit = RoomCommit(doc, 'Test', standins.ModelEntity, list)
+    new_room = standins.RhinoObject()
+    room_commit.update_room(new_room, rooms[1].Id)
+    assert room_commit.commit() == 1
+    assert list(doc.Objects) == [rooms[0], new_room, rooms[2]]
+
+
+def test_new_rooms_move_once_they_are_added():
+    doc = standins.RhinoDoc()
+    room_commit = RoomCommit(doc, 'Test', standins.ModelEntity, list)
+    rooms = [standins.RhinoObject(standins.FaceBrep(None)) for _ in range(2)]
+    moves = []
+    for rm in rooms:
+        rm.Geometry.Transform = moves.append
+    room_commit.add_room(rooms[0])
+    room_commit.add_room(rooms[1], 'up')
+    assert room_commit.commit() == 2
+    assert list(doc.Objects) == rooms and moves == ['up']
@@ -0,0 +1,129 @@
+import json
+
+import pytest
+from honeybee_energy.lib.constructions import opaque_construction_by_identifier, \
+    window_construction_by_identifier
+from honeybee_energy.lib.materials import window_material_by_identifier
+from honeybee_energy.construction.windowshade import WindowConstructionShade
+from honeybee_energy.material.shade import EnergyWindowMaterialShade
+
+from pollination_scripts.constructions import MetricsCache, material_ids, \
+    schema_material_ids, construction_metrics, model_construction_metrics
+
+
+class Schema(object):
+    """HoneybeeSchema object of a honeybee-energy material or construction."""
+
+    def __init__(self, hb_obj, abridged=True):
+        self._set(hb_obj.to_dict(abridged=True) if abridged else hb_obj.to_dict())
+        self.json_calls = 0
+
+    def _set(self, obj_dict):
+        self._dict = obj_dict
+        self.Type = obj_dict['type']
+        self.Identifier = obj_dict['identifier']
+        self.Materials = obj_dict.get('materials')
+        self.ShadeMaterial = obj_dict.get('shade_material')
+        if 'window_construction' in obj_dict:
+            self.WindowConstruction = Schema.__new__(Schema)
+            self.WindowConstruction._set(obj_dict['window_construction'])
+
+    def ToJson(self):
+        self.json_calls += 1
+        return json.dumps(self._dict)
+
+
+class Energy(object):
+    """HoneybeeSchema energy properties of a model."""
+
+    def __init__(self, constructions):
+        materials = {}
+        for constr in constructions:
+            for mat in constr.materials:
+                materials[mat.identifier] = mat
+            if isinstance(constr, WindowConstructionShade):
+                materials[constr.shade_material.identifier] = constr.shade_material
+        self.Materials = [Schema(_, False) for _ in materials.values()]
+        self.Constructions = [Schema(_) for _ in constructions]
+
+
+def _constructions():
+    wall = opaque_construction_by_identifier('Generic Exterior Wall')
+    window = window_construction_by_identifier('Generic Double Pane')
+    shade = EnergyWindowMaterialShade('Test Shade')
+    shaded = WindowConstructionShade('Test Shaded Window', window, shade)
+    return [wall, window, shaded]
+
+
+def test_material_ids():
+    wall, window, shaded = _constructions()
+    assert material_ids(wall.to_dict(abridged=True)) == \
+        [_.identifier for _ in wall.materials]
+    assert material_ids(shaded.to_dict(abridged=True)) == \
+        [_.identifier for _ in window.materials] + ['Test Shade']
+
+
+def test_schema_material_ids():
+    for constr in _constructions():
+        assert schema_material_ids(Schema(constr)) == \
+            material_ids(constr.to_dict(abridged=True))
+
+
+def test_construction_metrics():
+    wall, window, shaded = _constructions()
+    r_value, u_factor, t_sol, t_vis, mass, thickness = construction_metrics(wall)
+    assert r_value == pytest.approx(wall.r_value)
+    assert u_factor == pytest.approx(wall.u_factor)
+    assert (t_sol, t_vis) == (0, 0)
+    assert mass == pytest.approx(wall.mass_area_density)
+    assert thickness == pytest.approx(wall.thickness)
+
+    metrics = construction_metrics(window)
+    assert metrics[2] == pytest.approx(window.solar_transmittance)
+    assert metrics[3] == pytest.approx(window.visible_transmittance)
+    assert metrics[4] == 0
+    # a shaded window reports the transmittances of the window alone
+    assert construction_metrics(shaded)[2:4] == metrics[2:4]
+
+
+def test_model_metrics_are_cached():
+    constructions = _constructions()
+    energy = Energy(constructions)
+    cache = MetricsCache()
+    rows = model_construction_metrics(energy, cache)
+    assert [name for name, _ in rows] == [_.display_name for _ in constructions]
+    for (_, metrics), constr in zip(rows, constructions):
+        assert metrics == pytest.approx(construction_metrics(constr))
+    assert (cache.hits, cache.misses) == (0, 3)
+
+    # a warm run does not serialize anything
+    calls = [_.json_calls for _ in energy.Constructions + energy.Materials]
+    assert model_construction_metrics(energy, cache) == rows
+    assert (cache.hits, cache.misses) == (3, 3)
+    assert [_.json_calls for _ in energy.Constructions + energy.Materials] == calls
+
+
+def test_edited_material_is_converted_again():
+    constructions = _constructions()
+    energy = Energy(constructions)
+    cache = MetricsCache()
+    model_construction_metrics(energy, cache)
+
+    # replace the shade material, only the shaded window uses it
+    shade = EnergyWindowMaterialShade('Test Shade', solar_transmittance=0.4)
+    old = energy.Materials  # the stand-ins hash by id, keep the old ones alive
+    energy.Materials = [_ for _ in old if _.Identifier != 'Test Shade']
+    energy.Materials.append(Schema(shade, False))
+    model_construction_metrics(energy, cache)
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_missing_material_skips_the_construction():
+    constructions = _constructions()
+    energy = Energy(constructions)
+    energy.Materials = [_ for _ in energy.Materials if _.Identifier != 'Test Shade']
+    errors = []
+    rows = model_construction_metrics(energy, MetricsCache(), errors=errors)
+    assert len(rows) == 2
+    assert len(errors) == 1
+    assert 'Test Shaded Window' in errors[0] and 'Test Shade' in errors[0]
@@ -0,0 +1,180 @@
+import pytest
+from honeybee.room import Room
+from ladybug_geometry.geometry3d.pointvector import Point3D
+
+import standins
+from pollination_scripts.commit import RoomCommit
+from pollination_scripts.floorplan import containment_parents, floor_plates, \
+    floor_inputs, duplicate_groups, story_name, stack_rooms
+
+TOL = 0.01
+
+
+def squares(*items):
+    """Get the bounds and the areas of (x, y, size, elevation) squares."""
+    bounds = [(x, y, x + size, y + size, z) for x, y, size, z in items]
+    areas = [size * size for _, _, size, _ in items]
+    return bounds, areas
+
+
+def square_contains(bounds):
+    def contains(outer, inner):
+        a, b = bounds[outer], bounds[inner]
+        return a[0] < b[0] and a[1] < b[1] and a[2] > b[2] and a[3] > b[3]
+    return contains
+
+
+def parents_of(*items):
+    bounds, areas = squares(*items)
+    return containment_parents(bounds, areas, square_contains(bounds), TOL)
+
+
+# CONTAINMENT TREE
+#---------------------------------------------------------------------------------------------#
+def test_nested_squares():
+    # a building with a courtyard, a pavilion in it and a separate building
+    parents = parents_of((0, 0, 30, 0), (10, 10, 10, 0), (12, 12, 4, 0),
+                         (50, 0, 10, 0))
+    assert parents == [None, 0, 1, None]
+    assert floor_plates(parents) == [(0, [1]), (2, []), (3, [])]
+
+
+def test_the_smallest_container_is_the_parent():
+    parents = parents_of((0, 0, 40, 0), (1, 1, 30, 0), (2, 2, 5, 0),
+                         (3, 3, 1, 0))
+    assert parents == [None, 0, 1, 2]
+    assert floor_plates(parents) == [(0, [1]), (2, [3])]
+
+
+def test_no_curves():
+    assert containment_parents([], [], None, TOL) == []
+    assert floor_plates([]) == []
+
+
+def test_only_curves_at_the_same_elevation_nest():
+    parents = parents_of((0, 0, 30, 0), (10, 10, 10, 3), (12, 12, 4, 0))
+    assert parents == [None, None, 0]
+
+
+def test_touching_and_overlapping_curves_do_not_nest():
+    parents = parents_of((0, 0, 10, 0), (10, 0, 10, 0), (5, 5, 10, 0))
+    assert parents == [None, None, None]
+
+
+def test_large_curves_that_cover_many_cells():
+    # many small rooms in a large site, the site covers more than MAX_CELLS
+    items = [(0, 0, 1000, 0)] + [(1 + 2 * i, 1 + 2 * j, 1, 0)
+                                 for i in range(40) for j in range(40)]
+    parents = parents_of(*items)
+    assert parents == [None] + [0] * 1600
+    plates = floor_plates(parents)
+    assert plates[0] == (0, list(range(1, 1601)))
+
+
+def test_many_curves_only_test_their_neighbours():
+    items = [(3 * i, 3 * j, 2, 0) for i in range(100) for j in range(100)]
+    items += [(3 * i + 0.5, 3 * j + 0.5, 1, 0) for i in range(100) for j in range(100)]
+    bounds, areas = squares(*items)
+    calls = []
+    contains = square_contains(bounds)
+
+    def counted(outer, inner):
+        calls.append(1)
+        return contains(outer, inner)
+
+    parents = containment_parents(bounds, areas, counted, TOL)
+    assert parents == [None] * 10000 + list(range(10000))
+    assert len(calls) == 10000
+
+
+def test_deep_tree():
+    items = [(i, i, 2000 - 2 * i, 0) for i in range(900)]
+    parents = parents_of(*items)
+    assert parents == [None] + list(range(899))
+    plates = floor_plates(parents)
+    assert plates == [(i, [i + 1]) for i in range(0, 900, 2)]
+
+
+# DUPLICATES
+#---------------------------------------------------------------------------------------------#
+def loop(x, y, size, z=0):
+    return [(x, y, z), (x + size, y, z), (x + size, y + size, z), (x, y + size, z)]
+
+
+def test_duplicates_with_another_start_and_direction():
+    square = loop(0, 0, 10)
+    shifted = square[2:] + square[:2]
+    reversed_ = square[::-1]
+    groups = duplicate_groups([square, loop(20, 0, 10), shifted, reversed_], TOL)
+    assert groups == [[0, 2, 3]]
+
+
+def test_duplicates_within_the_tolerance():
+    near = [(x + TOL * 0.5, y - TOL * 0.5, z) for x, y, z in loop(0, 0, 10)]
+    far = [(x + TOL * 3, y, z) for x, y, z in loop(0, 0, 10)]
+    assert duplicate_groups([loop(0, 0, 10), near, far], TOL) == [[0, 1]]
+
+
+def test_duplicates_across_a_cell_boundary():
+    # the averages round to different cells of the tolerance grid
+    base = loop(0.004, 0, 10)
+    moved = [(x + 0.002, y, z) for x, y, z in base]
+    assert duplicate_groups([base, moved], TOL) == [[0, 1]]
+
+
+def test_not_duplicates():
+    triangle = [(0, 0, 0), (10, 0, 0), (0, 10, 0)]
+    other = [(0, 0, 0), (10, 0, 0), (10, 10, 0)]  # same start, another corner
+    assert duplicate_groups([loop(0, 0, 10), loop(0, 0, 10, 3), triangle, other,
+                             []], TOL) == []
+
+
+def test_many_curves():
+    loops = [loop(20 * i, 20 * j, 10) for i in range(100) for j in range(100)]
+    loops += [l[1:] + l[:1] for l in loops[::2]]
+    groups = duplicate_groups(loops, TOL)
+    assert groups == [[2 * i, 10000 + i] for i in range(5000)]
+
+
+# FLOORS
+#---------------------------------------------------------------------------------------------#
+def test_floor_inputs_from_the_dialog_text():
+    assert floor_inputs('3.5', '2.0', '') == (3.5, 2, 3.5)
+    assert floor_inputs(3, 4, None) == (3, 4, 3)
+    assert floor_inputs('3', '3', '4.2') == (3, 3, 4.2)
+    # one floor does not need a floor to floor height
+    assert floor_inputs('3', '1', '1') == (3, 1, 1)
+
+
+@pytest.mark.parametrize('inputs', [
+    ('abc', '1', ''), ('0', '1', ''), ('3', '2.5', ''), ('3', '0', ''),
+    ('3', 'two', ''), ('3', '2', 'x'), ('3.5', '2', '3')])
+def test_floor_inputs_errors(inputs):
+    with pytest.raises(ValueError):
+        floor_inputs(*inputs)
+
+
+def test_story_name():
+    assert story_name('Offices', 0, 1) == 'Offices'
+    assert [story_name('Offices', i, 3) for i in range(3)] == \
+        ['Offices_Floor1', 'Offices_Floor2', 'Offices_Floor3']
+
+
+def test_stack_rooms():
+    rooms = [standins.room_object_from_brep(standins.Brep(
+        Room.from_box('room', 5, 4, 3, origin=Point3D(x, 0, 0)).geometry.faces), TOL)
+        for x in (0, 5)]
+    doc = standins.RhinoDoc()
+    room_commit = RoomCommit(doc, 'Test', standins.ModelEntity, list)
+    with standins.rhino_modules():
+        assert stack_rooms(rooms, 'Offices', 3, 3.5, room_commit) == 6
+    assert room_commit.commit() == 6
+
+    added = list(doc.Objects)
+    assert added[:2] == rooms  # the first floor is not copied
+    assert len(set(rm.Data.HBObjectCopy.Identifier for rm in added)) == 6
+    for i, rm in enumerate(added):
+        level = i // 2
+        assert rm.Data.HBObjectCopy.Story == 'Offices_Floor{}'.format(level + 1)
+        assert rm.BrepGeometry.GetBoundingBox(False).Min.Z == \
+            pytest.approx(level * 3.5)
@@ -0,0 +1,66 @@
+import math
+import random
+
+import pytest
+from honeybee.orientation import angles_from_num_orient, orient_index
+from ladybug_geometry.geometry2d.pointvector import Vector2D
+
+from pollination_scripts import orientation
+from pollination_scripts.orientation import orient_indices, HORIZONTAL
+
+
+def _normals(count=2000, seed=1):
+    rnd = random.Random(seed)
+    xs, ys = [], []
+    for _ in range(count):
+        angle = rnd.uniform(0, 2 * math.pi)
+        xs.append(math.sin(angle))
+        ys.append(math.cos(angle))
+    # the axes and a horizontal face
+    return xs + [0.0, 1.0, 0.0, -1.0, 0.0], ys + [0.0, 0.0, 1.0, 0.0, -1.0]
+
+
+def _honeybee_index(x, y, angles):
+    angle = math.degrees(Vector2D(0, 1).angle_clockwise(Vector2D(x, y)))
+    return orient_index(angle, angles)
+
+
+@pytest.mark.parametrize('use_numpy', [True, False])
+@pytest.mark.parametrize('num_orient', [1, 2, 3, 4, 8, 16])
+def test_orient_indices_match_honeybee(monkeypatch, use_numpy, num_orient):
+    if use_numpy and orientation.np is None:
+        pytest.skip('numpy is not installed')
+    if not use_numpy:
+        monkeypatch.setattr(orientation, 'np', None)
+    xs, ys = _normals()
+    indices = list(orient_indices(xs, ys, num_orient))
+    angles = angles_from_num_orient(num_orient)
+    for x, y, i in zip(xs, ys, indices):
+        if x == 0 and y == 0:
+            assert i == HORIZONTAL
+        else:
+            assert i == _honeybee_index(x, y, angles)
+
+
+def test_cardinal_directions():
+    # north, east, south, west normals
+    indices = list(orient_indices([0, 1, 0, -1], [1, 0, -1, 0], 4))
+    assert indices == [0, 1, 2, 3]
+
+
+def test_wall_grouping_matches_honeybee():
+    from honeybee.orientation import face_orient_index
+    from generator import generate_rooms
+    from pollination_scripts.wwr import get_faces_group_by_orientation, \
+        is_outdoor_and_wall
+
+    rooms = generate_rooms(24, 2, 8, 0.4)
+    angles = angles_from_num_orient(8)
+    expected = [[None] for _ in range(8)]
+    for room in rooms:
+        for face in room.faces:
+            if is_outdoor_and_wall(face):
+                expected[face_orient_index(face, angles)].append(face.identifier)
+
+    groups = get_faces_group_by_orientation(rooms, 8)
+    assert [[None] + [f.identifier for f in faces[1:]] for faces in groups] == expected
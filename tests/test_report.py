@@ -0,0 +1,49 @@
+import pytest
+
+from honeybee.room import Room
+
+import run_benchmarks
+import standins
+from generator import generate_document
+
+from pollination_scripts.report import sum_metrics, room_metrics, room_name, \
+    room_object_inputs, room_object_metrics, RoomTable
+
+
+def test_sum_metrics():
+    faces = [('Floor', False), ('Wall', True), ('Wall', True), ('RoofCeiling', True),
+             ('Wall', False)]
+    apertures = [(2, 1), (1, 2), (5, 3), (4, 4), (3, None)]
+    assert sum_metrics([10, 6, 6, 10, 6], faces, apertures, 30) == \
+        [10, 30, 22, 3, 12]
+
+
+@pytest.mark.parametrize('orientations', [4, 8])
+def test_geometry_path_matches_honeybee(orientations):
+    doc = generate_document(40, 3, orientations, 0.4, 0)
+    ctx = {'doc': doc, 'orientations': orientations}
+    ctx['selection'] = run_benchmarks.selection(ctx)
+    ctx['convert_direct'] = run_benchmarks.convert_direct(ctx)
+    assert run_benchmarks.report_check(ctx) < 1e-6
+
+
+def test_room_object_metrics_match_honeybee():
+    hb_room = Room.from_box('office', 5, 4, 3)
+    hb_room.faces[1].apertures_by_ratio(0.4, 0.01)  # exterior wall
+    hb_room.faces[-1].apertures_by_ratio(0.2, 0.01)  # roof skylight
+    rm = standins.RoomObject(hb_room)
+    with standins.rhino_modules():
+        inputs = room_object_inputs(rm)
+        metrics = room_object_metrics(inputs, 0.01)
+    assert len(inputs[2]) == 2
+    for value, expected in zip(metrics, room_metrics(hb_room)):
+        assert abs(value - expected) < 1e-6
+
+
+def test_room_name_falls_back_to_the_identifier():
+    rm = standins.RoomObject(Room.from_box('office', 5, 4, 3))
+    rm.Data.HBObjectCopy.DisplayName = None
+    assert room_name(rm) == 'office'
+    table = RoomTable(('display_name', 'floor_area'))
+    table.add_values(room_name(rm), [20])
+    assert table.view(None, False, 'OFF') == [0]
@@ -0,0 +1,111 @@
+import pytest
+from honeybee.room import Room
+from ladybug_geometry.geometry3d.pointvector import Point3D
+
+import standins
+from pollination_scripts.commit import RoomCommit
+from pollination_scripts.story import StoryIndex
+from pollination_scripts.roof import story_shifts, broken_adjacencies, \
+    offset_roof_ceilings
+
+ELEVATIONS = {'L1': 0, 'L2': 3, 'L3': 6, 'L4': 9}
+
+
+def test_stories_above_move_with_the_ceilings():
+    shifts = story_shifts(ELEVATIONS, ['L2'], 0.5)
+    assert shifts == {'L1': (0, 0), 'L2': (0, 0.5), 'L3': (0.5, 0), 'L4': (0.5, 0)}
+
+
+def test_offsets_add_up():
+    shifts = story_shifts(ELEVATIONS, ['L1', 'L3'], -0.25)
+    assert shifts == {'L1': (0, -0.25), 'L2': (-0.25, 0), 'L3': (-0.25, -0.25),
+                      'L4': (-0.5, 0)}
+
+
+def test_floors_land_on_the_moved_ceilings():
+    heights = {'L1': 3, 'L2': 3, 'L3': 3, 'L4': 3}
+    shifts = story_shifts(ELEVATIONS, ['L1', 'L2', 'L4'], 0.4)
+    stories = sorted(ELEVATIONS, key=ELEVATIONS.get)
+    for below, above in zip(stories, stories[1:]):
+        shift, offset = shifts[below]
+        ceiling = ELEVATIONS[below] + heights[below] + shift + offset
+        assert abs(ELEVATIONS[above] + shifts[above][0] - ceiling) < 1e-9
+
+
+def test_stories_at_the_same_elevation_move_once():
+    elevations = dict(ELEVATIONS, L2b=3)
+    shifts = story_shifts(elevations, ['L2', 'L2b'], 1)
+    assert shifts['L2'] == shifts['L2b'] == (0, 1)
+    assert shifts['L3'] == (1, 0)
+
+
+def test_stories_above_stay_in_place():
+    shifts = story_shifts(ELEVATIONS, ['L2'], 0.5, move_above=False)
+    assert shifts == {'L1': (0, 0), 'L2': (0, 0.5), 'L3': (0, 0), 'L4': (0, 0)}
+
+
+def test_broken_adjacencies():
+    faces = [('r1', 'ceiling', 'r2', 'floor', (0.5, 0.5)),
+             ('r2', 'floor', 'r1', 'ceiling', (0.5, 0.5)),
+             ('r1', 'wall', 'r3', 'wall3', (0, 0.5))]
+    assert broken_adjacencies(faces, 0.01) == {'wall': 'r1', 'wall3': 'r3'}
+
+
+def tower():
+    """Two stories of one room with an aperture on a wall of the first one."""
+    rooms = [Room.from_box('room_{}'.format(i), 5, 4, 3, origin=Point3D(0, 0, i * 3))
+             for i in range(2)]
+    for i, room in enumerate(rooms):
+        room.story = 'L{}'.format(i + 1)
+    rooms[0].faces[1].apertures_by_ratio(0.4, 0.01)
+    Room.solve_adjacency(rooms, 0.01)
+    room_objects = [standins.RoomObject(_) for _ in rooms]
+    apertures = [ref.Object() for rm in room_objects for ref in rm.Apertures]
+    doc = standins.RhinoDoc(room_objects + apertures)
+    index = StoryIndex()
+    index.build(room_objects)
+    return doc, index, room_objects
+
+
+def faces_by_type(rm):
+    faces = dict((fc.FaceType, fc) for fc in rm.Data.HBObjectCopy.Faces
+                 if fc.FaceType != 'Wall')
+    return faces['Floor'], faces['RoofCeiling']
+
+
+def bc_type(face):
+    return getattr(face.BoundaryCondition, 'Obj', face.BoundaryCondition).Type
+
+
+@pytest.mark.parametrize('move_above', [True, False])
+def test_offset_keeps_the_room_data(move_above):
+    doc, index, (first, second) = tower()
+    commit = RoomCommit(doc, model_entity=standins.ModelEntity, room_list=list)
+    with standins.rhino_modules():
+        count = offset_roof_ceilings(doc, index, ['L1'], 0.5, 0.01, 0.0175,
+                                     move_above, False, commit)
+    commit.commit()
+    assert count == 2
+
+    new_first, new_second = doc.Objects.FindId(first.Id), doc.Objects.FindId(second.Id)
+    assert new_first is not first
+    for old, new in ((first, new_first), (second, new_second)):
+        old_data, new_data = old.Data.HBObjectCopy, new.Data.HBObjectCopy
+        assert (new_data.Identifier, new_data.Story) == \
+            (old_data.Identifier, old_data.Story)
+        assert [_.Identifier for _ in new_data.Faces] == \
+            [_.Identifier for _ in old_data.Faces]
+    assert new_first.BrepGeometry.GetBoundingBox(False).Max.Z == pytest.approx(3.5)
+
+    # the aperture moved to the new room with its wall
+    assert len(new_first.Apertures) == 1 and len(doc.Objects) == 3
+
+    ceiling, floor = faces_by_type(new_first)[1], faces_by_type(new_second)[0]
+    if move_above:
+        assert new_second is second  # only moved
+        assert bc_type(ceiling) == bc_type(floor) == 'Surface'
+        assert list(ceiling.BoundaryCondition.Obj.BoundaryConditionObjects) == \
+            [floor.Identifier, new_second.Data.HBObjectCopy.Identifier]
+    else:
+        assert new_second is not second  # rebuilt with the new adjacency
+        assert bc_type(ceiling) == bc_type(floor) == 'Outdoors'
@@ -0,0 +1,119 @@
+import standins
+from pollination_scripts import events, search
+from pollination_scripts.search import SubObjectIndex, IncrementalSearch
+
+
+OWNERS = [
+    ('room_a', [('face', 0, 'Room_A_Face0', 'Front'),
+                ('aperture', 'apt_1', 'Room_A_Glz0', 'Window'),
+                ('door', 'door_1', 'Room_A_Door0', 'Entry')]),
+    ('room_b', [('face', 0, 'Room_B_Face0', 'Back'),
+                ('aperture', 'apt_2', 'Room_B_Glz0', 'Window')])]
+
+
+def _index():
+    index = SubObjectIndex()
+    index.build(OWNERS)
+    return index
+
+
+def _identifiers(index, keyword, attribute='Identifier'):
+    return sorted(index.entries[_][3] for _ in index.search(keyword, attribute))
+
+
+def test_search():
+    index = _index()
+    assert _identifiers(index, 'Glz') == ['Room_A_Glz0', 'Room_B_Glz0']
+    assert _identifiers(index, 'Room_A') == ['Room_A_Door0', 'Room_A_Face0',
+                                             'Room_A_Glz0']
+    assert _identifiers(index, 'Window', 'DisplayName') == ['Room_A_Glz0',
+                                                            'Room_B_Glz0']
+    assert _identifiers(index, 'A_') == ['Room_A_Door0', 'Room_A_Face0',
+                                         'Room_A_Glz0']
+    assert index.search('missing') == []
+    assert index.owner_of('apt_2') == 'room_b'
+
+
+def test_renamed_aperture_only_changes_its_entry():
+    index = _index()
+    before = len(index)
+    # one edit fires replace, delete and add for the aperture object
+    assert index.add_sub_object(('aperture', 'apt_1', 'Room_A_Glz0_new', 'Window'))
+    index.discard_sub_object('apt_1')
+    assert index.add_sub_object(('aperture', 'apt_1', 'Room_A_Glz0_new', 'Window'))
+    assert len(index) == before
+    assert _identifiers(index, 'Glz') == ['Room_A_Glz0_new', 'Room_B_Glz0']
+    assert index.owner_of('apt_1') == 'room_a'
+    assert not index.add_sub_object(('aperture', 'apt_9', 'Other', ''))
+
+
+def test_room_edit_replaces_its_entries():
+    index = _index()
+    index.add('room_a', [('face', 0, 'Room_A_Face0', 'Front')])
+    assert _identifiers(index, 'Room_A') == ['Room_A_Face0']
+    assert index.owner_of('apt_1') is None
+    index.discard('room_b')
+    assert len(index) == 1
+
+
+def test_compaction_drops_the_dead_entries():
+    index = SubObjectIndex()
+    index.build([('room', [('aperture', 'apt', 'Glz', '')])])
+    for i in range(1200):
+        index.add_sub_object(('aperture', 'apt', 'Glz{}'.format(i), ''))
+    assert len(index.entries) < 1200
+    assert _identifiers(index, 'Glz') == ['Glz1199']
+    assert index.owner_of('apt') == 'room'
+
+
+def test_incremental_search_narrows():
+    index = _index()
+    searcher = IncrementalSearch(index)
+    searcher.search('Roo')
+    assert [index.entries[_][3] for _ in searcher.search('Room_B')] == \
+        ['Room_B_Face0', 'Room_B_Glz0']
+    assert searcher.narrowed == 1
+    index.discard('room_b')
+    assert searcher.search('Room_B_') == []
+
+
+class _NotARoom(object):
+    pass
+
+
+def test_events_do_not_read_the_document():
+    doc = standins.RhinoDoc([])
+    index = search._index(doc)
+    index.build(OWNERS)
+    search.get_subobject_index(doc, _NotARoom)
+    errors = len(events.errors())
+
+    # the old object of a replaced aperture has no geometry
+    events.dispatch('delete', doc, 'apt_1')
+    events.dispatch('add', doc, 'apt_1', None)
+    assert _identifiers(index, 'Glz') == ['Room_B_Glz0']
+    assert index.owner_of('apt_1') == 'room_a'
+    events.dispatch('delete', doc, 'room_b')
+    assert _identifiers(index, 'Glz') == []
+    assert len(events.errors()) == errors
+
+
+
+def test_failed_updates_are_reported_once(capsys):
+    doc = standins.RhinoDoc([])
+    events.report_errors()
+
+    def failing(doc, object_id, rhino_object):
+        raise RuntimeError('broken {}'.format(object_id))
+
+    events.subscribe('delete', 'failing', failing)
+    try:
+        events.dispatch('delete', doc, 'a')
+        events.dispatch('delete', doc, 'b')
+    finally:
+        events._hub()['delete'].pop('failing')
+    assert capsys.readouterr().out == ''
+    assert events.report_errors() == 2
+    assert 'broken a' in capsys.readouterr().out
+    assert events.report_errors() == 0
+    assert capsys.readouterr().out == ''
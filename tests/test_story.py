@@ -0,0 +1,25 @@
+import uuid
+
+from pollination_scripts.story import StoryIndex, NO_STORY
+
+
+class Room(object):
+
+    def __init__(self, story):
+        self.Id = uuid.uuid4()
+        data = type('Data', (), {})()
+        data.HBObjectCopy = type('Room', (), {'Story': story})()
+        self.Data = data
+
+
+def test_rooms_without_a_story_are_listed():
+    rooms = [Room('L2'), Room(None), Room('L1'), Room(''), Room('L1')]
+    index = StoryIndex()
+    index.build(rooms)
+    assert index.stories() == ['L1', 'L2', NO_STORY]
+    assert sorted(index.room_ids(NO_STORY)) == sorted([rooms[1].Id, rooms[3].Id])
+    assert len(index.room_ids('L1')) == 2
+
+    index.discard(rooms[1].Id)
+    index.discard(rooms[3].Id)
+    assert index.stories() == ['L1', 'L2']
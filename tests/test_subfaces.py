@@ -0,0 +1,101 @@
+import math
+
+import pytest
+from ladybug_geometry.geometry3d.pointvector import Point3D
+from ladybug_geometry.geometry3d.face import Face3D
+
+from pollination_scripts.subfaces import SubFaceCache, \
+    sub_faces_by_ratio_rectangle, sub_faces_by_ratio_sub_rectangle
+
+TOL = 0.01
+INPUTS = (0.4, 2, 0.8, 2, 0)
+
+
+def wall(width, height, angle, origin=(0, 0, 0)):
+    """Get a vertical rectangular wall rotated about the Z axis in degrees."""
+    x, y, z = origin
+    dx, dy = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+    return Face3D((Point3D(x, y, z), Point3D(x + width * dx, y + width * dy, z),
+                   Point3D(x + width * dx, y + width * dy, z + height),
+                   Point3D(x, y, z + height)))
+
+
+def same_faces(faces_a, faces_b, distance=TOL):
+    assert len(faces_a) == len(faces_b)
+    for fa, fb in zip(faces_a, faces_b):
+        assert len(fa.vertices) == len(fb.vertices)
+        assert fa.normal.angle(fb.normal) < 1e-6
+        for pa, pb in zip(fa.vertices, fb.vertices):
+            assert pa.distance_to_point(pb) < distance
+
+
+@pytest.mark.parametrize('angle', [0, 17, 45, 90, 133, 180, 251, 300])
+@pytest.mark.parametrize('width', [2.4, 5.5, 7.3, 12])
+def test_sub_rectangle_matches_honeybee(angle, width):
+    face = wall(width, 3, angle, (3, -4, 6))
+    cache = SubFaceCache()
+    for _ in range(2):  # a miss then a hit
+        same_faces(sub_faces_by_ratio_sub_rectangle(face, *INPUTS, tolerance=TOL,
+                                                    cache=cache),
+                   face.sub_faces_by_ratio_sub_rectangle(*INPUTS, tolerance=TOL))
+    assert cache.hits == 1
+
+
+@pytest.mark.parametrize('angle', [0, 17, 90, 251])
+def test_rectangle_matches_honeybee(angle):
+    face = wall(5, 3, angle, (1, 2, 3))
+    cache = SubFaceCache()
+    for _ in range(2):
+        same_faces(sub_faces_by_ratio_rectangle(face, 0.3, TOL, cache),
+                   face.sub_faces_by_ratio_rectangle(0.3, TOL))
+
+
+def test_fill_order_does_not_change_the_result():
+    # walls within the tolerance share a fingerprint and get the sub-faces of
+    # that fingerprint whatever face filled the cache
+    faces = [wall(5, 3, 33, (1, 1, 0)), wall(5 + TOL * 0.3, 3, 33)]
+    results = []
+    for order in (faces, faces[::-1]):
+        cache = SubFaceCache()
+        results.append([sub_faces_by_ratio_sub_rectangle(
+            f, *INPUTS, tolerance=TOL, cache=cache) for f in faces])
+        assert cache.hits == 1
+    for first, second in zip(*results):
+        same_faces(first, second, 1e-9)
+
+
+def test_count_does_not_depend_on_the_angle():
+    # a 5 m wall is where the window count flips and the rotated honeybee
+    # faces measure a little more or less than 5 m, the fingerprint does not
+    expected = len(wall(5, 3, 0).sub_faces_by_ratio_sub_rectangle(*INPUTS, tolerance=TOL))
+    for angle in range(0, 360, 7):
+        assert len(sub_faces_by_ratio_sub_rectangle(
+            wall(5, 3, angle, (2, 3, 0)), *INPUTS, tolerance=TOL,
+            cache=SubFaceCache())) == expected
+
+
+def test_identical_walls_hit():
+    # the same wall in many places and orientations is computed once per angle
+    cache = SubFaceCache()
+    for x in range(10):
+        for angle in (0, 90, 180, 270):
+            sub_faces_by_ratio_sub_rectangle(wall(7.3, 3, angle, (x * 13.7, -x * 3.1, 3)),
+                                             *INPUTS, tolerance=TOL, cache=cache)
+    assert len(cache) == 1 and cache.hits == 39
+
+
+def test_faces_without_a_fingerprint():
+    roof = Face3D((Point3D(0, 0, 3), Point3D(5, 0, 3), Point3D(5, 4, 3), Point3D(0, 4, 3)))
+    cache = SubFaceCache()
+    same_faces(sub_faces_by_ratio_rectangle(roof, 0.3, TOL, cache),
+               roof.sub_faces_by_ratio_rectangle(0.3, TOL), 1e-9)
+    assert len(cache) == 0
+
+
+def test_face_with_other_parts():
+    # an L-shaped wall has a rectangle and a remainder
+    face = Face3D((Point3D(0, 0, 0), Point3D(6, 0, 0), Point3D(6, 0, 3),
+                   Point3D(3, 0, 3), Point3D(3, 0, 5), Point3D(0, 0, 5)))
+    same_faces(sub_faces_by_ratio_sub_rectangle(face, *INPUTS, tolerance=TOL,
+                                                cache=SubFaceCache()),
+               face.sub_faces_by_ratio_sub_rectangle(*INPUTS, tolerance=TOL))
@@ -0,0 +1,19 @@
+from generator import generate_rooms
+from pollination_scripts.subfaces import get_subface_cache
+from pollination_scripts.wwr import get_faces_group_by_orientation, \
+    get_aperture_face3ds_by_room
+
+
+def test_apertures_by_room_stay_on_their_own_walls():
+    get_subface_cache().clear()
+    rooms = generate_rooms(12, 2, 4, 0.4)
+    groups = get_faces_group_by_orientation(rooms, 4)
+    by_room = get_aperture_face3ds_by_room(groups, [0.4] * 4, [0.3] * 4, 0.01)
+
+    walls = dict((room.identifier, [f.geometry for f in room.faces
+                                     if str(f.type) == 'Wall'])
+                 for room in rooms)
+    assert by_room
+    for room_id, geos in by_room.items():
+        for geo in geos:
+            assert any(wall.is_sub_face(geo, 0.01, 0.01745) for wall in walls[room_id])